@@ -0,0 +1,237 @@
+"""
+변동성 적응형 폴링 계획
+- 종목별 최근 틱으로 실현 변동성을 추정해 조회 간 기대 변동폭이 목표치가 되도록 조회 주기 결정
+  (변동성이 크거나 최근 움직임이 크면 하한까지 짧게, 조용하면 상한까지 길게)
+- 다음 조회 시각 우선순위 큐에서 도래한 종목을 꺼내고, 분당 요청 예산(토큰 버킷)으로 전체 조회 수 제한
+"""
+import heapq
+import logging
+import math
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_TARGET_MOVE,
+    ADAPTIVE_JUMP_MOVE,
+    ADAPTIVE_WINDOW,
+)
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """분당 요청 예산 토큰 버킷 (여러 스케줄이 공유)"""
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: 분당 최대 종목 조회 수 (버킷 크기도 같음)
+        """
+        self.per_minute = per_minute
+        self.tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self.granted = 0
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        elapsed = max(now - self._updated, 0.0)
+        self.tokens = min(self.per_minute, self.tokens + elapsed * self.per_minute / 60.0)
+        self._updated = now
+
+    def acquire(self, count: int, now: Optional[float] = None) -> int:
+        """
+        최대 count개 토큰 획득
+
+        Returns:
+            int: 실제로 획득한 토큰 수
+        """
+        self._refill(time.monotonic() if now is None else now)
+        granted = min(count, int(self.tokens))
+        self.tokens -= granted
+        self.granted += granted
+        self.throttled += count - granted
+        return granted
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """토큰 하나가 찰 때까지 남은 시간(초)"""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1 or self.per_minute <= 0:
+            return 0.0
+        return (1 - self.tokens) * 60.0 / self.per_minute
+
+    def get_stats(self) -> dict:
+        return {
+            "per_minute": self.per_minute,
+            "tokens": round(self.tokens, 2),
+            "granted": self.granted,
+            "throttled": self.throttled,
+        }
+
+
+class AdaptivePollingPlanner:
+    """종목별 조회 주기를 변동성으로 조정하는 우선순위 큐 기반 폴링 계획"""
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        budget: RequestBudget,
+        base_interval: float,
+        min_interval: float = ADAPTIVE_MIN_INTERVAL,
+        max_interval: float = ADAPTIVE_MAX_INTERVAL,
+        target_move: float = ADAPTIVE_TARGET_MOVE,
+        jump_move: float = ADAPTIVE_JUMP_MOVE,
+        window: int = ADAPTIVE_WINDOW,
+        jitter: float = 0.0
+    ):
+        """
+        Args:
+            symbols: 대상 종목
+            budget: 분당 요청 예산
+            base_interval: 틱이 충분히 쌓이기 전 조회 주기(초)
+            min_interval: 조회 주기 하한(초)
+            max_interval: 조회 주기 상한(초)
+            target_move: 조회 간 기대 변동폭 목표 (로그 수익률)
+            jump_move: 직전 틱 변동폭이 이 이상이면 바로 하한 주기 적용
+            window: 변동성 계산에 쓰는 최근 수익률 개수
+            jitter: 다음 조회 시각에 더하는 무작위 지연 상한(초)
+        """
+        self.budget = budget
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.target_move = target_move
+        self.jump_move = jump_move
+        self.window = window
+        self.jitter = jitter
+
+        now = time.monotonic()
+        self.symbols = list(symbols)
+        # (다음 조회 시각, 종목) 최소 힙 - 종목마다 항목은 항상 하나
+        self._queue: List[Tuple[float, str]] = [(now, symbol) for symbol in self.symbols]
+        heapq.heapify(self._queue)
+        self.intervals: Dict[str, float] = {s: base_interval for s in self.symbols}
+        # 종목별 (로그 수익률, 경과 초) 최근 기록과 마지막 관측 (가격, 틱 시각, 관측 시각)
+        self._returns: Dict[str, Deque[Tuple[float, float]]] = {
+            s: deque(maxlen=window) for s in self.symbols
+        }
+        self._last: Dict[str, Tuple[float, str, float]] = {}
+        self.polls: Dict[str, int] = {s: 0 for s in self.symbols}
+
+    def next_due(self) -> Optional[float]:
+        """가장 이른 다음 조회 시각 (monotonic)"""
+        return self._queue[0][0] if self._queue else None
+
+    def pop_due(
+        self, now: Optional[float] = None, allowed: Optional[Set[str]] = None
+    ) -> List[str]:
+        """
+        조회 시각이 된 종목을 예산 안에서 꺼냄
+        예산이 부족하면 남은 종목은 큐에 그대로 두어 다음에 가장 먼저 조회
+
+        Args:
+            now: 기준 시각 (monotonic, None이면 현재)
+            allowed: 지금 조회 가능한 종목 (장 마감 종목은 주기만큼 미룸, None이면 전체)
+
+        Returns:
+            List[str]: 이번에 조회할 종목 (조회 후 reschedule 필요)
+        """
+        now = time.monotonic() if now is None else now
+        due: List[str] = []
+        while self._queue and self._queue[0][0] <= now:
+            _, symbol = heapq.heappop(self._queue)
+            if allowed is not None and symbol not in allowed:
+                heapq.heappush(self._queue, (now + self.intervals[symbol], symbol))
+                continue
+            due.append(symbol)
+        granted = self.budget.acquire(len(due), now)
+        for symbol in due[granted:]:
+            heapq.heappush(self._queue, (now, symbol))
+        return due[:granted]
+
+    def wait_time(self, now: Optional[float] = None) -> Optional[float]:
+        """다음 조회까지 대기 시간(초) - 예산이 바닥났으면 토큰이 찰 때까지"""
+        now = time.monotonic() if now is None else now
+        due = self.next_due()
+        if due is None:
+            return None
+        return max(due - now, self.budget.wait_time(now), 0.0)
+
+    def observe(self, symbol: str, price: float, timestamp: str, now: Optional[float] = None):
+        """
+        조회 결과 관측 (새 틱이면 수익률 기록 후 조회 주기 갱신)
+
+        Args:
+            symbol: 종목
+            price: 최신 가격
+            timestamp: 틱 시각 (같으면 새 틱이 아니므로 무시)
+            now: 관측 시각 (monotonic, None이면 현재)
+        """
+        now = time.monotonic() if now is None else now
+        last = self._last.get(symbol)
+        if last is not None and last[1] == timestamp:
+            return
+        self._last[symbol] = (price, timestamp, now)
+        if last is None or last[0] <= 0 or price <= 0:
+            return
+        move = math.log(price / last[0])
+        returns = self._returns.setdefault(symbol, deque(maxlen=self.window))
+        returns.append((move, max(now - last[2], 1e-3)))
+        self.intervals[symbol] = self._interval(returns)
+
+    def _interval(self, returns: Deque[Tuple[float, float]]) -> float:
+        """기대 변동폭(σ × √T)이 목표치가 되는 주기 T를 하한/상한으로 제한"""
+        if abs(returns[-1][0]) >= self.jump_move:
+            return self.min_interval
+        if len(returns) < 2:
+            return self.base_interval
+        # 초당 분산 = Σr² / Σdt
+        variance_rate = sum(r * r for r, _ in returns) / sum(dt for _, dt in returns)
+        if variance_rate <= 0:
+            return self.max_interval
+        interval = self.target_move ** 2 / variance_rate
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def volatility(self, symbol: str) -> Optional[float]:
+        """초당 실현 변동성 (수익률이 2개 미만이면 None)"""
+        returns = self._returns.get(symbol)
+        if not returns or len(returns) < 2:
+            return None
+        return math.sqrt(sum(r * r for r, _ in returns) / sum(dt for _, dt in returns))
+
+    def reschedule(self, symbols: Iterable[str], now: Optional[float] = None):
+        """조회한 종목을 각자의 주기 뒤로 다시 큐에 넣음"""
+        now = time.monotonic() if now is None else now
+        for symbol in symbols:
+            self.polls[symbol] = self.polls.get(symbol, 0) + 1
+            heapq.heappush(
+                self._queue,
+                (now + self.intervals[symbol] + random.uniform(0, self.jitter), symbol)
+            )
+
+    def defer(self, symbols: Iterable[str], now: Optional[float] = None):
+        """마감까지 조회를 끝내지 못한 종목을 바로 다시 조회하도록 큐에 넣음"""
+        now = time.monotonic() if now is None else now
+        for symbol in symbols:
+            heapq.heappush(self._queue, (now, symbol))
+
+    def get_stats(self) -> dict:
+        """
+        종목별 조회 주기/변동성/조회 수
+
+        Returns:
+            dict: 종목 → {interval_seconds, volatility, polls}
+        """
+        return {
+            symbol: {
+                "interval_seconds": round(self.intervals[symbol], 2),
+                "volatility": self.volatility(symbol),
+                "polls": self.polls.get(symbol, 0),
+            }
+            for symbol in self.symbols
+        }
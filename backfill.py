@@ -0,0 +1,308 @@
+"""
+과거 데이터 백필 파이프라인
+- 심볼 × 기간을 인터벌별 yfinance 조회 한도에 맞는 청크로 분할
+- 워커 풀에서 청크를 병렬 조회하고 대량 적재 경로(bulk_load_prices)로 저장
+- 완료한 청크를 체크포인트 파일에 기록해 중단 후 같은 작업을 재실행하면 이어서 진행
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+from config import (
+    PRICE_SOURCE,
+    BACKFILL_WORKERS,
+    BACKFILL_INSERT_BATCH,
+    BACKFILL_LOAD_DATA,
+    BACKFILL_MAX_RETRIES,
+    BACKFILL_CHECKPOINT_DIR,
+    BACKFILL_INTERVAL_LIMITS,
+)
+from database import DatabaseManager, db_manager
+from price_source import PriceSource, create_price_source
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Chunk = Tuple[str, datetime, datetime]
+
+# 청크 경계 기준 시각 - 경계를 이 시각부터 chunk_days 배수로 고정해
+# 시작/끝 시각이 달라져도(끝 생략 시 현재 시각, 제공 기간으로 잘린 시작) 내부 청크 키가 유지됨
+CHUNK_EPOCH = datetime(2000, 1, 3)
+
+
+class BackfillJob:
+    """심볼 목록과 기간에 대한 백필 작업 (같은 입력이면 같은 job_id로 재개)"""
+
+    def __init__(
+        self,
+        symbols: List[str],
+        start: datetime,
+        end: Optional[datetime] = None,
+        interval: str = "1m",
+        workers: int = BACKFILL_WORKERS,
+        source: Optional[PriceSource] = None,
+        db: Optional[DatabaseManager] = None,
+        checkpoint_dir: str = BACKFILL_CHECKPOINT_DIR,
+        use_load_data: bool = BACKFILL_LOAD_DATA,
+        batch_rows: int = BACKFILL_INSERT_BATCH,
+        max_retries: int = BACKFILL_MAX_RETRIES
+    ):
+        """
+        Args:
+            symbols: 백필할 심볼 리스트
+            start: 기간 시작 (서버 로컬 시간)
+            end: 기간 끝 (미포함, None이면 현재 시각까지 - job_id는 생략한 그대로 계산)
+            interval: 봉 간격 (BACKFILL_INTERVAL_LIMITS의 키)
+            workers: 병렬 워커 수
+            source: 가격 소스 (None이면 PRICE_SOURCE 설정으로 생성)
+            db: 저장 대상 데이터베이스 매니저 (None이면 전역 db_manager)
+            checkpoint_dir: 체크포인트 파일 디렉터리
+            use_load_data: LOAD DATA LOCAL INFILE 적재 사용 여부
+            batch_rows: 다중 행 INSERT 1문당 최대 행 수
+            max_retries: 청크별 조회 재시도 횟수
+        """
+        if interval not in BACKFILL_INTERVAL_LIMITS:
+            raise ValueError(f"백필을 지원하지 않는 봉 간격: {interval}")
+        if not symbols:
+            raise ValueError("백필할 심볼이 없습니다")
+        requested_end = end
+        if end is None:
+            end = datetime.now().replace(second=0, microsecond=0)
+        if start >= end:
+            raise ValueError("시작 시각은 끝 시각보다 이전이어야 합니다")
+
+        self.symbols = sorted(set(symbols))
+        self.interval = interval
+        self.chunk_days, lookback_days = BACKFILL_INTERVAL_LIMITS[interval]
+        self.requested_start = start
+        self.start = start
+        self.end = end
+        # yfinance가 제공하지 않는 과거 구간은 요청해도 빈 응답이므로 잘라냄
+        # (재개 시 청크 경계가 유지되도록 다음 자정으로 맞춤)
+        if lookback_days is not None:
+            earliest = datetime.combine(
+                (datetime.now() - timedelta(days=lookback_days)).date()
+                + timedelta(days=1),
+                datetime.min.time()
+            )
+            if self.start < earliest:
+                logger.warning(
+                    f"{interval} 봉은 최근 {lookback_days}일만 제공되어 "
+                    f"시작 시각을 {earliest:%Y-%m-%d %H:%M}로 조정합니다"
+                )
+                self.start = min(earliest, end)
+
+        self.workers = max(1, workers)
+        self.source = source or create_price_source(PRICE_SOURCE)
+        self.db = db or db_manager
+        self.use_load_data = use_load_data
+        self.batch_rows = batch_rows
+        self.max_retries = max_retries
+
+        # 호출자가 준 인자로 키를 만들어 같은 요청을 나중에 다시 보내도 같은 작업으로 재개
+        key = "|".join([
+            interval,
+            start.isoformat(),
+            requested_end.isoformat() if requested_end else "now",
+            ",".join(self.symbols)
+        ])
+        self.job_id = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        self.checkpoint_path = os.path.join(
+            checkpoint_dir, f"backfill-{self.job_id}.json"
+        )
+
+        self._lock = threading.Lock()
+        self._done: Set[str] = set()
+        self.status = "pending"
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.chunks_resumed = 0
+        self.chunks_failed = 0
+        self.rows_fetched = 0
+        self.rows_inserted = 0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.elapsed_seconds = 0.0
+
+    def plan(self) -> List[Chunk]:
+        """
+        심볼 × 기간을 요청 1회 한도(chunk_days) 단위 청크로 분할
+        경계는 CHUNK_EPOCH 기준 고정 달력 경계이므로 기간 양 끝 청크만 잘림
+
+        Returns:
+            List[Chunk]: (symbol, chunk_start, chunk_end) 리스트
+        """
+        chunks: List[Chunk] = []
+        span = timedelta(days=self.chunk_days)
+        for symbol in self.symbols:
+            current = self.start
+            while current < self.end:
+                slot = (current - CHUNK_EPOCH) // span
+                chunk_end = min(CHUNK_EPOCH + (slot + 1) * span, self.end)
+                chunks.append((symbol, current, chunk_end))
+                current = chunk_end
+        return chunks
+
+    @staticmethod
+    def _chunk_key(chunk: Chunk) -> str:
+        symbol, start, end = chunk
+        return f"{symbol}|{start.isoformat()}|{end.isoformat()}"
+
+    def _load_checkpoint(self) -> Set[str]:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                return set(json.load(f).get("done", []))
+        except (OSError, ValueError):
+            return set()
+
+    def _save_checkpoint_locked(self):
+        """완료 청크 목록을 임시 파일에 쓰고 원자적으로 교체"""
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "job_id": self.job_id,
+                "interval": self.interval,
+                "done": sorted(self._done),
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _fetch_chunk(self, chunk: Chunk) -> List[Tuple[str, float, str]]:
+        """청크 조회 (실패 시 지수 백오프로 재시도, 모두 실패하면 예외)"""
+        symbol, start, end = chunk
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.source.fetch_history(symbol, start, end, self.interval)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(
+                    f"{symbol} {start:%Y-%m-%d}~{end:%Y-%m-%d} 조회 실패, "
+                    f"{delay}초 후 재시도: {e}"
+                )
+                time.sleep(delay)
+        return []
+
+    def _run_chunk(self, chunk: Chunk) -> int:
+        """청크 조회 → 대량 적재 → 체크포인트 기록, 적재한 행 수 반환"""
+        rows = self._fetch_chunk(chunk)
+        inserted = 0
+        if rows:
+            inserted = self.db.bulk_load_prices(
+                rows,
+                batch_rows=self.batch_rows,
+                use_load_data=self.use_load_data
+            )
+            if inserted < 0:
+                raise RuntimeError(f"{chunk[0]} 청크 적재 실패")
+        with self._lock:
+            self._done.add(self._chunk_key(chunk))
+            self._save_checkpoint_locked()
+            self.chunks_done += 1
+            self.rows_fetched += len(rows)
+            self.rows_inserted += inserted
+        return inserted
+
+    def run(self) -> dict:
+        """
+        백필 실행 (블로킹, 워커 풀에서 청크 병렬 처리)
+        일부 청크가 실패해도 나머지는 계속 진행하며, 같은 작업을 다시 실행하면
+        완료하지 못한 청크만 처리
+
+        Returns:
+            dict: 작업 상태 (get_status와 동일)
+        """
+        if not self.db.ensure_tables():
+            self.status = "failed"
+            logger.error("백필 중단: 테이블을 준비할 수 없습니다")
+            return self.get_status()
+
+        chunks = self.plan()
+        self._done = self._load_checkpoint()
+        pending = [c for c in chunks if self._chunk_key(c) not in self._done]
+
+        self.status = "running"
+        self.started_at = datetime.now()
+        self.chunks_total = len(chunks)
+        self.chunks_resumed = len(chunks) - len(pending)
+        self.chunks_done = self.chunks_resumed
+        self.chunks_failed = 0
+        started = time.monotonic()
+        logger.info(
+            f"백필 {self.job_id} 시작: 심볼 {len(self.symbols)}개, {self.interval}, "
+            f"청크 {len(pending)}/{len(chunks)}개 (워커 {self.workers})"
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="backfill"
+        ) as executor:
+            futures = {executor.submit(self._run_chunk, c): c for c in pending}
+            for future in as_completed(futures):
+                symbol, start, end = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    with self._lock:
+                        self.chunks_failed += 1
+                    logger.error(
+                        f"백필 청크 실패 {symbol} "
+                        f"{start:%Y-%m-%d}~{end:%Y-%m-%d}: {e}"
+                    )
+
+        self.elapsed_seconds = time.monotonic() - started
+        self.finished_at = datetime.now()
+        if self.chunks_failed:
+            self.status = "failed"
+            logger.warning(
+                f"백필 {self.job_id} 일부 실패: 청크 {self.chunks_failed}개 "
+                f"(같은 요청을 다시 실행하면 이어서 진행)"
+            )
+        else:
+            self.status = "completed"
+            # 모두 완료한 작업의 체크포인트는 정리
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            logger.info(
+                f"백필 {self.job_id} 완료: {self.rows_inserted}행 적재, "
+                f"{self.elapsed_seconds:.2f}초"
+            )
+        return self.get_status()
+
+    def get_status(self) -> dict:
+        """
+        작업 상태 반환
+
+        Returns:
+            dict: 진행 청크 수, 조회/적재 행 수, 처리량(rows/sec)
+        """
+        with self._lock:
+            elapsed = self.elapsed_seconds
+            if self.status == "running" and self.started_at:
+                elapsed = (datetime.now() - self.started_at).total_seconds()
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "symbols": len(self.symbols),
+                "interval": self.interval,
+                "start": self.start.isoformat(),
+                "end": self.end.isoformat(),
+                "requested_start": self.requested_start.isoformat(),
+                "workers": self.workers,
+                "chunks_total": self.chunks_total,
+                "chunks_done": self.chunks_done,
+                "chunks_resumed": self.chunks_resumed,
+                "chunks_failed": self.chunks_failed,
+                "rows_fetched": self.rows_fetched,
+                "rows_inserted": self.rows_inserted,
+                "rows_per_second": round(self.rows_inserted / elapsed, 1) if elapsed else 0.0,
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+수집/저장/조회 경로 종단 간 벤치마크
+시뮬레이터 가격 소스와 SQLite 저장소를 사용해 MySQL/yfinance 없이 실행하며,
+결과를 JSON Lines(p50/p95/p99 지연, rows/sec)로 출력
+
+사용 예:
+    python benchmark.py
+    python benchmark.py --symbols 10,100,1000,10000 --table-rows 1000,1000000
+    python benchmark.py --output bench.jsonl --compare baseline.jsonl
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pymysql
+
+from database import DatabaseManager
+from price_source import SimulatedPriceSource
+from stock_data_collector import StockDataCollector
+
+logger = logging.getLogger(__name__)
+
+# SQLite용 스키마 (MySQL 스키마와 컬럼/인덱스 동일)
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS stock_prices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol VARCHAR(20) NOT NULL,
+        price DECIMAL(10, 4) NOT NULL,
+        timestamp DATETIME NOT NULL,
+        open_price DECIMAL(10, 4) NULL,
+        high_price DECIMAL(10, 4) NULL,
+        low_price DECIMAL(10, 4) NULL,
+        volume BIGINT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uniq_symbol_timestamp
+    ON stock_prices (symbol, timestamp)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_timestamp_symbol
+    ON stock_prices (timestamp, symbol)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stock_latest_prices (
+        symbol VARCHAR(20) NOT NULL PRIMARY KEY,
+        price DECIMAL(10, 4) NOT NULL,
+        timestamp DATETIME NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+SEED_BATCH_SIZE = 100_000
+
+
+class SQLiteCursor:
+    """pymysql 커서 인터페이스를 흉내 내는 SQLite 커서 어댑터"""
+
+    # DatabaseManager가 쓰는 MySQL 방언을 SQLite 문법으로 최소 변환
+    _REWRITES = [
+        (re.compile(r"%s"), "?"),
+        (re.compile(r"ON DUPLICATE KEY UPDATE"), "ON CONFLICT DO UPDATE SET"),
+        (re.compile(r"VALUES\((\w+)\)"), r"excluded.\1"),
+        (re.compile(r"\bGREATEST\("), "MAX("),
+        (re.compile(r"\bIF\("), "IIF("),
+    ]
+
+    def __init__(self, connection: sqlite3.Connection, as_dict: bool):
+        self._cursor = connection.cursor()
+        self._as_dict = as_dict
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def _translate(self, sql: str) -> str:
+        for pattern, replacement in self._REWRITES:
+            sql = pattern.sub(replacement, sql)
+        return sql
+
+    def execute(self, sql: str, params=None):
+        if sql.lstrip().upper().startswith("SET SESSION"):
+            # MySQL 세션 변수는 SQLite에 해당 없음
+            return None
+        return self._cursor.execute(self._translate(sql), params or ())
+
+    def executemany(self, sql: str, seq):
+        return self._cursor.executemany(self._translate(sql), seq)
+
+    def _convert(self, rows: list) -> list:
+        if not self._as_dict:
+            return rows
+        columns = [d[0] for d in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchall(self) -> list:
+        return self._convert(self._cursor.fetchall())
+
+    def fetchmany(self, size: int) -> list:
+        return self._convert(self._cursor.fetchmany(size))
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """DatabaseManager 연결 풀이 사용하는 pymysql 연결 인터페이스의 SQLite 어댑터"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self.open = True
+
+    def cursor(self, cursor_class=None) -> SQLiteCursor:
+        return SQLiteCursor(
+            self._conn,
+            as_dict=cursor_class is not None
+            and issubclass(cursor_class, pymysql.cursors.DictCursorMixin)
+        )
+
+    def ping(self, reconnect: bool = False):
+        self._conn.execute("SELECT 1")
+
+    def begin(self):
+        # sqlite3 모듈은 첫 DML에서 트랜잭션을 자동 시작
+        pass
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        # 하나의 SQLite 연결을 풀의 모든 래퍼가 공유하므로 실제로 닫지 않음
+        self.open = False
+
+
+def create_sqlite_manager(path: str) -> DatabaseManager:
+    """
+    SQLite 어댑터 연결을 사용하는 DatabaseManager 생성
+
+    Args:
+        path: SQLite 파일 경로 (':memory:' 가능)
+
+    Returns:
+        DatabaseManager: 스키마가 준비된 데이터베이스 매니저
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in SQLITE_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+    manager = DatabaseManager(connect_fn=lambda: SQLiteConnection(conn))
+    manager.tables_ready = True
+    # 집계 테이블 갱신 SQL은 MySQL 전용이므로 SQLite 벤치마크에서는 끔
+    manager.rollup_on_insert = False
+    return manager
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """정렬된 값의 nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(name: str, latencies: List[float], rows: int, **params) -> dict:
+    """
+    반복 측정 결과를 요약 레코드로 변환
+
+    Args:
+        name: 벤치마크 이름
+        latencies: 반복별 소요 시간(초)
+        rows: 반복 1회당 처리 행 수
+        params: 레코드에 포함할 파라미터
+
+    Returns:
+        dict: p50/p95/p99 지연(ms)과 rows/sec를 담은 레코드
+    """
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        "benchmark": name,
+        **params,
+        "iterations": len(values),
+        "rows": rows,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(total / len(values) * 1000, 3) if values else 0.0,
+        "rows_per_sec": round(rows * len(values) / total, 1) if total else 0.0,
+    }
+
+
+def measure(func: Callable[[], object], iterations: int) -> List[float]:
+    """함수를 반복 실행하며 회당 소요 시간(초) 측정"""
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def make_rows(symbols: List[str], start: datetime, step: int) -> List[tuple]:
+    """(symbol, price, timestamp) 행 생성"""
+    timestamp = (start + timedelta(seconds=step)).strftime('%Y-%m-%d %H:%M:%S')
+    return [(symbol, 100.0 + i % 100, timestamp) for i, symbol in enumerate(symbols)]
+
+
+def seed_table(manager: DatabaseManager, rows: int, symbol_count: int):
+    """
+    stock_prices 테이블을 지정한 행 수까지 채움 (심볼별 1분 간격)
+
+    Args:
+        manager: 대상 데이터베이스 매니저
+        rows: 목표 행 수
+        symbol_count: 사용할 심볼 수
+    """
+    symbols = SimulatedPriceSource.generate_symbols(symbol_count)
+    start = datetime(2020, 1, 1)
+    batch: List[tuple] = []
+    for i in range(rows):
+        minute, index = divmod(i, symbol_count)
+        timestamp = start + timedelta(minutes=minute)
+        batch.append((
+            symbols[index], 100.0 + index % 100,
+            timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        ))
+        if len(batch) >= SEED_BATCH_SIZE:
+            manager.bulk_insert_prices(batch)
+            batch = []
+    if batch:
+        manager.bulk_insert_prices(batch)
+
+
+def bench_collect_and_save(
+    symbol_counts: List[int], iterations: int, source_params: dict
+) -> List[dict]:
+    """시뮬레이터 소스 + SQLite로 collect_and_save 사이클 측정"""
+    results = []
+    for count in symbol_counts:
+        symbols = SimulatedPriceSource.generate_symbols(count)
+        manager = create_sqlite_manager(":memory:")
+        collector = StockDataCollector(
+            source=SimulatedPriceSource(**source_params), db=manager
+        )
+        latencies = measure(
+            lambda: asyncio.run(collector.collect_and_save(symbols=symbols)),
+            iterations
+        )
+        collector.close()
+        manager.disconnect()
+        results.append(
+            summarize("collect_and_save", latencies, count, symbols=count)
+        )
+    return results
+
+
+def bench_bulk_insert(symbol_counts: List[int], iterations: int) -> List[dict]:
+    """배치 크기(=심볼 수)별 bulk_insert_prices 측정"""
+    results = []
+    for count in symbol_counts:
+        symbols = SimulatedPriceSource.generate_symbols(count)
+        manager = create_sqlite_manager(":memory:")
+        start = datetime(2024, 1, 1)
+        steps = iter(range(iterations))
+        latencies = measure(
+            lambda: manager.bulk_insert_prices(
+                make_rows(symbols, start, next(steps) * 60)
+            ),
+            iterations
+        )
+        manager.disconnect()
+        results.append(
+            summarize("bulk_insert_prices", latencies, count, symbols=count)
+        )
+    return results
+
+
+def bench_queries(
+    table_sizes: List[int],
+    iterations: int,
+    symbol_count: int,
+    history_limit: int,
+    workdir: str
+) -> List[dict]:
+    """테이블 크기별 get_latest_prices / get_price_history / 스트리밍 첫 청크 측정"""
+    results = []
+    for rows in table_sizes:
+        path = os.path.join(workdir, f"bench_{rows}.sqlite3")
+        manager = create_sqlite_manager(path)
+        seed_start = time.perf_counter()
+        seed_table(manager, rows, min(symbol_count, rows))
+        logger.info(f"{rows}행 시드 완료: {time.perf_counter() - seed_start:.1f}초")
+        subset = SimulatedPriceSource.generate_symbols(min(10, symbol_count))
+
+        def first_stream_batch() -> list:
+            # 스트리밍 첫 청크까지의 지연 (나머지는 읽지 않고 중단)
+            batches = manager.iter_price_history()
+            try:
+                return next(batches, [])
+            finally:
+                batches.close()
+
+        cases: Dict[str, Callable[[], list]] = {
+            "get_latest_prices": lambda: manager.get_latest_prices(),
+            "get_latest_prices_filtered": (
+                lambda: manager.get_latest_prices(subset)
+            ),
+            "get_price_history": (
+                lambda: manager.get_price_history(limit=history_limit)
+            ),
+            "get_price_history_filtered": (
+                lambda: manager.get_price_history(subset, limit=history_limit)
+            ),
+            "iter_price_history_first_batch": first_stream_batch,
+        }
+        for name, func in cases.items():
+            returned = len(func())
+            latencies = measure(func, iterations)
+            results.append(
+                summarize(name, latencies, returned, table_rows=rows)
+            )
+        manager.disconnect()
+        os.remove(path)
+    return results
+
+
+def compare_results(
+    results: List[dict], baseline_path: str, threshold: float
+) -> List[str]:
+    """
+    기준 결과 대비 p95 지연 회귀 검사
+
+    Args:
+        results: 이번 측정 결과
+        baseline_path: 기준 JSON Lines 파일 경로
+        threshold: 허용 증가율 (0.2 = 20%)
+
+    Returns:
+        List[str]: 회귀 설명 리스트 (없으면 빈 리스트)
+    """
+    def key(record: dict) -> tuple:
+        return (
+            record["benchmark"],
+            record.get("symbols"),
+            record.get("table_rows"),
+        )
+
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {key(r): r for r in map(json.loads, f) if r}
+
+    regressions = []
+    for record in results:
+        base = baseline.get(key(record))
+        if not base or not base["p95_ms"]:
+            continue
+        ratio = record["p95_ms"] / base["p95_ms"]
+        if ratio > 1.0 + threshold:
+            regressions.append(
+                f"{key(record)}: p95 {base['p95_ms']}ms → "
+                f"{record['p95_ms']}ms (x{ratio:.2f})"
+            )
+    return regressions
+
+
+def parse_int_list(value: str) -> List[int]:
+    """쉼표 구분 정수 리스트 파싱 (1k/1m 접미사 허용)"""
+    result = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        multiplier = 1
+        if item.endswith("k"):
+            multiplier, item = 1_000, item[:-1]
+        elif item.endswith("m"):
+            multiplier, item = 1_000_000, item[:-1]
+        result.append(int(float(item) * multiplier))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """벤치마크 CLI 진입점"""
+    parser = argparse.ArgumentParser(description="수집/저장/조회 벤치마크")
+    parser.add_argument("--symbols", type=parse_int_list,
+                        default=parse_int_list("10,100,1k,10k"),
+                        help="심볼 수 목록 (collect_and_save/bulk_insert)")
+    parser.add_argument("--table-rows", type=parse_int_list,
+                        default=parse_int_list("1k,100k,1m"),
+                        help="테이블 크기 목록 (조회 벤치마크, 최대 50m 권장)")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="측정 반복 횟수")
+    parser.add_argument("--query-symbols", type=int, default=500,
+                        help="조회 벤치마크 테이블의 심볼 수")
+    parser.add_argument("--history-limit", type=int, default=200,
+                        help="get_price_history limit")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="시뮬레이터 요청 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--empty-rate", type=float, default=0.05)
+    parser.add_argument("--only", choices=["collect", "insert", "query"],
+                        action="append", help="실행할 벤치마크 그룹")
+    parser.add_argument("--output", help="결과 JSON Lines 파일 (기본 stdout)")
+    parser.add_argument("--compare", help="회귀 비교 기준 JSON Lines 파일")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="허용 p95 증가율 (기본 0.2)")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(),
+                        help="조회 벤치마크용 SQLite 파일 위치")
+    args = parser.parse_args(argv)
+
+    # 수집기 INFO/WARNING 로그가 측정을 방해하지 않도록 억제
+    logging.getLogger().setLevel(logging.ERROR)
+    logger.setLevel(logging.INFO)
+
+    groups = set(args.only or ["collect", "insert", "query"])
+    source_params = {
+        "latency": args.latency,
+        "failure_rate": args.failure_rate,
+        "empty_rate": args.empty_rate,
+    }
+
+    results: List[dict] = []
+    if "collect" in groups:
+        results += bench_collect_and_save(
+            args.symbols, args.iterations, source_params
+        )
+    if "insert" in groups:
+        results += bench_bulk_insert(args.symbols, args.iterations)
+    if "query" in groups:
+        results += bench_queries(
+            args.table_rows, args.iterations, args.query_symbols,
+            args.history_limit, args.workdir
+        )
+
+    lines = "\n".join(json.dumps(r, ensure_ascii=False) for r in results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(lines + "\n")
+    else:
+        print(lines)
+
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"회귀 감지: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,9 +11,25 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'your_password'),
     'db': os.getenv('DB_NAME', 'stocks'),
     'charset': 'utf8mb4',
-    'autocommit': True
+    'autocommit': True,
+    # 백필 LOAD DATA LOCAL INFILE 경로 사용 시 필요 (서버 local_infile=ON 필요)
+    'local_infile': os.getenv('DB_LOCAL_INFILE', 'false').lower() == 'true'
 }
 
+# 데이터베이스 연결 풀 설정
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_POOL_TIMEOUT = 10.0  # 초, 연결 체크아웃 대기 최대 시간
+DB_POOL_PING_INTERVAL = 30.0  # 초, 이 시간 이상 유휴였던 연결은 ping 후 사용
+DB_RECONNECT_BACKOFF_BASE = 1.0  # 초, 연결 실패 후 첫 재시도 대기
+DB_RECONNECT_BACKOFF_MAX = 60.0  # 초, 재시도 대기 상한
+DB_UPSERT_BATCH_ROWS = 1000  # 행, 다중 행 upsert 1문당 최대 행 수
+# /prices/history/stream: 서버 측 커서에서 한 번에 읽어 응답 청크 하나로 보낼 행 수
+HISTORY_STREAM_FETCH_ROWS = 1000
+# 스트리밍 중 느린 클라이언트 때문에 서버가 결과 전송을 끊지 않도록 늘리는 net_write_timeout(초)
+HISTORY_STREAM_NET_WRITE_TIMEOUT = 600
+# 내보내기(/export, manage.py export): 서버 측 커서에서 한 번에 읽어 레코드 배치/행 그룹 하나로 인코딩할 행 수
+EXPORT_FETCH_ROWS = 50000
+
 # 주식 심볼 및 거래소 정보
 SYMBOL_MARKET: Dict[str, str] = {
     # 한국 종목 전환
@@ -36,23 +52,197 @@ TARGET_SYMBOLS: List[str] = [
 ]
 
 # 거래소별 개장 시간 (ET/KST)
+# pre_open/post_close: 시간외 세션 (MARKET_EXTENDED_HOURS=true일 때만 세션에 포함)
 MARKET_HOURS = {
     'US': {
         'timezone': 'US/Eastern',
         'open_time': '09:30',
-        'close_time': '16:00'
+        'close_time': '16:00',
+        'pre_open': '04:00',
+        'post_close': '20:00'
     },
     'KR': {
         'timezone': 'Asia/Seoul', 
         'open_time': '09:00',
-        'close_time': '15:30'
+        'close_time': '15:30',
+        'pre_open': '08:30',
+        'post_close': '18:00'
     }
 }
+MARKET_EXTENDED_HOURS = os.getenv('MARKET_EXTENDED_HOURS', 'false').lower() == 'true'
+
+# 거래소 휴장일 (주말 제외, 거래소 공지 기준으로 매년 갱신)
+MARKET_HOLIDAYS: Dict[str, List[str]] = {
+    'US': [
+        '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25',
+        '2026-06-19', '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25',
+        '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31',
+        '2027-06-18', '2027-07-05', '2027-09-06', '2027-11-25', '2027-12-24',
+    ],
+    'KR': [
+        '2026-01-01', '2026-02-16', '2026-02-17', '2026-02-18', '2026-03-02',
+        '2026-05-01', '2026-05-05', '2026-05-25', '2026-06-03', '2026-08-17',
+        '2026-09-24', '2026-09-25', '2026-10-05', '2026-10-09', '2026-12-25',
+        '2026-12-31',
+        '2027-01-01', '2027-02-08', '2027-02-09', '2027-03-01', '2027-05-05',
+        '2027-05-13', '2027-08-16', '2027-09-14', '2027-09-15', '2027-09-16',
+        '2027-10-04', '2027-10-11', '2027-12-27', '2027-12-31',
+    ],
+}
+# 정규장 시간이 다른 날 (단축 거래일, 연초 개장일/수능일 지연 개장): 날짜 → (개장, 폐장)
+MARKET_SPECIAL_SESSIONS: Dict[str, Dict[str, tuple]] = {
+    'US': {
+        '2026-11-27': ('09:30', '13:00'),
+        '2026-12-24': ('09:30', '13:00'),
+        '2027-11-26': ('09:30', '13:00'),
+    },
+    'KR': {
+        '2026-01-02': ('10:00', '15:30'),
+        '2026-11-19': ('10:00', '16:30'),
+        '2027-01-04': ('10:00', '15:30'),
+    },
+}
 
 # 데이터 수집 설정
 DATA_COLLECTION_INTERVAL = 60  # 초 (1분)
+# 거래소 달력 기반 스케줄링: 대상 종목의 거래소가 모두 닫혀 있으면 다음 개장까지 대기
+MARKET_CALENDAR_ENABLED = True
+CLOSED_MARKET_HEARTBEAT = 3600  # 초, 장 마감 중 전체 종목 확인 수집 주기 (0이면 비활성화)
+# 수집 스케줄: 이름 → {'market': 거래소 코드 또는 'symbols': 심볼 리스트, 'interval': 초, 'phase': 초}
+# 비어 있으면 TARGET_SYMBOLS를 SYMBOL_MARKET 거래소별 스케줄로 나누고 위상을 주기 안에 고르게 분산
+# (interval 생략 시 DATA_COLLECTION_INTERVAL, phase 생략 시 자동 분산)
+COLLECTION_SCHEDULES: Dict[str, dict] = {}
+SCHEDULE_JITTER = 5.0  # 초, 사이클 시작 시각에 더하는 무작위 지연 상한 (스케줄끼리 사이클 시작이 겹치지 않게 함)
+# 사이클 안의 배치 청크 요청 시작 시각을 (주기 × 비율) 창에 고르게 나눔 (0이면 모든 청크를 동시에 시작)
+# 창은 마지막 청크도 청크 제한 시간(COLLECTOR_BATCH_TIMEOUT) 안에 사이클 마감 전 끝날 수 있도록 줄어듦
+CHUNK_DISPATCH_SPREAD = float(os.getenv('CHUNK_DISPATCH_SPREAD', '0.5'))
+# 사이클 마감: 시작 후 (주기 × 비율)까지 끝난 종목만 저장하고, 조회 중인 종목은 기다리지 않음
+CYCLE_DEADLINE_RATIO = 0.8
+# 마감까지 끝내지 못한 종목: 'defer'(다음 사이클에 먼저 조회) 또는 'cancel'(이번 주기 건너뜀)
+CYCLE_DEFER_POLICY = os.getenv('CYCLE_DEFER_POLICY', 'defer')
+# 변동성 적응형 폴링: 스케줄 설정의 'adaptive'(기본값 ADAPTIVE_POLLING_ENABLED)가 켜진 스케줄은
+# 종목별 실현 변동성에 따라 하한~상한 사이 주기로 조회하고, 전체 조회 수는 분당 예산으로 제한
+ADAPTIVE_POLLING_ENABLED = os.getenv('ADAPTIVE_POLLING_ENABLED', 'false').lower() == 'true'
+ADAPTIVE_MIN_INTERVAL = 10.0  # 초, 조회 주기 하한
+ADAPTIVE_MAX_INTERVAL = 300.0  # 초, 조회 주기 상한
+ADAPTIVE_TARGET_MOVE = 0.001  # 조회 간 기대 변동폭 목표 (로그 수익률, 0.1%)
+ADAPTIVE_JUMP_MOVE = 0.005  # 직전 틱 변동폭이 이 이상이면 바로 하한 주기 적용 (0.5%)
+ADAPTIVE_WINDOW = 20  # 변동성 계산에 쓰는 최근 수익률 개수
+# 분당 최대 종목 조회 수 (0이면 적응형 스케줄을 고정 주기로 돌릴 때와 같은 예산)
+ADAPTIVE_REQUEST_BUDGET = int(os.getenv('ADAPTIVE_REQUEST_BUDGET', '0'))
 YFINANCE_PERIOD = "1d"
 YFINANCE_INTERVAL = "1m"
+# 가격 데이터 소스: 'yfinance' 또는 'simulated'(오프라인 랜덤 워크)
+PRICE_SOURCE = os.getenv('PRICE_SOURCE', 'yfinance')
+SIMULATOR_SEED = 42
+SIMULATOR_LATENCY = 0.05  # 초, 요청 1회당 지연
+SIMULATOR_FAILURE_RATE = 0.01  # 요청 실패 확률
+SIMULATOR_EMPTY_RATE = 0.05  # 빈 응답 확률
+
+# 수집 모드: 'close'(사이클마다 마지막 종가 1행, 서버 시각)
+#           'ohlcv'(같은 요청으로 받은 봉 중 새 봉 전체를 거래소 시각으로 저장)
+INGEST_MODE = os.getenv('INGEST_MODE', 'close')
+# OHLCV 모드 증분 조회: 마지막 저장 봉 이후만 요청 (콜드 스타트/공백 감지 시 전체 기간)
+INCREMENTAL_FETCH_ENABLED = True
+INCREMENTAL_START_ALIGN = 5  # 분, 시작 시각을 이 단위로 내림해 같은 요청으로 묶음
+INCREMENTAL_MAX_GAP = 30  # 분, 마지막 봉이 이보다 오래되면 공백으로 보고 전체 기간 요청
+
+# 배치 수집: 1분봉을 다중 종목 요청으로 묶어 왕복 횟수 감소
+YFINANCE_BATCH_ENABLED = True
+YFINANCE_BATCH_SIZE = 50  # 요청 1회당 최대 종목 수
+
+# 수집 워커 풀 설정 (yfinance 블로킹 호출을 이벤트 루프 밖에서 실행)
+COLLECTOR_MAX_WORKERS = int(os.getenv('COLLECTOR_MAX_WORKERS', '16'))
+COLLECTOR_MAX_CONCURRENCY = int(os.getenv('COLLECTOR_MAX_CONCURRENCY', '8'))
+COLLECTOR_SYMBOL_TIMEOUT = 20.0  # 초, 심볼별 폴백 경로 제한 시간
+COLLECTOR_BATCH_TIMEOUT = 30.0  # 초, 배치 청크별 제한 시간
+
+# 폴백 단계 학습 캐시: 심볼별 마지막 성공 단계부터 조회 시작
+TIER_CACHE_ENABLED = True
+TIER_CACHE_TTL = 1800  # 초, 학습된 단계 유효 시간
+TIER_REPROBE_EVERY = 10  # 학습된 단계 N회 사용마다 저렴한 단계부터 재탐색
+
+# write-behind 버퍼: 수집과 DB 저장을 분리해 겹쳐 실행
+WRITE_BEHIND_ENABLED = True
+WRITE_BUFFER_BATCH_SIZE = 1000  # 행, 이만큼 쌓이면 즉시 저장
+WRITE_BUFFER_MAX_AGE = 2.0  # 초, 가장 오래된 틱의 최대 대기 시간
+WRITE_BUFFER_CAPACITY = 100000  # 행, 큐 최대 크기
+WRITE_BUFFER_POLICY = os.getenv('WRITE_BUFFER_POLICY', 'block')  # 'block' 또는 'coalesce'
+WRITE_BUFFER_RETRY_DELAY = 5.0  # 초, 저장 실패 후 재시도 대기
+WRITE_BUFFER_BLOCK_TIMEOUT = 10.0  # 초, 'block' 정책 최대 대기 (넘으면 'coalesce'처럼 병합)
+
+# 로컬 스풀: DB 장애 중 틱을 디스크에 보관 후 재연결 시 재생
+SPOOL_ENABLED = True
+SPOOL_DIR = os.getenv('SPOOL_DIR', 'spool')
+SPOOL_SEGMENT_BYTES = 16 * 1024 * 1024  # 바이트, 세그먼트 교체 기준
+SPOOL_FSYNC_INTERVAL = 1.0  # 초, fsync 묶음 주기
+SPOOL_FSYNC_BYTES = 1024 * 1024  # 바이트, fsync 묶음 크기
+SPOOL_REPLAY_BATCH_SIZE = 5000  # 행, 재생 배치 크기
+SPOOL_REPLAY_RATE = 20000  # 초당 최대 재생 행 수 (0이면 제한 없음)
+
+# 새 틱 푸시 (WebSocket /ws/prices, SSE /prices/stream)
+BROADCAST_QUEUE_SIZE = 64  # 메시지, 구독자별 대기 큐 최대 길이
+# 큐가 가득 찼을 때 정책: 'drop_oldest'(가장 오래된 메시지 삭제) 또는
+# 'coalesce'(대기 중 틱을 심볼별 최신 값 하나로 합침)
+BROADCAST_POLICY = os.getenv('BROADCAST_POLICY', 'coalesce')
+BROADCAST_MAX_SUBSCRIBERS = 1000  # 동시 구독자 상한
+BROADCAST_KEEPALIVE = 15.0  # 초, 새 틱이 없을 때 SSE 주석/WebSocket 핑 전송 주기
+
+# 과거 데이터 백필: 인터벌별 yfinance 조회 한도에 맞춰 구간을 나눠 벌크 적재
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', '4'))
+BACKFILL_INSERT_BATCH = 4000  # 행, 다중 행 INSERT 1문당 최대 행 수
+BACKFILL_LOAD_DATA = DB_CONFIG['local_infile']  # LOAD DATA LOCAL INFILE 적재 사용
+BACKFILL_MAX_RETRIES = 3  # 청크별 조회 재시도 횟수
+BACKFILL_CHECKPOINT_DIR = os.getenv('BACKFILL_CHECKPOINT_DIR', 'backfill')
+# 인터벌별 (요청 1회 최대 일수, 조회 가능한 과거 일수 - None이면 제한 없음)
+BACKFILL_INTERVAL_LIMITS = {
+    '1m': (7, 30),
+    '2m': (60, 60),
+    '5m': (60, 60),
+    '15m': (60, 60),
+    '30m': (60, 60),
+    '60m': (730, 730),
+    '90m': (60, 60),
+    '1h': (730, 730),
+    '1d': (3650, None),
+}
+
+# 파티션 관리: stock_prices를 일 단위 RANGE 파티션으로 나누고
+# 만료된 원본(1분) 파티션은 집계 테이블로 다운샘플링한 뒤 통째로 삭제
+PARTITION_PRECREATE_DAYS = 7  # 일, 미리 만들어 둘 미래 파티션 수
+# 해상도별 보존 기간(일) - 'raw'는 stock_prices 원본, None이면 영구 보존
+RETENTION_DAYS = {
+    'raw': int(os.getenv('RETENTION_RAW_DAYS', '30')),
+    '5m': 180,
+    '1h': 730,
+    '1d': None,
+}
+# 집계 테이블 해상도 (stock_prices_<해상도>) - 작은 해상도부터, 각 해상도는 바로 앞 해상도에서 집계
+ROLLUP_RESOLUTIONS: List[str] = ['5m', '1h', '1d']
+ROLLUP_LOOKBACK_DAYS = 1  # 일, 매 실행마다 다시 집계할 최근 완료 일수
+ROLLUP_PURGE_BATCH = 10000  # 행, 집계 테이블 보존 기간 삭제 1문당 최대 행 수
+ROLLUP_ON_INSERT = True  # 저장 트랜잭션에서 배치가 걸친 집계 봉을 다시 계산
+ROLLUP_ON_INSERT_MAX_SPAN = 3600  # 초, 심볼별 배치 시각 범위가 이보다 길면 저장 시 집계를 관리 작업으로 미룸
+# /prices/ohlc: start 생략 시 조회 기간(일), 응답 최대 행 수
+OHLC_DEFAULT_LOOKBACK_DAYS = {'1m': 1, '5m': 5, '1h': 30, '1d': 365}
+OHLC_MAX_ROWS = 100000
+MAINTENANCE_ENABLED = True
+MAINTENANCE_INTERVAL = 3600  # 초, 파티션 관리 작업 주기
+
+# /metrics (Prometheus 텍스트 형식) 계측
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# 히스토그램 버킷 상한 - 지연 시간(초), 배치 크기(행)
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+METRICS_BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# 온디맨드 프로파일링 (/profile) - 켜야 관리 엔드포인트와 라우트 미들웨어 등록
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILE_SAMPLE_INTERVAL = 0.005  # 초, 스택 샘플링 주기
+PROFILE_MAX_DEPTH = 128  # 프레임, 샘플당 최대 스택 깊이
+PROFILE_MAX_CAPTURES = 100  # 한 번에 무장할 수 있는 최대 사이클/요청 수
+PROFILE_MAX_SESSIONS = 10  # 결과를 보관할 최근 프로파일 세션 수
 
 # FastAPI 설정
 API_HOST = "0.0.0.0"
@@ -1,114 +1,1233 @@
 """
-MySQL 데이터베이스 연결 및 테이블 관리
+MySQL 데이터베이스 연결 풀 및 테이블 관리
 """
 import pymysql
+import base64
+import csv
+import json
 import logging
-from typing import List, Tuple, Optional
-from config import DB_CONFIG
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Deque, Dict, Iterator, List, Tuple, Optional
+from config import (
+    DB_CONFIG,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_PING_INTERVAL,
+    DB_RECONNECT_BACKOFF_BASE,
+    DB_RECONNECT_BACKOFF_MAX,
+    DB_UPSERT_BATCH_ROWS,
+    HISTORY_STREAM_FETCH_ROWS,
+    HISTORY_STREAM_NET_WRITE_TIMEOUT,
+    EXPORT_FETCH_ROWS,
+    BACKFILL_INSERT_BATCH,
+    PARTITION_PRECREATE_DAYS,
+    RETENTION_DAYS,
+    ROLLUP_RESOLUTIONS,
+    ROLLUP_PURGE_BATCH,
+    ROLLUP_ON_INSERT,
+    ROLLUP_ON_INSERT_MAX_SPAN,
+    OHLC_DEFAULT_LOOKBACK_DAYS,
+    OHLC_MAX_ROWS,
+)
+from metrics import db_insert_rows, db_insert_seconds
+from profiling import profiler
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 연결 자체가 끊어졌음을 뜻하는 예외 (해당 연결은 폐기)
+CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+
+# 종가(price) 외 봉 컬럼 - 마지막 봉 수집 모드로 저장한 행은 NULL
+OHLCV_COLUMNS = [
+    ('volume', 'BIGINT NULL'),
+    ('low_price', 'DECIMAL(10, 4) NULL'),
+    ('high_price', 'DECIMAL(10, 4) NULL'),
+    ('open_price', 'DECIMAL(10, 4) NULL'),
+]
+
+# stock_prices 삽입 컬럼 순서 (행 튜플 순서와 동일)
+INSERT_COLUMNS = "symbol, price, timestamp, open_price, high_price, low_price, volume"
+
+# (symbol, timestamp) 유니크 키 - 같은 틱/봉을 다시 저장하면 갱신 또는 건너뜀
+UNIQUE_KEY = "uniq_symbol_timestamp"
+
+# 히스토리 조회 인덱스 - ORDER BY timestamp DESC, symbol DESC를 정렬 없이 역방향 탐색
+HISTORY_INDEX = "idx_timestamp_symbol"
+
+# 같은 (symbol, timestamp) 재저장 시 값이 달라진 경우에만 갱신 (같으면 영향 행 0 → 건너뜀)
+UPSERT_SQL = f"""
+INSERT INTO stock_prices ({INSERT_COLUMNS})
+VALUES {{values}}
+ON DUPLICATE KEY UPDATE
+    price = VALUES(price),
+    open_price = COALESCE(VALUES(open_price), open_price),
+    high_price = COALESCE(VALUES(high_price), high_price),
+    low_price = COALESCE(VALUES(low_price), low_price),
+    volume = COALESCE(VALUES(volume), volume)
+"""
+
+# 다중 행 INSERT/LOAD DATA 결과 정보 문자열 (예: "Records: 3  Duplicates: 1  Warnings: 0")
+INFO_PATTERN = re.compile(r"(Records|Duplicates|Skipped): (\d+)")
+
+# 상한이 없는 마지막 파티션 (미래 파티션은 여기서 나눠 추가)
+MAXVALUE_PARTITION = "pmax"
+
+# 집계 해상도별 (버킷 길이, 버킷 시작 시각 식 - 원본 시각 ts 기준)
+ROLLUP_BUCKETS = {
+    '5m': (timedelta(minutes=5),
+           "ts - INTERVAL MOD(MINUTE(ts), 5) MINUTE - INTERVAL SECOND(ts) SECOND"),
+    '1h': (timedelta(hours=1), "DATE_FORMAT(ts, '%%Y-%%m-%%d %%H:00:00')"),
+    '1d': (timedelta(days=1), "CAST(DATE(ts) AS DATETIME)"),
+}
+
+# 집계 원본: 첫 해상도는 stock_prices (종가만 있는 행은 price를 시가/고가/저가로 사용),
+# 이후 해상도는 바로 아래 해상도의 집계 테이블
+RAW_ROLLUP_SOURCE = """
+SELECT symbol, timestamp AS ts,
+       COALESCE(open_price, price) AS open_price,
+       COALESCE(high_price, price) AS high_price,
+       COALESCE(low_price, price) AS low_price,
+       price AS close_price, volume, 1 AS tick_count
+FROM stock_prices
+WHERE {where}
+"""
+
+TABLE_ROLLUP_SOURCE = """
+SELECT symbol, bucket AS ts, open_price, high_price, low_price, close_price,
+       volume, tick_count
+FROM stock_prices_{resolution}
+WHERE {where}
+"""
+
+# 원본 구간의 버킷을 다시 계산해 덮어씀 (같은 구간을 다시 집계해도 결과가 같음)
+# 시가/종가는 GROUP_CONCAT 정렬 결과의 첫 값
+ROLLUP_SQL = """
+INSERT INTO stock_prices_{resolution}
+    (symbol, bucket, open_price, high_price, low_price, close_price, volume, tick_count)
+SELECT
+    symbol,
+    {bucket} AS bucket,
+    SUBSTRING_INDEX(GROUP_CONCAT(open_price ORDER BY ts), ',', 1),
+    MAX(high_price),
+    MIN(low_price),
+    SUBSTRING_INDEX(GROUP_CONCAT(close_price ORDER BY ts DESC), ',', 1),
+    SUM(volume),
+    SUM(tick_count)
+FROM ({source}) src
+GROUP BY symbol, bucket
+ON DUPLICATE KEY UPDATE
+    open_price = VALUES(open_price),
+    high_price = VALUES(high_price),
+    low_price = VALUES(low_price),
+    close_price = VALUES(close_price),
+    volume = VALUES(volume),
+    tick_count = VALUES(tick_count)
+"""
+
+
+def full_rows(data: List[tuple]) -> List[tuple]:
+    """
+    (symbol, price, timestamp[, open, high, low, volume]) 행을 7개 필드로 맞춤
+    종가만 있는 행은 봉 필드를 None(NULL)으로 채움
+    """
+    return [tuple(row) + (None,) * (7 - len(row)) for row in data]
+
+
+def encode_history_cursor(row: dict) -> str:
+    """히스토리 행의 (timestamp, symbol)을 다음 페이지 커서 문자열로 인코딩"""
+    payload = json.dumps([str(row["timestamp"]), row["symbol"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(token: str) -> Tuple[str, str]:
+    """
+    커서 문자열을 (timestamp, symbol)로 복원
+
+    Raises:
+        ValueError: 형식이 잘못된 커서
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, symbol = json.loads(base64.urlsafe_b64decode(padded))
+        return str(timestamp), str(symbol)
+    except Exception as e:
+        raise ValueError(f"잘못된 커서: {token}") from e
+
+
+def floor_bucket(value: datetime, step: timedelta) -> datetime:
+    """시각이 속한 버킷의 시작 시각 (버킷은 자정 기준으로 정렬)"""
+    day_start = datetime.combine(value.date(), datetime.min.time())
+    return day_start + (value - day_start) // step * step
+
+
+def touched_bucket_ranges(
+    times_by_symbol: Dict[str, List[datetime]], step: timedelta
+) -> List[Tuple[datetime, datetime, List[str]]]:
+    """
+    심볼별 시각들이 걸친 버킷을 (시작, 끝, 심볼) 구간으로 묶음
+    연속된 버킷은 심볼 집합이 같을 때만 한 구간으로 합침
+
+    Args:
+        times_by_symbol: 심볼별 저장 시각
+        step: 버킷 길이
+
+    Returns:
+        List[Tuple[datetime, datetime, List[str]]]: 시각순 [시작, 끝) 구간과 대상 심볼
+    """
+    buckets: Dict[datetime, set] = defaultdict(set)
+    for symbol, timestamps in times_by_symbol.items():
+        for timestamp in timestamps:
+            buckets[floor_bucket(timestamp, step)].add(symbol)
+    ranges: List[Tuple[datetime, datetime, List[str]]] = []
+    for low in sorted(buckets):
+        symbols = sorted(buckets[low])
+        if ranges and ranges[-1][1] == low and ranges[-1][2] == symbols:
+            ranges[-1] = (ranges[-1][0], low + step, symbols)
+        else:
+            ranges.append((low, low + step, symbols))
+    return ranges
+
+
+def to_days(day: date) -> int:
+    """MySQL TO_DAYS()와 같은 일 번호"""
+    return day.toordinal() + 365
+
+
+def partition_name(day: date) -> str:
+    """해당 날짜의 행을 담는 파티션 이름"""
+    return f"p{day:%Y%m%d}"
+
+
+def partition_clause(days: List[date]) -> str:
+    """날짜별 파티션 정의 + 상한 없는 pmax 파티션 (PARTITION BY RANGE 본문)"""
+    parts = [
+        f"PARTITION {partition_name(day)} VALUES LESS THAN "
+        f"({to_days(day + timedelta(days=1))})"
+        for day in sorted(days)
+    ]
+    parts.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE")
+    return ",\n".join(parts)
+
+
+class PoolUnavailableError(Exception):
+    """연결 풀에서 연결을 얻을 수 없음 (재연결 대기 중 또는 대기 시간 초과)"""
+
+
+class ConnectionPool:
+    """
+    스레드 안전 pymysql 연결 풀
+    체크아웃 시 유휴 연결 생존 확인, 연결 실패 시 지수 백오프로 재연결
+    """
+    
+    def __init__(
+        self,
+        connect_fn: Callable[[], object],
+        size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        ping_interval: float = DB_POOL_PING_INTERVAL,
+        backoff_base: float = DB_RECONNECT_BACKOFF_BASE,
+        backoff_max: float = DB_RECONNECT_BACKOFF_MAX
+    ):
+        """
+        Args:
+            connect_fn: 새 연결을 생성하는 함수
+            size: 최대 연결 수
+            timeout: 체크아웃 대기 최대 시간(초)
+            ping_interval: 이 시간(초) 이상 유휴였던 연결은 체크아웃 시 ping
+            backoff_base: 연결 실패 시 첫 재시도 대기(초)
+            backoff_max: 재시도 대기 상한(초)
+        """
+        self.connect_fn = connect_fn
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        # (연결, 반납 시각) - 최근 반납 연결부터 재사용
+        self._idle: Deque[Tuple[object, float]] = deque()
+        self._cond = threading.Condition()
+        self._created = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+        
+        # 재연결 백오프 상태
+        self._failures = 0
+        self._next_attempt = 0.0
+        
+        # 통계
+        self._checkouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._connects = 0
+        self._connect_failures = 0
+        self._discarded = 0
+    
+    def _open_connection(self):
+        """새 연결 생성 (백오프 대기 중이면 즉시 실패)"""
+        now = time.monotonic()
+        if now < self._next_attempt:
+            raise PoolUnavailableError(
+                f"재연결 대기 중 ({self._next_attempt - now:.1f}초 남음)"
+            )
+        try:
+            conn = self.connect_fn()
+        except Exception as e:
+            with self._cond:
+                self._failures += 1
+                self._connect_failures += 1
+                delay = min(
+                    self.backoff_base * (2 ** (self._failures - 1)),
+                    self.backoff_max
+                )
+                self._next_attempt = time.monotonic() + delay
+            logger.error(f"데이터베이스 연결 실패 (다음 시도 {delay:.1f}초 후): {e}")
+            raise PoolUnavailableError(str(e)) from e
+        with self._cond:
+            if self._failures:
+                logger.info("데이터베이스 재연결 성공")
+            self._failures = 0
+            self._next_attempt = 0.0
+            self._connects += 1
+        return conn
+    
+    def _is_alive(self, conn, idle_since: float) -> bool:
+        """오래 유휴였던 연결만 ping으로 생존 확인"""
+        if time.monotonic() - idle_since < self.ping_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+    
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def acquire(self):
+        """
+        연결 체크아웃
+        
+        Returns:
+            연결 객체
+        
+        Raises:
+            PoolUnavailableError: 대기 시간 초과 또는 연결 생성 실패
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolUnavailableError("연결 풀이 닫혀 있습니다")
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolUnavailableError(
+                            f"연결 대기 시간 초과 ({self.timeout}초)"
+                        )
+                    self._waiters += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    conn, idle_since = None, 0.0
+                    self._created += 1
+                self._in_use += 1
+            
+            if conn is not None and not self._is_alive(conn, idle_since):
+                # 끊어진 유휴 연결 폐기 후 새 연결로 대체
+                self._close_quietly(conn)
+                with self._cond:
+                    self._discarded += 1
+                conn = None
+            
+            if conn is None:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    self._forget()
+                    raise
+            
+            waited = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            return conn
+    
+    def _forget(self, discarded: bool = False):
+        """체크아웃 슬롯 반환 (연결 폐기/생성 실패 시)"""
+        with self._cond:
+            if discarded:
+                self._discarded += 1
+            self._created -= 1
+            self._in_use -= 1
+            self._cond.notify()
+    
+    def release(self, conn, broken: bool = False):
+        """
+        연결 반납
+        
+        Args:
+            conn: 반납할 연결
+            broken: 연결 오류가 발생했으면 True (연결 폐기)
+        """
+        if broken or self._closed:
+            self._close_quietly(conn)
+            self._forget(discarded=broken)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+    
+    @contextmanager
+    def connection(self) -> Iterator[object]:
+        """연결 체크아웃/반납 컨텍스트 매니저 (연결 오류 시 폐기)"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            self.release(conn, broken=True)
+            raise
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                self.release(conn, broken=True)
+                raise
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+    
+    def close(self):
+        """유휴 연결을 모두 닫고 풀 종료"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+    
+    @property
+    def available(self) -> bool:
+        """재연결 백오프 대기 중이 아니면 True"""
+        return not self._closed and time.monotonic() >= self._next_attempt
+    
+    def get_stats(self) -> dict:
+        """
+        풀 통계 반환
+        
+        Returns:
+            dict: 사용 중/유휴/대기자 수, 대기 시간, 연결 생성/실패 횟수
+        """
+        with self._cond:
+            return {
+                "size": self.size,
+                "open_connections": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+                "checkouts": self._checkouts,
+                "wait_time_total_seconds": round(self._wait_time_total, 6),
+                "wait_time_max_seconds": round(self._wait_time_max, 6),
+                "connects": self._connects,
+                "connect_failures": self._connect_failures,
+                "discarded": self._discarded,
+                "consecutive_failures": self._failures,
+            }
+
 
 class DatabaseManager:
     """MySQL 데이터베이스 관리 클래스"""
     
-    def __init__(self):
-        self.connection = None
+    def __init__(self, connect_fn: Optional[Callable[[], object]] = None):
+        """
+        Args:
+            connect_fn: 새 연결 생성 함수 (None이면 DB_CONFIG로 pymysql 연결)
+        """
+        self.connect_fn = connect_fn or (lambda: pymysql.connect(**DB_CONFIG))
+        self.pool: Optional[ConnectionPool] = None
+        self.tables_ready = False
+        self.unique_key = True
+        self.partitioned = False
+        # 저장 시 집계 테이블 갱신 여부 (집계 SQL은 MySQL 전용)
+        self.rollup_on_insert = ROLLUP_ON_INSERT
+        # 저장 시 범위가 너무 넓어 관리 작업으로 미룬 심볼별 집계 구간 [시작, 끝)
+        self._deferred_rollups: Dict[str, Tuple[datetime, datetime]] = {}
+        # 저장 결과 누적 (삽입 / 값이 바뀌어 갱신 / 이미 같은 값이라 건너뜀)
+        self._write_lock = threading.Lock()
+        self.write_counts = {"inserted": 0, "updated": 0, "skipped": 0}
     
     def connect(self) -> bool:
-        """데이터베이스 연결"""
-        try:
-            self.connection = pymysql.connect(**DB_CONFIG)
+        """
+        연결 풀 생성 및 연결 확인
+        첫 연결이 실패해도 풀은 유지되어 이후 호출에서 백오프 재연결 시도
+        """
+        if self.pool is None:
+            self.pool = ConnectionPool(self.connect_fn)
+        if self.is_connected():
             logger.info("데이터베이스 연결 성공")
             return True
-        except Exception as e:
-            logger.error(f"데이터베이스 연결 실패: {e}")
-            return False
+        return False
     
     def disconnect(self):
         """데이터베이스 연결 해제"""
-        if self.connection:
-            self.connection.close()
+        if self.pool:
+            self.pool.close()
+            self.pool = None
             logger.info("데이터베이스 연결 해제")
     
+    def is_connected(self) -> bool:
+        """
+        연결 가능 여부 확인 (풀에서 연결을 체크아웃해 생존 확인)
+        
+        Returns:
+            bool: 연결 가능 여부
+        """
+        if self.pool is None or not self.pool.available:
+            return False
+        try:
+            with self.pool.connection():
+                return True
+        except Exception:
+            return False
+    
+    def is_available(self) -> bool:
+        """재연결 백오프 대기 중이 아니면 True (DB 호출 없이 즉시 판단)"""
+        return self.pool is None or self.pool.available
+    
+    def _connection(self):
+        """풀에서 연결 체크아웃 (풀이 없으면 지연 생성)"""
+        if self.pool is None:
+            self.pool = ConnectionPool(self.connect_fn)
+        return self.pool.connection()
+    
+    def get_pool_stats(self) -> Optional[dict]:
+        """연결 풀 통계 (풀이 없으면 None)"""
+        return self.pool.get_stats() if self.pool else None
+    
+    def ensure_tables(self) -> bool:
+        """테이블이 아직 준비되지 않았으면 생성 (재연결 후 지연 생성용)"""
+        if not self.tables_ready:
+            self.tables_ready = self.create_tables()
+        return self.tables_ready
+    
+    @staticmethod
+    def _add_missing_columns(cursor):
+        """이전 스키마로 만든 stock_prices에 OHLCV 컬럼 추가 (price는 종가)"""
+        cursor.execute(
+            """
+            SELECT COLUMN_NAME
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'stock_prices'
+            """
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for name, definition in OHLCV_COLUMNS:
+            if name not in existing:
+                cursor.execute(
+                    f"ALTER TABLE stock_prices ADD COLUMN {name} {definition} AFTER timestamp"
+                )
+                logger.info(f"stock_prices에 {name} 컬럼 추가")
+    
+    @staticmethod
+    def _has_index(cursor, name: str) -> bool:
+        """stock_prices에 해당 이름의 인덱스가 있는지 확인"""
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'stock_prices'
+            AND INDEX_NAME = %s
+            """,
+            (name,)
+        )
+        return cursor.fetchall()[0][0] > 0
+    
+    @staticmethod
+    def _initial_partition_days(today: Optional[date] = None) -> List[date]:
+        """새 테이블에 만들 파티션 날짜 (원본 보존 기간 ~ 미리 만들 미래 일수)"""
+        today = today or date.today()
+        history = RETENTION_DAYS.get('raw') or 0
+        return [
+            today + timedelta(days=offset)
+            for offset in range(-history, PARTITION_PRECREATE_DAYS + 1)
+        ]
+
+    @staticmethod
+    def _is_partitioned(cursor) -> bool:
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'stock_prices'
+            AND PARTITION_NAME IS NOT NULL
+            """
+        )
+        return cursor.fetchall()[0][0] > 0
+
     def create_tables(self) -> bool:
         """필요한 테이블 생성"""
         try:
-            with self.connection.cursor() as cursor:
-                # 주식 가격 테이블 생성
-                create_table_sql = """
+            with self._connection() as conn, conn.cursor() as cursor:
+                # 주식 가격 테이블 생성 (일 단위 RANGE 파티션 - 파티션 키는
+                # 모든 유니크 키에 포함되어야 하므로 기본 키는 (id, timestamp))
+                create_table_sql = f"""
                 CREATE TABLE IF NOT EXISTS stock_prices (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    id INT AUTO_INCREMENT,
                     symbol VARCHAR(20) NOT NULL,
                     price DECIMAL(10, 4) NOT NULL,
                     timestamp DATETIME NOT NULL,
+                    open_price DECIMAL(10, 4) NULL,
+                    high_price DECIMAL(10, 4) NULL,
+                    low_price DECIMAL(10, 4) NULL,
+                    volume BIGINT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    INDEX idx_symbol_timestamp (symbol, timestamp)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                    PRIMARY KEY (id, timestamp),
+                    UNIQUE KEY uniq_symbol_timestamp (symbol, timestamp),
+                    KEY idx_timestamp_symbol (timestamp, symbol)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+                PARTITION BY RANGE (TO_DAYS(timestamp)) (
+                    {partition_clause(self._initial_partition_days())}
+                );
                 """
                 cursor.execute(create_table_sql)
-                self.connection.commit()
+                self._add_missing_columns(cursor)
+                self.unique_key = self._has_index(cursor, UNIQUE_KEY)
+                if not self.unique_key:
+                    logger.warning(
+                        "stock_prices에 (symbol, timestamp) 유니크 키가 없어 중복 행이 "
+                        "쌓일 수 있습니다 - 'python manage.py dedupe'로 이관하세요"
+                    )
+                if not self._has_index(cursor, HISTORY_INDEX):
+                    # 온라인 DDL로 추가 (쓰기 차단 없음)
+                    cursor.execute(
+                        f"ALTER TABLE stock_prices ADD INDEX {HISTORY_INDEX} "
+                        f"(timestamp, symbol), ALGORITHM=INPLACE, LOCK=NONE"
+                    )
+                    logger.info(f"stock_prices에 {HISTORY_INDEX} 인덱스 추가")
+                self.partitioned = self._is_partitioned(cursor)
+                if not self.partitioned:
+                    logger.warning(
+                        "stock_prices가 파티션되지 않아 보존 기간 삭제를 건너뜁니다 "
+                        "- 'python manage.py partition'으로 이관하세요"
+                    )
+
+                # 해상도별 집계 테이블 (만료된 원본 파티션을 삭제하기 전에 다운샘플링)
+                for resolution in ROLLUP_RESOLUTIONS:
+                    cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS stock_prices_{resolution} (
+                        symbol VARCHAR(20) NOT NULL,
+                        bucket DATETIME NOT NULL,
+                        open_price DECIMAL(10, 4) NOT NULL,
+                        high_price DECIMAL(10, 4) NOT NULL,
+                        low_price DECIMAL(10, 4) NOT NULL,
+                        close_price DECIMAL(10, 4) NOT NULL,
+                        volume BIGINT NULL,
+                        tick_count INT NOT NULL,
+                        PRIMARY KEY (symbol, bucket),
+                        KEY idx_bucket (bucket)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                    """)
+
+                # 심볼별 최신 가격 테이블 (삽입과 같은 트랜잭션에서 갱신)
+                create_latest_sql = """
+                CREATE TABLE IF NOT EXISTS stock_latest_prices (
+                    symbol VARCHAR(20) NOT NULL PRIMARY KEY,
+                    price DECIMAL(10, 4) NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        ON UPDATE CURRENT_TIMESTAMP
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+                """
+                cursor.execute(create_latest_sql)
+                conn.commit()
                 logger.info("테이블 생성 완료")
+                self.tables_ready = True
                 return True
         except Exception as e:
             logger.error(f"테이블 생성 실패: {e}")
             return False
     
+    @staticmethod
+    def _latest_rows(
+        data: List[Tuple[str, float, str]]
+    ) -> List[Tuple[str, float, str]]:
+        """배치 내 심볼별 가장 최근 행만 추출"""
+        latest = {}
+        for row in data:
+            current = latest.get(row[0])
+            if current is None or row[2] >= current[2]:
+                latest[row[0]] = row
+        return list(latest.values())
+    
+    def _upsert_latest(self, cursor, data: List[Tuple[str, float, str]]):
+        """배치의 심볼별 최신 행으로 stock_latest_prices 갱신 (더 최근 timestamp만 반영)"""
+        # price를 먼저 비교·갱신해야 기존 timestamp 기준으로 판단됨
+        upsert_latest_sql = """
+        INSERT INTO stock_latest_prices (symbol, price, timestamp)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            price = IF(VALUES(timestamp) >= timestamp,
+                       VALUES(price), price),
+            timestamp = GREATEST(timestamp, VALUES(timestamp))
+        """
+        cursor.executemany(
+            upsert_latest_sql, [row[:3] for row in self._latest_rows(data)]
+        )
+    
+    @staticmethod
+    def _statement_info(cursor) -> Dict[str, int]:
+        """마지막 문장의 결과 정보 문자열(Records/Duplicates/Skipped) 파싱"""
+        message = getattr(getattr(cursor, "_result", None), "message", None) or b""
+        if isinstance(message, bytes):
+            message = message.decode("utf-8", "replace")
+        return {key: int(value) for key, value in INFO_PATTERN.findall(message)}
+    
+    def _upsert_rows(
+        self, cursor, data: List[tuple], batch_rows: int = DB_UPSERT_BATCH_ROWS
+    ) -> Dict[str, int]:
+        """
+        다중 행 INSERT ... ON DUPLICATE KEY UPDATE로 저장하고 결과 분류
+        영향 행 수는 삽입 1, 갱신 2, 변경 없음 0으로 집계되므로
+        Duplicates 정보와 함께 삽입/갱신/건너뜀 수를 계산
+        
+        Returns:
+            Dict[str, int]: inserted/updated/skipped 행 수
+        """
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        rows = full_rows(data)
+        for i in range(0, len(rows), batch_rows):
+            chunk = rows[i:i + batch_rows]
+            values = ','.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+            cursor.execute(
+                UPSERT_SQL.format(values=values),
+                [value for row in chunk for value in row]
+            )
+            affected = max(cursor.rowcount, 0)
+            info = self._statement_info(cursor)
+            if "Duplicates" in info:
+                duplicates = info["Duplicates"]
+            elif len(chunk) == 1:
+                # 단일 행 문장은 정보 문자열이 없으므로 영향 행 수로 판단
+                duplicates = 0 if affected == 1 else 1
+            else:
+                duplicates = max(len(chunk) - affected, 0)
+            inserted = len(chunk) - duplicates
+            updated = max(affected - inserted, 0) // 2
+            counts["inserted"] += inserted
+            counts["updated"] += updated
+            counts["skipped"] += duplicates - updated
+        return counts
+    
+    def _record_counts(self, counts: Dict[str, int]):
+        with self._write_lock:
+            for key, value in counts.items():
+                self.write_counts[key] += value
+    
+    def get_write_stats(self) -> dict:
+        """저장 결과 누적 통계 (삽입/갱신/건너뜀 행 수, 유니크 키 존재 여부)"""
+        with self._write_lock:
+            return dict(self.write_counts, unique_key=self.unique_key)
+    
+    def upsert_prices(self, data: List[Tuple[str, float, str]]) -> Optional[Dict[str, int]]:
+        """
+        주식 가격 데이터 멱등 저장 ((symbol, timestamp) 기준 upsert)
+        stock_latest_prices도 같은 트랜잭션에서 갱신 (더 최근 timestamp만 반영)
+        배치가 걸친 집계 봉(5m/1h/1d)도 같은 트랜잭션에서 다시 계산
+        
+        Args:
+            data: (symbol, price, timestamp[, open, high, low, volume]) 튜플 리스트
+        
+        Returns:
+            Optional[Dict[str, int]]: inserted/updated/skipped 행 수 (실패 시 None)
+        """
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                # autocommit 연결이므로 명시적으로 트랜잭션 시작
+                conn.begin()
+                counts = self._upsert_rows(cursor, data)
+                self._upsert_latest(cursor, data)
+                self._refresh_rollups(cursor, data)
+                conn.commit()
+            self._record_counts(counts)
+            logger.info(
+                f"주식 가격 데이터 {len(data)}개 저장 완료 "
+                f"(삽입 {counts['inserted']}, 갱신 {counts['updated']}, "
+                f"건너뜀 {counts['skipped']})"
+            )
+            return counts
+        except Exception as e:
+            logger.error(f"데이터 삽입 실패: {e}")
+            return None
+    
     def bulk_insert_prices(self, data: List[Tuple[str, float, str]]) -> bool:
         """
-        주식 가격 데이터 벌크 삽입
+        주식 가격 데이터 벌크 저장 (upsert_prices의 성공 여부만 반환)
+        같은 (symbol, timestamp)를 다시 저장해도 중복 행이 생기지 않음
         
         Args:
-            data: (symbol, price, timestamp) 튜플 리스트
+            data: (symbol, price, timestamp[, open, high, low, volume]) 튜플 리스트
         """
+        started = time.perf_counter()
         try:
-            with self.connection.cursor() as cursor:
-                insert_sql = """
-                INSERT INTO stock_prices (symbol, price, timestamp)
-                VALUES (%s, %s, %s)
-                """
-                cursor.executemany(insert_sql, data)
-                self.connection.commit()
-                logger.info(f"{len(data)}개 주식 가격 데이터 삽입 완료")
+            with profiler.span("insert"):
+                return self.upsert_prices(data) is not None
+        finally:
+            db_insert_seconds.observe(time.perf_counter() - started)
+            db_insert_rows.observe(len(data))
+    
+    @staticmethod
+    def _load_data_infile(cursor, data: List[Tuple[str, float, str]]) -> Dict[str, int]:
+        """
+        임시 CSV 파일을 LOAD DATA LOCAL INFILE로 적재 (None은 \\N = NULL)
+        유니크 키가 같은 행은 IGNORE로 건너뜀
+        """
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", newline="", delete=False
+        ) as f:
+            csv.writer(f, lineterminator="\n").writerows(
+                ["\\N" if value is None else value for value in row]
+                for row in full_rows(data)
+            )
+            path = f.name
+        try:
+            cursor.execute(
+                f"""
+                LOAD DATA LOCAL INFILE %s
+                IGNORE INTO TABLE stock_prices
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY '\\n'
+                ({INSERT_COLUMNS})
+                """,
+                (path,)
+            )
+        finally:
+            os.remove(path)
+        skipped = DatabaseManager._statement_info(cursor).get("Skipped", 0)
+        return {"inserted": len(data) - skipped, "updated": 0, "skipped": skipped}
+    
+    def bulk_load_prices(
+        self,
+        data: List[Tuple[str, float, str]],
+        batch_rows: int = BACKFILL_INSERT_BATCH,
+        use_load_data: bool = False
+    ) -> int:
+        """
+        대량 적재 경로 (백필용)
+        다중 행 upsert 문(batch_rows행씩) 또는 LOAD DATA LOCAL INFILE로
+        한 트랜잭션에 적재하고 stock_latest_prices와 집계 봉도 함께 갱신
+        
+        Args:
+            data: (symbol, price, timestamp[, open, high, low, volume]) 튜플 리스트
+            batch_rows: INSERT 1문당 최대 행 수
+            use_load_data: LOAD DATA LOCAL INFILE 사용 여부 (DB_LOCAL_INFILE 필요)
+        
+        Returns:
+            int: 새로 삽입한 행 수 (실패 시 -1)
+        """
+        if not data:
+            return 0
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                conn.begin()
+                if use_load_data:
+                    counts = self._load_data_infile(cursor, data)
+                else:
+                    counts = self._upsert_rows(cursor, data, batch_rows)
+                self._upsert_latest(cursor, data)
+                self._refresh_rollups(cursor, data)
+                conn.commit()
+            self._record_counts(counts)
+            return counts["inserted"]
+        except Exception as e:
+            logger.error(f"대량 적재 실패: {e}")
+            return -1
+    
+    def deduplicate_prices(self) -> int:
+        """
+        중복 (symbol, timestamp) 행을 가장 먼저 저장된 행만 남기고 삭제한 뒤
+        유니크 키를 추가하고 기존 일반 인덱스를 제거 (기존 DB 1회 이관용)
+        
+        Returns:
+            int: 삭제한 중복 행 수 (실패 시 -1)
+        """
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    DELETE newer FROM stock_prices newer
+                    JOIN stock_prices older
+                        ON newer.symbol = older.symbol
+                        AND newer.timestamp = older.timestamp
+                        AND newer.id > older.id
+                    """
+                )
+                removed = cursor.rowcount
+                if not self._has_index(cursor, UNIQUE_KEY):
+                    alter = f"ADD UNIQUE KEY {UNIQUE_KEY} (symbol, timestamp)"
+                    if self._has_index(cursor, "idx_symbol_timestamp"):
+                        alter += ", DROP INDEX idx_symbol_timestamp"
+                    cursor.execute(f"ALTER TABLE stock_prices {alter}")
+                self.unique_key = True
+                logger.info(f"중복 행 {removed}개 삭제, 유니크 키 적용 완료")
+                return removed
+        except Exception as e:
+            logger.error(f"중복 제거 실패: {e}")
+            return -1
+
+    def partition_prices_table(self) -> bool:
+        """
+        파티션되지 않은 기존 stock_prices를 일 단위 RANGE 파티션으로 재구성
+        (기존 DB 1회 이관용, 테이블 전체를 다시 쓰므로 트래픽이 적을 때 실행)
+        원본 보존 기간보다 오래된 행은 가장 오래된 파티션에 모이고
+        다음 관리 작업에서 집계 후 삭제됨
+
+        Returns:
+            bool: 성공 여부
+        """
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                if self._is_partitioned(cursor):
+                    self.partitioned = True
+                    return True
+                if not self._has_index(cursor, UNIQUE_KEY):
+                    logger.error("유니크 키가 없어 파티션 이관 불가 - 먼저 dedupe를 실행하세요")
+                    return False
+                cursor.execute(
+                    "ALTER TABLE stock_prices "
+                    "DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)"
+                )
+                cursor.execute(
+                    "ALTER TABLE stock_prices PARTITION BY RANGE (TO_DAYS(timestamp)) "
+                    f"({partition_clause(self._initial_partition_days())})"
+                )
+                self.partitioned = True
+                logger.info("stock_prices 파티션 이관 완료")
                 return True
         except Exception as e:
-            logger.error(f"데이터 삽입 실패: {e}")
+            logger.error(f"파티션 이관 실패: {e}")
             return False
+
+    def list_partitions(self) -> List[dict]:
+        """
+        stock_prices 파티션 목록 (범위 순)
+
+        Returns:
+            List[dict]: name, start(하한 날짜, 첫 파티션은 None),
+                end(상한 날짜 - 미포함, pmax는 None), rows(추정 행 수)
+        """
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+                FROM INFORMATION_SCHEMA.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'stock_prices'
+                AND PARTITION_NAME IS NOT NULL
+                ORDER BY PARTITION_ORDINAL_POSITION
+                """
+            )
+            partitions = []
+            start = None
+            for name, description, rows in cursor.fetchall():
+                end = None
+                if description and description != "MAXVALUE":
+                    end = date.fromordinal(int(description) - 365)
+                partitions.append({
+                    "name": name, "start": start, "end": end, "rows": rows or 0
+                })
+                start = end
+            return partitions
+
+    def add_partitions(self, days: List[date]) -> int:
+        """
+        pmax를 나눠 날짜별 파티션 추가 (pmax가 비어 있으면 메타데이터 변경만)
+
+        Returns:
+            int: 추가한 파티션 수
+        """
+        if not days:
+            return 0
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE stock_prices REORGANIZE PARTITION {MAXVALUE_PARTITION} "
+                f"INTO ({partition_clause(days)})"
+            )
+        logger.info(f"파티션 {len(days)}개 추가 ({min(days)} ~ {max(days)})")
+        return len(days)
+
+    def drop_partitions(self, names: List[str]) -> int:
+        """
+        파티션 삭제 (행 단위 DELETE 없이 파티션 파일을 통째로 제거)
+
+        Returns:
+            int: 삭제한 파티션 수
+        """
+        if not names:
+            return 0
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE stock_prices DROP PARTITION {', '.join(names)}"
+            )
+        logger.info(f"만료 파티션 {len(names)}개 삭제: {', '.join(names)}")
+        return len(names)
+
+    @staticmethod
+    def _rollup_cascade(
+        cursor,
+        ranges_for: Callable[[timedelta], List[Tuple[datetime, datetime, Optional[List[str]]]]]
+    ) -> Dict[str, int]:
+        """
+        해상도 순서대로 구간의 버킷을 다시 계산
+        (5m은 원본, 1h는 5m, 1d는 1h 집계에서 계산하므로 버킷 하나를 갱신할 때
+        읽는 행 수가 하위 해상도의 버킷 수로 제한됨)
+
+        Args:
+            cursor: 실행할 커서
+            ranges_for: 버킷 길이 → 버킷 경계에 맞춘 ([시작, 끝), 심볼 또는 None=전체) 구간 목록
+
+        Returns:
+            Dict[str, int]: 해상도별 영향 행 수
+        """
+        counts = {}
+        source = None
+        for resolution in ROLLUP_RESOLUTIONS:
+            step, bucket = ROLLUP_BUCKETS[resolution]
+            time_column = "timestamp" if source is None else "bucket"
+            clauses = []
+            params: list = []
+            for low, high, symbols in ranges_for(step):
+                clause = f"{time_column} >= %s AND {time_column} < %s"
+                params.extend([low, high])
+                if symbols:
+                    clause += f" AND symbol IN ({','.join(['%s'] * len(symbols))})"
+                    params.extend(symbols)
+                clauses.append(f"({clause})")
+            where = " OR ".join(clauses)
+            if source is None:
+                source_sql = RAW_ROLLUP_SOURCE.format(where=where)
+            else:
+                source_sql = TABLE_ROLLUP_SOURCE.format(resolution=source, where=where)
+            cursor.execute(
+                ROLLUP_SQL.format(resolution=resolution, bucket=bucket, source=source_sql),
+                params
+            )
+            counts[resolution] = max(cursor.rowcount, 0)
+            source = resolution
+        return counts
+
+    @classmethod
+    def _rollup_range(
+        cls,
+        cursor,
+        start: datetime,
+        end: datetime,
+        symbols: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """
+        [start, end)에 걸친 버킷을 해상도 순서대로 다시 계산
+
+        Returns:
+            Dict[str, int]: 해상도별 영향 행 수
+        """
+        return cls._rollup_cascade(cursor, lambda step: [(
+            floor_bucket(start, step),
+            floor_bucket(end - timedelta(microseconds=1), step) + step,
+            symbols,
+        )])
+
+    def _refresh_rollups(self, cursor, data: List[tuple]):
+        """
+        저장한 배치의 심볼별로 실제 걸친 버킷만 집계 테이블에서 다시 계산
+        심볼별 시각 범위가 ROLLUP_ON_INSERT_MAX_SPAN보다 넓으면(백필 등) 저장 트랜잭션에서
+        계산하지 않고 미뤄 두었다가 관리 작업(rollup_deferred)에서 계산
+        """
+        if not self.rollup_on_insert or not data or not ROLLUP_RESOLUTIONS:
+            return
+        times_by_symbol: Dict[str, List[datetime]] = defaultdict(list)
+        for row in data:
+            times_by_symbol[row[0]].append(
+                row[2] if isinstance(row[2], datetime)
+                else datetime.fromisoformat(str(row[2]))
+            )
+        max_span = timedelta(seconds=ROLLUP_ON_INSERT_MAX_SPAN)
+        for symbol in list(times_by_symbol):
+            timestamps = times_by_symbol[symbol]
+            start, end = min(timestamps), max(timestamps) + timedelta(seconds=1)
+            if end - start > max_span:
+                self._defer_rollup(symbol, start, end)
+                del times_by_symbol[symbol]
+        if times_by_symbol:
+            self._rollup_cascade(
+                cursor, lambda step: touched_bucket_ranges(times_by_symbol, step)
+            )
+
+    def _defer_rollup(self, symbol: str, start: datetime, end: datetime):
+        """심볼의 [start, end) 집계를 관리 작업으로 미룸 (기존 미룬 구간과 합침)"""
+        with self._write_lock:
+            current = self._deferred_rollups.get(symbol)
+            if current is not None:
+                start, end = min(start, current[0]), max(end, current[1])
+            self._deferred_rollups[symbol] = (start, end)
+        logger.info(f"{symbol} 집계 {start} ~ {end}를 관리 작업으로 미룸")
+
+    def rollup_deferred(self) -> Dict[str, int]:
+        """
+        저장 시 미룬 심볼별 집계 구간을 다시 계산 (실패한 구간은 다시 미뤄 두고 예외 전파)
+        미룬 구간은 메모리에만 있으므로 재시작 전에 처리하지 못하면
+        최근 완료일 재집계나 만료 파티션 집계 시점에 보정됨
+
+        Returns:
+            Dict[str, int]: 해상도별 영향 행 수
+        """
+        with self._write_lock:
+            pending, self._deferred_rollups = self._deferred_rollups, {}
+        counts: Dict[str, int] = {}
+        for symbol in sorted(pending):
+            start, end = pending[symbol]
+            try:
+                result = self.rollup_prices(start, end, [symbol])
+            except Exception:
+                for rest, (rest_start, rest_end) in pending.items():
+                    self._defer_rollup(rest, rest_start, rest_end)
+                raise
+            del pending[symbol]
+            for resolution, count in result.items():
+                counts[resolution] = counts.get(resolution, 0) + count
+        return counts
+
+    def rollup_prices(
+        self,
+        start: Optional[datetime],
+        end: datetime,
+        symbols: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """
+        [start, end) 구간의 원본 봉을 모든 해상도 집계 테이블에 다시 계산
+        같은 구간을 다시 집계하면 버킷을 덮어쓰므로 여러 번 실행해도 안전
+
+        Args:
+            start: 구간 시작 (None이면 구간 내 가장 오래된 행부터)
+            end: 구간 끝, 미포함
+            symbols: 대상 심볼 (None이면 전체)
+
+        Returns:
+            Dict[str, int]: 해상도별 영향 행 수
+        """
+        with self._connection() as conn, conn.cursor() as cursor:
+            if start is None:
+                cursor.execute(
+                    "SELECT MIN(timestamp) FROM stock_prices WHERE timestamp < %s",
+                    (end,)
+                )
+                start = cursor.fetchall()[0][0]
+                if start is None:
+                    return {resolution: 0 for resolution in ROLLUP_RESOLUTIONS}
+            return self._rollup_range(cursor, start, end, symbols)
+
+    def purge_rollup(
+        self, resolution: str, before: datetime, batch_rows: int = ROLLUP_PURGE_BATCH
+    ) -> int:
+        """
+        집계 테이블에서 보존 기간이 지난 버킷 삭제
+        (원본보다 행 수가 훨씬 적으므로 idx_bucket 범위 삭제를 batch_rows행씩 반복)
+
+        Returns:
+            int: 삭제한 행 수
+        """
+        if resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"알 수 없는 집계 해상도: {resolution}")
+        removed = 0
+        with self._connection() as conn, conn.cursor() as cursor:
+            while True:
+                cursor.execute(
+                    f"DELETE FROM stock_prices_{resolution} "
+                    f"WHERE bucket < %s ORDER BY bucket LIMIT %s",
+                    (before, batch_rows)
+                )
+                removed += cursor.rowcount
+                if cursor.rowcount < batch_rows:
+                    return removed
+
+    def rebuild_latest_prices(self) -> int:
+        """
+        stock_prices 전체에서 stock_latest_prices를 재구성 (기존 DB 1회 이관용)
+        
+        Returns:
+            int: 재구성된 심볼 수 (실패 시 -1)
+        """
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                conn.begin()
+                cursor.execute("DELETE FROM stock_latest_prices")
+                # 심볼별 MAX(timestamp)는 uniq_symbol_timestamp로 그룹 단위 탐색
+                rebuild_sql = """
+                INSERT INTO stock_latest_prices (symbol, price, timestamp)
+                SELECT sp.symbol, sp.price, sp.timestamp
+                FROM stock_prices sp
+                JOIN (
+                    SELECT symbol, MAX(timestamp) AS max_timestamp
+                    FROM stock_prices
+                    GROUP BY symbol
+                ) m ON sp.symbol = m.symbol AND sp.timestamp = m.max_timestamp
+                ON DUPLICATE KEY UPDATE
+                    price = VALUES(price), timestamp = VALUES(timestamp)
+                """
+                cursor.execute(rebuild_sql)
+                cursor.execute("SELECT COUNT(*) FROM stock_latest_prices")
+                count = cursor.fetchall()[0][0]
+                conn.commit()
+                logger.info(f"최신 가격 테이블 재구성 완료: {count}개 심볼")
+                return count
+        except Exception as e:
+            logger.error(f"최신 가격 테이블 재구성 실패: {e}")
+            return -1
     
     def get_latest_prices(self, symbols: Optional[List[str]] = None) -> List[dict]:
         """
-        최신 주식 가격 조회
+        최신 주식 가격 조회 (stock_latest_prices만 읽으므로 비용은 심볼 수에 비례)
         
         Args:
             symbols: 조회할 심볼 리스트 (None이면 전체)
         """
         try:
-            with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            with self._connection() as conn, \
+                    conn.cursor(pymysql.cursors.DictCursor) as cursor:
                 if symbols:
                     placeholders = ','.join(['%s'] * len(symbols))
                     sql = f"""
                     SELECT symbol, price, timestamp
-                    FROM stock_prices 
+                    FROM stock_latest_prices
                     WHERE symbol IN ({placeholders})
-                    AND timestamp = (
-                        SELECT MAX(timestamp) 
-                        FROM stock_prices sp2 
-                        WHERE sp2.symbol = stock_prices.symbol
-                    )
                     ORDER BY symbol
                     """
                     cursor.execute(sql, symbols)
                 else:
                     sql = """
                     SELECT symbol, price, timestamp
-                    FROM stock_prices sp1
-                    WHERE timestamp = (
-                        SELECT MAX(timestamp) 
-                        FROM stock_prices sp2 
-                        WHERE sp2.symbol = sp1.symbol
-                    )
+                    FROM stock_latest_prices
                     ORDER BY symbol
                     """
                     cursor.execute(sql)
@@ -118,43 +1237,279 @@ class DatabaseManager:
             logger.error(f"데이터 조회 실패: {e}")
             return []
 
+    def get_last_bar_times(self, symbols: List[str]) -> Dict[str, datetime]:
+        """
+        OHLCV 모드로 저장한 봉(volume이 있는 행)의 심볼별 마지막 시각
+        (종가 모드 행은 서버 로컬 시각이라 증분 조회 기준에서 제외)
+        
+        Args:
+            symbols: 조회할 심볼 리스트
+        
+        Returns:
+            Dict[str, datetime]: 심볼 → 마지막 봉 시각 (거래소 로컬, 봉이 없는 심볼은 누락)
+        """
+        if not symbols:
+            return {}
+        placeholders = ','.join(['%s'] * len(symbols))
+        sql = f"""
+        SELECT symbol, MAX(timestamp) AS timestamp
+        FROM stock_prices
+        WHERE symbol IN ({placeholders}) AND volume IS NOT NULL
+        GROUP BY symbol
+        """
+        try:
+            with self._connection() as conn, \
+                    conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, symbols)
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"마지막 봉 시각 조회 실패: {e}")
+            return {}
+        last_bars: Dict[str, datetime] = {}
+        for row in rows:
+            timestamp = row["timestamp"]
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            if timestamp is not None:
+                last_bars[row["symbol"]] = timestamp
+        return last_bars
+
+    @staticmethod
+    def _history_query(
+        symbols: Optional[List[str]],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        after: Optional[Tuple[str, str]],
+        limit: Optional[int] = None
+    ) -> Tuple[str, list]:
+        """
+        히스토리 조회 SQL (timestamp, symbol 내림차순 - idx_timestamp_symbol 역방향 탐색)
+        after 커서는 OFFSET 없이 직전 페이지 마지막 행 다음부터 읽는 keyset 조건
+        """
+        conditions, params = [], []
+        if symbols:
+            conditions.append(f"symbol IN ({','.join(['%s'] * len(symbols))})")
+            params.extend(symbols)
+        if start is not None:
+            conditions.append("timestamp >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("timestamp < %s")
+            params.append(end)
+        if after is not None:
+            after_timestamp, after_symbol = after
+            conditions.append(
+                "(timestamp < %s OR (timestamp = %s AND symbol < %s))"
+            )
+            params.extend([after_timestamp, after_timestamp, after_symbol])
+        sql = "SELECT symbol, price, timestamp FROM stock_prices"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC, symbol DESC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        return sql, params
+
     def get_price_history(
-        self, symbols: Optional[List[str]] = None, limit: int = 100
+        self,
+        symbols: Optional[List[str]] = None,
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[str, str]] = None
     ) -> List[dict]:
         """
         최근 주가 히스토리 조회 (전체 또는 특정 심볼)
-        최근 timestamp 기준 내림차순 정렬
+        최근 timestamp 기준 내림차순 정렬 (같은 시각은 symbol 내림차순)
 
         Args:
             symbols: 조회할 심볼 리스트 (None이면 전체)
             limit: 반환할 최대 행 수(전체 기준)
+            start: 구간 시작 (포함)
+            end: 구간 끝 (미포함)
+            after: 이 (timestamp, symbol) 다음 행부터 조회 (decode_history_cursor 결과)
         """
+        sql, params = self._history_query(symbols, start, end, after, limit)
         try:
-            with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
-                if symbols:
-                    placeholders = ','.join(['%s'] * len(symbols))
-                    sql = f"""
-                    SELECT symbol, price, timestamp
-                    FROM stock_prices
-                    WHERE symbol IN ({placeholders})
-                    ORDER BY timestamp DESC
-                    LIMIT %s
-                    """
-                    params = symbols + [limit]
-                    cursor.execute(sql, params)
-                else:
-                    sql = """
-                    SELECT symbol, price, timestamp
-                    FROM stock_prices
-                    ORDER BY timestamp DESC
-                    LIMIT %s
-                    """
-                    cursor.execute(sql, (limit,))
+            with self._connection() as conn, \
+                    conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, params)
                 return cursor.fetchall()
         except Exception as e:
             logger.error(f"히스토리 조회 실패: {e}")
             return []
 
+    def get_price_history_page(
+        self,
+        symbols: Optional[List[str]] = None,
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        히스토리 한 페이지와 다음 페이지 커서 조회 (limit + 1행을 읽어 다음 페이지 여부 판단)
+
+        Returns:
+            Tuple[List[dict], Optional[str]]: (행, 다음 페이지 커서 - 마지막 페이지면 None)
+        """
+        rows = self.get_price_history(symbols, limit + 1, start, end, after)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_history_cursor(rows[-1])
+
+    def iter_price_history(
+        self,
+        symbols: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[str, str]] = None,
+        batch_rows: int = HISTORY_STREAM_FETCH_ROWS
+    ) -> Iterator[List[dict]]:
+        """
+        히스토리 전체를 서버 측 커서(SSDictCursor)로 batch_rows행씩 읽어 반환
+
+        Yields:
+            List[dict]: symbol/price/timestamp 행 묶음 (get_price_history와 같은 순서)
+        """
+        sql, params = self._history_query(symbols, start, end, after)
+        return self._stream_query(sql, params, batch_rows, pymysql.cursors.SSDictCursor)
+
+    def iter_price_rows(
+        self,
+        symbols: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        batch_rows: int = EXPORT_FETCH_ROWS
+    ) -> Iterator[List[tuple]]:
+        """
+        내보내기용 원본 행을 (symbol, timestamp) 순서로 batch_rows행씩 튜플로 반환
+        (uniq_symbol_timestamp 순서 그대로 읽으므로 정렬 없음)
+
+        Yields:
+            List[tuple]: (symbol, price, timestamp, open, high, low, volume) 튜플 묶음
+        """
+        conditions, params = [], []
+        if symbols:
+            conditions.append(f"symbol IN ({','.join(['%s'] * len(symbols))})")
+            params.extend(symbols)
+        if start is not None:
+            conditions.append("timestamp >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("timestamp < %s")
+            params.append(end)
+        sql = f"SELECT {INSERT_COLUMNS} FROM stock_prices"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY symbol, timestamp"
+        return self._stream_query(sql, params, batch_rows, pymysql.cursors.SSCursor)
+
+    def _stream_query(
+        self, sql: str, params: list, batch_rows: int, cursor_class
+    ) -> Iterator[list]:
+        """
+        서버 측 커서로 결과를 batch_rows행씩 읽는 제너레이터
+        결과를 메모리에 모으지 않으므로 행 수와 무관하게 메모리 사용량이 일정하며,
+        소비자가 중간에 멈추면 남은 결과를 읽지 않고 연결을 폐기
+        스트리밍용으로 늘린 net_write_timeout은 풀에 반납하기 전에 기본값으로 되돌림
+        (되돌리지 못하면 연결 폐기)
+        """
+        if self.pool is None:
+            self.pool = ConnectionPool(self.connect_fn)
+        conn = self.pool.acquire()
+        broken = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SET SESSION net_write_timeout = %s",
+                    (HISTORY_STREAM_NET_WRITE_TIMEOUT,)
+                )
+            cursor = conn.cursor(cursor_class)
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+            broken = False
+        finally:
+            if not broken:
+                # 이후 체크아웃이 긴 제한 시간을 물려받지 않도록 세션 값을 전역 기본값으로 복원
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SET SESSION net_write_timeout = DEFAULT")
+                except Exception as e:
+                    logger.warning(f"net_write_timeout 복원 실패로 연결 폐기: {e}")
+                    broken = True
+            self.pool.release(conn, broken=broken)
+
+    def get_ohlc(
+        self,
+        symbols: Optional[List[str]],
+        interval: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = OHLC_MAX_ROWS
+    ) -> List[dict]:
+        """
+        OHLC 봉 조회 (1m은 원본, 나머지는 집계 테이블의 (symbol, bucket) 범위 탐색)
+
+        Args:
+            symbols: 조회할 심볼 리스트 (None이면 전체)
+            interval: '1m' 또는 ROLLUP_RESOLUTIONS 중 하나
+            start: 구간 시작 (None이면 end에서 OHLC_DEFAULT_LOOKBACK_DAYS 이전)
+            end: 구간 끝, 미포함 (None이면 현재)
+            limit: 반환할 최대 행 수
+
+        Returns:
+            List[dict]: symbol, bucket, open/high/low/close, volume (심볼·시각 오름차순)
+        """
+        if interval != "1m" and interval not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"지원하지 않는 봉 간격: {interval}")
+        end = end or datetime.now()
+        if start is None:
+            start = end - timedelta(days=OHLC_DEFAULT_LOOKBACK_DAYS[interval])
+
+        if interval == "1m":
+            time_column = "timestamp"
+            select = """
+            SELECT symbol, timestamp AS bucket,
+                   COALESCE(open_price, price) AS open,
+                   COALESCE(high_price, price) AS high,
+                   COALESCE(low_price, price) AS low,
+                   price AS close, volume
+            FROM stock_prices
+            """
+        else:
+            time_column = "bucket"
+            select = f"""
+            SELECT symbol, bucket, open_price AS open, high_price AS high,
+                   low_price AS low, close_price AS close, volume
+            FROM stock_prices_{interval}
+            """
+        conditions = [f"{time_column} >= %s", f"{time_column} < %s"]
+        params: list = [start, end]
+        if symbols:
+            conditions.append(f"symbol IN ({','.join(['%s'] * len(symbols))})")
+            params.extend(symbols)
+        sql = (
+            f"{select} WHERE {' AND '.join(conditions)} "
+            f"ORDER BY symbol, {time_column} LIMIT %s"
+        )
+        params.append(limit)
+        try:
+            with self._connection() as conn, \
+                    conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"OHLC 조회 실패: {e}")
+            return []
+
 
 # 전역 데이터베이스 매니저 인스턴스
-db_manager = DatabaseManager() 
\ No newline at end of file
+db_manager = DatabaseManager()
@@ -0,0 +1,189 @@
+"""
+stock_prices 대량 내보내기 (CSV / Arrow IPC 스트림 / Parquet)
+- DB에서 서버 측 커서로 EXPORT_FETCH_ROWS행씩 튜플로 읽음 (행별 dict 생성 없음)
+- 읽은 묶음을 열 단위로 변환해 레코드 배치(Arrow) / 행 그룹(Parquet) 하나로 인코딩
+- 인코딩된 바이트를 묶음마다 바로 내보내므로 메모리 사용량은 묶음 크기로 제한
+Arrow/Parquet 형식은 pyarrow가 설치된 경우에만 사용 가능
+"""
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from config import EXPORT_FETCH_ROWS
+from database import DatabaseManager, db_manager
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성
+    pa = None
+    pq = None
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 형식별 (Content-Type, 파일 확장자)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# 내보내는 컬럼 (iter_price_rows 튜플 순서와 동일)
+EXPORT_COLUMNS = [
+    "symbol", "price", "timestamp", "open_price", "high_price", "low_price", "volume"
+]
+
+
+def export_schema():
+    """Arrow 스키마 (DECIMAL(10, 4) 가격은 손실 없이 decimal128로)"""
+    price = pa.decimal128(10, 4)
+    return pa.schema([
+        ("symbol", pa.string()),
+        ("price", price),
+        ("timestamp", pa.timestamp("s")),
+        ("open_price", price),
+        ("high_price", price),
+        ("low_price", price),
+        ("volume", pa.int64()),
+    ])
+
+
+def check_format(fmt: str):
+    """
+    내보내기 형식 확인
+
+    Raises:
+        ValueError: 알 수 없는 형식이거나 pyarrow 없이 Arrow/Parquet을 요청한 경우
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 내보내기 형식: {fmt} ({', '.join(EXPORT_FORMATS)})")
+    if fmt != "csv" and pa is None:
+        raise ValueError(f"{fmt} 형식은 pyarrow가 필요합니다 (pip install pyarrow)")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Arrow/Parquet 라이터가 쓴 바이트를 모아 두었다가 묶음 단위로 꺼내는 출력 대상"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """지금까지 쓴 바이트를 꺼내고 비움"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _record_batch(rows: List[tuple], schema):
+    """튜플 묶음을 열 단위로 바꿔 레코드 배치 하나로 변환"""
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def _iter_csv(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _iter_arrow(batches: Iterator[List[tuple]], fmt: str) -> Iterator[bytes]:
+    schema = export_schema()
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in batches:
+            # 묶음 하나가 Arrow 레코드 배치 / Parquet 행 그룹 하나
+            writer.write_batch(_record_batch(rows, schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        # 스키마만 있는 빈 결과도 유효한 파일이 되도록 항상 닫음 (Parquet 푸터 기록)
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def iter_export(
+    fmt: str,
+    symbols: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Optional[DatabaseManager] = None,
+    batch_rows: int = EXPORT_FETCH_ROWS
+) -> Iterator[bytes]:
+    """
+    stock_prices를 지정한 형식으로 인코딩한 바이트 청크를 순서대로 반환
+
+    Args:
+        fmt: 'csv', 'arrow'(IPC 스트림), 'parquet'
+        symbols: 내보낼 심볼 리스트 (None이면 전체)
+        start: 구간 시작 (포함)
+        end: 구간 끝 (미포함)
+        db: 데이터베이스 매니저 (None이면 전역 db_manager)
+        batch_rows: DB에서 한 번에 읽어 인코딩할 행 수
+
+    Yields:
+        bytes: 인코딩된 청크 (이어 붙이면 완전한 파일)
+    """
+    check_format(fmt)
+    batches = (db or db_manager).iter_price_rows(symbols, start, end, batch_rows)
+    if fmt == "csv":
+        return _iter_csv(batches)
+    return _iter_arrow(batches, fmt)
+
+
+def export_to_file(
+    path: str,
+    fmt: str,
+    symbols: Optional[List[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Optional[DatabaseManager] = None,
+    batch_rows: int = EXPORT_FETCH_ROWS
+) -> int:
+    """
+    stock_prices를 파일로 내보내기
+
+    Returns:
+        int: 쓴 바이트 수
+    """
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in iter_export(fmt, symbols, start, end, db, batch_rows):
+            f.write(chunk)
+            written += len(chunk)
+    logger.info(f"내보내기 완료: {path} ({fmt}, {written} bytes)")
+    return written
@@ -1,23 +1,48 @@
 """
 FastAPI 기반 주식 데이터 수집 애플리케이션
 """
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import asyncio
+import json
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime
 
-from config import API_HOST, API_PORT
-from database import db_manager
+from backfill import BackfillJob
+from config import (
+    API_HOST, API_PORT, BROADCAST_KEEPALIVE, MAINTENANCE_ENABLED, METRICS_ENABLED,
+    PROFILING_ENABLED,
+)
+from database import db_manager, decode_history_cursor
+from export import EXPORT_FORMATS, check_format, iter_export
+from maintenance import maintenance
 from market_utils import get_market_status, get_active_symbols
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    RouteLatencyMiddleware,
+    db_pool_in_use,
+    db_up,
+    queue_depth,
+    registry,
+)
 from periodic_task import task_manager
+from profiling import ProfilingMiddleware, profiler
+from price_cache import price_cache
 from stock_data_collector import stock_collector
+from tick_broadcaster import BroadcastMessage, Subscription, broadcaster, serialize_tick
 from config import TARGET_SYMBOLS
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 백필 작업 (job_id → 작업), 실행 상태 조회용
+backfill_jobs: Dict[str, BackfillJob] = {}
+# 실행 중인 백필 태스크 (참조를 유지해 실행 중 GC를 막고 종료 시 예외를 기록)
+backfill_tasks: Dict[str, asyncio.Task] = {}
+
 # FastAPI 애플리케이션 생성
 app = FastAPI(
     title="실시간 주식 데이터 수집 API",
@@ -25,6 +50,52 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# 라우트별 처리 시간 기록
+if METRICS_ENABLED:
+    app.add_middleware(RouteLatencyMiddleware)
+
+# 무장된 라우트 요청 프로파일링 (PROFILING_ENABLED일 때만 등록)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+
+def register_metric_gauges():
+    """DB 연결 상태와 큐 길이 게이지를 /metrics 스크레이프 시점에 읽도록 등록"""
+    db_up.set_function(
+        lambda: float(db_manager.pool is not None and db_manager.pool.available)
+    )
+    db_pool_in_use.set_function(
+        lambda: (db_manager.get_pool_stats() or {}).get("in_use", 0)
+    )
+    queue_depth.labels("write_buffer").set_function(
+        lambda: stock_collector.write_buffer.depth
+    )
+    queue_depth.labels("broadcast").set_function(
+        lambda: broadcaster.get_stats()["max_depth"]
+    )
+
+
+register_metric_gauges()
+
+
+async def warm_price_cache() -> bool:
+    """DB의 최신 가격으로 인메모리 캐시 예열 (DB 연결 불가 시 False)"""
+    if not await run_in_threadpool(db_manager.is_connected):
+        return False
+    rows = await run_in_threadpool(db_manager.get_latest_prices)
+    price_cache.load(rows)
+    logger.info(f"최신 가격 캐시 예열 완료: {len(rows)}개 심볼")
+    return True
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더가 현재 ETag와 일치하는지 확인"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -37,12 +108,21 @@ async def startup_event():
         # 테이블 생성
         if not db_manager.create_tables():
             logger.warning("테이블 생성 실패 - 데이터 저장 기능이 제한됩니다")
+        # 최신 가격 캐시 예열
+        await warm_price_cache()
     else:
         logger.warning("데이터베이스 연결 실패 - 데이터 저장 기능이 제한됩니다")
     
+    # 수집 결과 write-behind 저장 시작
+    stock_collector.start_writer()
+    
     # 주기적 데이터 수집 작업 시작 (데이터베이스 없어도 실행 가능)
     task_manager.start()
     logger.info("주기적 데이터 수집 작업이 시작되었습니다")
+    
+    # 파티션 생성/삭제 및 다운샘플링 작업 시작
+    if MAINTENANCE_ENABLED:
+        maintenance.start()
 
 
 @app.on_event("shutdown")
@@ -52,6 +132,16 @@ async def shutdown_event():
     
     # 주기적 작업 중지
     task_manager.stop()
+    maintenance.stop()
+    
+    # 푸시 구독 종료 (열린 WebSocket/SSE 스트림 정리)
+    broadcaster.close()
+    
+    # 대기 중인 틱 저장 후 writer 종료
+    await stock_collector.stop_writer()
+    
+    # 수집 워커 풀 종료
+    stock_collector.close()
     
     # 데이터베이스 연결 해제
     db_manager.disconnect()
@@ -82,6 +172,12 @@ async def get_status():
             "market_status": market_status,
             "active_symbols": active_symbols,
             "active_symbols_count": len(active_symbols),
+            "collector_stats": stock_collector.get_stats(),
+            "database_pool": db_manager.get_pool_stats(),
+            "database_writes": db_manager.get_write_stats(),
+            "maintenance": maintenance.get_status(),
+            "broadcast": broadcaster.get_stats(),
+            "profiling": profiler.get_status() if PROFILING_ENABLED else None,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -90,9 +186,10 @@ async def get_status():
 
 
 @app.get("/prices")
-async def get_latest_prices(symbols: Optional[str] = None):
+async def get_latest_prices(request: Request, symbols: Optional[str] = None):
     """
     최신 주식 가격 조회 엔드포인트
+    인메모리 캐시에서 응답하며 If-None-Match가 현재 ETag와 같으면 304 반환
     
     Args:
         symbols: 쉼표로 구분된 심볼 리스트 (예: "AAPL,GOOGL,MSFT")
@@ -102,32 +199,202 @@ async def get_latest_prices(symbols: Optional[str] = None):
         if symbols:
             symbol_list = [s.strip() for s in symbols.split(",")]
         
-        prices = db_manager.get_latest_prices(symbol_list)
+        # 시작 시 DB가 없어 예열되지 않았으면 한 번 더 시도
+        if not price_cache.warmed:
+            await warm_price_cache()
         
-        return {
-            "prices": prices,
-            "count": len(prices),
-            "timestamp": datetime.now().isoformat()
-        }
+        etag = price_cache.etag
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        prices, _ = price_cache.get(symbol_list)
+        
+        return JSONResponse(
+            content={
+                "prices": prices,
+                "count": len(prices),
+                "timestamp": datetime.now().isoformat()
+            },
+            headers={"ETag": etag}
+        )
     except Exception as e:
         logger.error(f"가격 조회 중 오류: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/prices/history")
-async def get_price_history(symbols: Optional[str] = None, limit: int = 200):
+def price_snapshot_message(subscription: Subscription) -> Optional[BroadcastMessage]:
+    """구독 시작 시 보낼 최신 가격 스냅샷 메시지 (캐시가 비어 있으면 None)"""
+    symbol_list = sorted(subscription.symbols) if subscription.symbols else None
+    prices, _ = price_cache.get(symbol_list)
+    if not prices:
+        return None
+    return BroadcastMessage(
+        [
+            (row["symbol"], serialize_tick((row["symbol"], row["price"], row["timestamp"])))
+            for row in prices
+        ],
+        kind="snapshot"
+    )
+
+
+async def sse_events(subscription: Subscription):
+    """구독 메시지를 SSE 프레임으로 전송 (새 틱이 없으면 주석으로 연결 유지)"""
+    try:
+        snapshot = price_snapshot_message(subscription)
+        if snapshot is not None:
+            yield snapshot.sse
+        while True:
+            message = await subscription.get(timeout=BROADCAST_KEEPALIVE)
+            if message is not None:
+                yield message.sse
+            elif subscription.closed:
+                break
+            else:
+                yield b": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@app.get("/prices/stream")
+async def stream_prices(symbols: Optional[str] = None):
+    """
+    새 틱 푸시 (Server-Sent Events)
+    구독 직후 최신 가격 스냅샷을 보내고 이후 수집 사이클마다 저장된 틱을 전송
+    
+    Args:
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 전체)
+    """
+    symbol_list = [s.strip() for s in symbols.split(",")] if symbols else None
+    try:
+        subscription = broadcaster.subscribe(symbol_list)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        sse_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/prices")
+async def websocket_prices(websocket: WebSocket, symbols: Optional[str] = None):
     """
-    최근 주가 히스토리 조회
+    새 틱 푸시 (WebSocket, 메시지는 /prices/stream의 data와 같은 JSON)
+    
+    Args:
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 전체)
     """
+    await websocket.accept()
+    symbol_list = [s.strip() for s in symbols.split(",")] if symbols else None
+    try:
+        subscription = broadcaster.subscribe(symbol_list)
+    except RuntimeError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    
+    async def send_messages():
+        snapshot = price_snapshot_message(subscription)
+        if snapshot is not None:
+            await websocket.send_text(snapshot.text)
+        while True:
+            message = await subscription.get(timeout=BROADCAST_KEEPALIVE)
+            if message is not None:
+                await websocket.send_text(message.text)
+            elif subscription.closed:
+                return
+            else:
+                await websocket.send_text('{"type":"keepalive"}')
+    
+    async def wait_disconnect():
+        # 클라이언트가 보내는 메시지는 무시하고 연결 종료만 감지
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    tasks = [
+        asyncio.create_task(send_messages()),
+        asyncio.create_task(wait_disconnect())
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        broadcaster.unsubscribe(subscription)
+    # 서버 종료로 구독이 끝난 경우 연결을 닫음
+    if tasks[1] not in done:
+        try:
+            await websocket.close()
+        except Exception:
+            pass  # 이미 끊긴 연결
+
+
+def parse_history_params(
+    symbols: Optional[str],
+    start: Optional[str],
+    end: Optional[str],
+    cursor: Optional[str]
+):
+    """히스토리 조회 쿼리 파라미터 해석 (형식 오류는 400)"""
     try:
         symbol_list = None
         if symbols:
-            symbol_list = [s.strip() for s in symbols.split(",")]
+            symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+        return (
+            symbol_list,
+            datetime.fromisoformat(start) if start else None,
+            datetime.fromisoformat(end) if end else None,
+            decode_history_cursor(cursor) if cursor else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        history = db_manager.get_price_history(symbol_list, limit=limit)
+
+def history_ndjson_chunk(rows: List[dict]) -> bytes:
+    """히스토리 행 묶음을 NDJSON 청크 하나로 직렬화"""
+    lines = []
+    for row in rows:
+        timestamp = row["timestamp"]
+        lines.append(json.dumps({
+            "symbol": row["symbol"],
+            "price": float(row["price"]),
+            "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime)
+            else str(timestamp).replace(" ", "T"),
+        }, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@app.get("/prices/history")
+async def get_price_history(
+    symbols: Optional[str] = None,
+    limit: int = 200,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """
+    주가 히스토리 조회 (최근 순, keyset 페이지네이션)
+    응답의 next_cursor를 cursor로 다시 보내면 다음 페이지 조회
+    
+    Args:
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 전체)
+        limit: 페이지 최대 행 수
+        start: 시작 시각 (ISO 형식, 포함)
+        end: 끝 시각 (ISO 형식, 미포함)
+        cursor: 이전 응답의 next_cursor
+    """
+    symbol_list, start_at, end_at, after = parse_history_params(
+        symbols, start, end, cursor
+    )
+    try:
+        history, next_cursor = await run_in_threadpool(
+            db_manager.get_price_history_page,
+            symbol_list, limit, start_at, end_at, after
+        )
         return {
             "history": history,
             "count": len(history),
+            "next_cursor": next_cursor,
             "timestamp": datetime.now().isoformat(),
         }
     except Exception as e:
@@ -135,6 +402,106 @@ async def get_price_history(symbols: Optional[str] = None, limit: int = 200):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/prices/history/stream")
+async def stream_price_history(
+    symbols: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """
+    주가 히스토리 전체를 NDJSON(한 줄에 한 행)으로 스트리밍
+    서버 측 커서에서 읽은 만큼 바로 전송하므로 행 수와 무관하게 메모리 사용량이 일정
+    
+    Args:
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 전체)
+        start: 시작 시각 (ISO 형식, 포함)
+        end: 끝 시각 (ISO 형식, 미포함)
+        cursor: 이 커서 다음 행부터 스트리밍 (/prices/history의 next_cursor)
+    """
+    symbol_list, start_at, end_at, after = parse_history_params(
+        symbols, start, end, cursor
+    )
+    # 응답 시작 후에는 상태 코드를 바꿀 수 없으므로 재연결 대기 중이면 미리 거절
+    if not db_manager.is_available():
+        raise HTTPException(status_code=503, detail="데이터베이스 재연결 대기 중")
+    # 동기 제너레이터는 StreamingResponse가 스레드 풀에서 순회
+    batches = db_manager.iter_price_history(symbol_list, start_at, end_at, after)
+    return StreamingResponse(
+        (history_ndjson_chunk(rows) for rows in batches),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.get("/export")
+async def export_prices(
+    format: str = "csv",
+    symbols: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """
+    stock_prices를 CSV / Arrow IPC 스트림 / Parquet 파일로 스트리밍 내보내기
+    (Arrow/Parquet은 pyarrow 필요)
+    
+    Args:
+        format: csv, arrow, parquet
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 전체)
+        start: 시작 시각 (ISO 형식, 포함)
+        end: 끝 시각 (ISO 형식, 미포함)
+    """
+    symbol_list, start_at, end_at, _ = parse_history_params(symbols, start, end, None)
+    try:
+        check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not db_manager.is_available():
+        raise HTTPException(status_code=503, detail="데이터베이스 재연결 대기 중")
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        iter_export(format, symbol_list, start_at, end_at, db=db_manager),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="stock_prices.{extension}"'
+        }
+    )
+
+
+@app.get("/prices/ohlc")
+async def get_price_ohlc(
+    symbols: Optional[str] = None,
+    interval: str = "1m",
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """
+    OHLC 봉 조회 (5m/1h/1d는 저장 시 갱신되는 집계 테이블에서 응답)
+    
+    Args:
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 전체)
+        interval: 봉 간격 (1m, 5m, 1h, 1d)
+        start: 시작 시각 (ISO 형식, 기본 간격별 OHLC_DEFAULT_LOOKBACK_DAYS 이전)
+        end: 끝 시각 (미포함, 기본 현재)
+    """
+    symbol_list = None
+    if symbols:
+        symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+    try:
+        start_at = datetime.fromisoformat(start) if start else None
+        end_at = datetime.fromisoformat(end) if end else None
+        candles = await run_in_threadpool(
+            db_manager.get_ohlc, symbol_list, interval, start_at, end_at
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "interval": interval,
+        "candles": candles,
+        "count": len(candles),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @app.post("/collect/now")
 async def collect_now(force_all_symbols: bool = True):
     """
@@ -153,6 +520,70 @@ async def collect_now(force_all_symbols: bool = True):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/backfill")
+async def start_backfill(
+    start: str,
+    end: Optional[str] = None,
+    symbols: Optional[str] = None,
+    interval: str = "1m",
+    workers: Optional[int] = None
+):
+    """
+    과거 봉 백필 작업을 백그라운드로 시작
+    같은 요청이 이미 실행 중이면 해당 작업 상태를 반환하고,
+    실패/중단된 요청을 다시 보내면 체크포인트부터 이어서 진행
+    
+    Args:
+        start: 시작 시각 (ISO 형식, 예: 2024-05-01)
+        end: 끝 시각 (미포함, 생략하면 현재 시각까지 - 생략한 요청끼리 같은 작업으로 재개)
+        symbols: 쉼표로 구분된 심볼 리스트 (기본 TARGET_SYMBOLS)
+        interval: 봉 간격 (예: 1m, 5m, 1h, 1d)
+        workers: 병렬 워커 수 (기본 BACKFILL_WORKERS)
+    """
+    symbol_list = TARGET_SYMBOLS
+    if symbols:
+        symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+    try:
+        options = {"interval": interval}
+        if workers:
+            options["workers"] = workers
+        job = BackfillJob(
+            symbol_list,
+            datetime.fromisoformat(start),
+            datetime.fromisoformat(end) if end else None,
+            **options
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if job.job_id in backfill_tasks:
+        return backfill_jobs[job.job_id].get_status()
+    
+    backfill_jobs[job.job_id] = job
+    task = asyncio.create_task(run_in_threadpool(job.run))
+    backfill_tasks[job.job_id] = task
+    task.add_done_callback(lambda done: backfill_finished(job.job_id, done))
+    return job.get_status()
+
+
+def backfill_finished(job_id: str, task: asyncio.Task):
+    """백필 태스크 종료 처리 (참조 해제, 처리되지 않은 예외 기록)"""
+    backfill_tasks.pop(job_id, None)
+    if task.cancelled():
+        logger.warning(f"백필 {job_id} 태스크가 취소되었습니다")
+    elif task.exception() is not None:
+        logger.error(f"백필 {job_id} 실행 중 오류: {task.exception()}")
+
+
+@app.get("/backfill/{job_id}")
+async def get_backfill_status(job_id: str):
+    """백필 작업 진행 상태 조회"""
+    job = backfill_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="백필 작업을 찾을 수 없습니다")
+    return job.get_status()
+
+
 @app.get("/symbols")
 async def get_symbols():
     """등록된 모든 심볼 조회 엔드포인트"""
@@ -199,16 +630,102 @@ async def stop_task():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 텍스트 형식 메트릭 엔드포인트"""
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def get_profile_session(session_id: str):
+    """
+    프로파일 세션 조회
+
+    Raises:
+        HTTPException: 프로파일링이 꺼져 있으면 403, 세션이 없으면 404
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=403, detail="프로파일링이 비활성화되어 있습니다 (PROFILING_ENABLED=true)"
+        )
+    session = profiler.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"프로파일 세션을 찾을 수 없습니다: {session_id}")
+    return session
+
+
+@app.post("/profile")
+async def arm_profile(target: str = "cycle", count: int = 1, route: Optional[str] = None):
+    """
+    프로파일러 무장 엔드포인트
+    다음 count개 수집 사이클(target=cycle) 또는 route 라우트의 count개 요청(target=route)을
+    스택 샘플링과 단계 구간(fetch / parse / insert) 측정으로 캡처
+    
+    Args:
+        target: 'cycle' 또는 'route'
+        count: 캡처할 사이클/요청 수
+        route: 라우트 경로 템플릿 (예: /prices/history)
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=403, detail="프로파일링이 비활성화되어 있습니다 (PROFILING_ENABLED=true)"
+        )
+    try:
+        session = profiler.arm(target, count, route)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.get_status()
+
+
+@app.post("/profile/disarm")
+async def disarm_profile():
+    """프로파일러 무장 해제 (이미 캡처한 결과는 유지)"""
+    session = profiler.disarm()
+    if session is None:
+        return {"message": "무장된 프로파일이 없습니다"}
+    return session.get_status()
+
+
+@app.get("/profile/{session_id}")
+async def get_profile(session_id: str):
+    """프로파일 세션 상태와 단계 구간 요약 조회"""
+    return get_profile_session(session_id).get_status()
+
+
+@app.get("/profile/{session_id}/pstats")
+async def download_profile_pstats(session_id: str):
+    """pstats 파일 다운로드 (python -m pstats 또는 snakeviz로 열기)"""
+    session = get_profile_session(session_id)
+    return Response(
+        content=session.pstats_bytes(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="profile-{session_id}.pstats"'}
+    )
+
+
+@app.get("/profile/{session_id}/collapsed")
+async def download_profile_collapsed(session_id: str):
+    """collapsed-stack 파일 다운로드 (flamegraph.pl / speedscope 입력)"""
+    session = get_profile_session(session_id)
+    return Response(
+        content=session.collapsed(),
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="profile-{session_id}.collapsed"'}
+    )
+
+
 @app.get("/health")
 async def health_check():
     """헬스 체크 엔드포인트"""
     try:
-        # 데이터베이스 연결 상태 확인
-        db_connected = db_manager.connection is not None and db_manager.connection.open
+        # 데이터베이스 연결 상태 확인 (풀에서 체크아웃해 생존 확인)
+        db_connected = await run_in_threadpool(db_manager.is_connected)
         
         return {
             "status": "healthy" if db_connected else "unhealthy",
             "database_connected": db_connected,
+            "database_pool": db_manager.get_pool_stats(),
             "task_running": task_manager.is_running,
             "timestamp": datetime.now().isoformat()
         }
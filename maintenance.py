@@ -0,0 +1,193 @@
+"""
+stock_prices 파티션 관리 및 다운샘플링 작업
+- 미래 일 단위 파티션을 미리 생성
+- 원본 보존 기간이 지난 파티션을 5m/1h/1d 집계 테이블로 다운샘플링한 뒤 통째로 삭제
+- 집계 테이블은 해상도별 보존 기간이 지난 버킷 삭제
+"""
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from config import (
+    MAINTENANCE_INTERVAL,
+    PARTITION_PRECREATE_DAYS,
+    RETENTION_DAYS,
+    ROLLUP_RESOLUTIONS,
+    ROLLUP_LOOKBACK_DAYS,
+)
+from database import DatabaseManager, db_manager
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _as_datetime(day: Optional[date]) -> Optional[datetime]:
+    return datetime.combine(day, datetime.min.time()) if day else None
+
+
+class PartitionMaintenance:
+    """파티션 생성/삭제와 집계 테이블 다운샘플링을 주기적으로 실행"""
+
+    def __init__(
+        self,
+        db: Optional[DatabaseManager] = None,
+        interval: float = MAINTENANCE_INTERVAL,
+        retention: Optional[Dict[str, Optional[int]]] = None,
+        resolutions: Optional[List[str]] = None,
+        precreate_days: int = PARTITION_PRECREATE_DAYS,
+        lookback_days: int = ROLLUP_LOOKBACK_DAYS
+    ):
+        """
+        Args:
+            db: 대상 데이터베이스 매니저 (None이면 전역 db_manager)
+            interval: 작업 주기(초)
+            retention: 해상도별 보존 기간(일, None이면 영구) - 'raw'는 원본
+            resolutions: 보존 기간을 적용할 집계 해상도 목록
+            precreate_days: 미리 만들어 둘 미래 파티션 일수
+            lookback_days: 매 실행마다 다시 집계할 최근 완료 일수
+        """
+        self.db = db or db_manager
+        self.interval = interval
+        self.retention = RETENTION_DAYS if retention is None else retention
+        self.resolutions = ROLLUP_RESOLUTIONS if resolutions is None else resolutions
+        self.precreate_days = precreate_days
+        self.lookback_days = lookback_days
+
+        self.task: Optional[asyncio.Task] = None
+        self.is_running = False
+        self.run_count = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_result: Optional[dict] = None
+        self.last_error: Optional[str] = None
+
+    def _rollup(self, start: Optional[date], end: date, result: dict):
+        """[start, end) 구간을 모든 해상도로 다시 집계 (실패하면 예외)"""
+        counts = self.db.rollup_prices(_as_datetime(start), _as_datetime(end))
+        for resolution, count in counts.items():
+            result["rolled_up"][resolution] = result["rolled_up"].get(resolution, 0) + count
+
+    def run_once(self, today: Optional[date] = None) -> dict:
+        """
+        관리 작업 1회 실행 (블로킹)
+        만료 파티션은 집계가 끝난 경우에만 삭제하므로 중간에 실패해도
+        다음 실행에서 같은 파티션부터 다시 처리
+
+        Args:
+            today: 기준 날짜 (None이면 오늘)
+
+        Returns:
+            dict: 집계 행 수, 삭제/생성 파티션, 집계 테이블 삭제 행 수
+        """
+        today = today or date.today()
+        result = {
+            "rolled_up": {},
+            "dropped_partitions": [],
+            "created_partitions": 0,
+            "purged": {},
+        }
+        if not self.db.ensure_tables():
+            raise RuntimeError("테이블을 준비할 수 없습니다")
+
+        # 최근 완료일 재집계 (저장 시 갱신을 끈 경우나 누락된 버킷 보정)
+        for offset in range(self.lookback_days, 0, -1):
+            day = today - timedelta(days=offset)
+            self._rollup(day, day + timedelta(days=1), result)
+
+        # 저장 시 범위가 넓어 미룬 집계 (백필 등)
+        for resolution, count in self.db.rollup_deferred().items():
+            result["rolled_up"][resolution] = result["rolled_up"].get(resolution, 0) + count
+
+        if self.db.partitioned:
+            partitions = self.db.list_partitions()
+            raw_days = self.retention.get("raw")
+
+            # 만료 파티션: 모든 행이 보존 기간 이전인 파티션 (상한 ≤ 기준일)
+            expired = []
+            if raw_days is not None:
+                cutoff = today - timedelta(days=raw_days)
+                expired = [
+                    p for p in partitions if p["end"] is not None and p["end"] <= cutoff
+                ]
+            for partition in expired:
+                self._rollup(partition["start"], partition["end"], result)
+            result["dropped_partitions"] = [p["name"] for p in expired]
+            self.db.drop_partitions(result["dropped_partitions"])
+
+            # 미래 파티션 미리 생성 (마지막 일 단위 파티션 다음 날부터)
+            ends = [p["end"] for p in partitions if p["end"] is not None and p not in expired]
+            first_day = max(ends) if ends else today
+            last_day = today + timedelta(days=self.precreate_days)
+            days = [
+                first_day + timedelta(days=offset)
+                for offset in range((last_day - first_day).days + 1)
+            ]
+            result["created_partitions"] = self.db.add_partitions(days)
+        else:
+            logger.warning("stock_prices가 파티션되지 않아 원본 보존 기간 삭제를 건너뜁니다")
+
+        # 집계 테이블 보존 기간
+        for resolution in self.resolutions:
+            days = self.retention.get(resolution)
+            if days is not None:
+                result["purged"][resolution] = self.db.purge_rollup(
+                    resolution, _as_datetime(today - timedelta(days=days))
+                )
+
+        logger.info(
+            f"파티션 관리 완료: 집계 {result['rolled_up']}, "
+            f"삭제 {len(result['dropped_partitions'])}개, "
+            f"생성 {result['created_partitions']}개"
+        )
+        return result
+
+    async def run_periodically(self):
+        """interval초마다 관리 작업 실행 (워커 스레드에서 실행)"""
+        self.is_running = True
+        logger.info(f"파티션 관리 작업 시작 ({self.interval}초 주기)")
+        while self.is_running:
+            try:
+                self.last_result = await asyncio.to_thread(self.run_once)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"파티션 관리 작업 중 오류: {e}")
+            self.run_count += 1
+            self.last_run_at = datetime.now()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """주기적 관리 작업 시작"""
+        if not self.is_running:
+            self.task = asyncio.create_task(self.run_periodically())
+
+    def stop(self):
+        """주기적 관리 작업 중지"""
+        if self.is_running:
+            self.is_running = False
+            if self.task:
+                self.task.cancel()
+            logger.info("파티션 관리 작업이 중지되었습니다")
+
+    def get_status(self) -> dict:
+        """
+        관리 작업 상태 반환
+
+        Returns:
+            dict: 실행 여부, 실행 횟수, 마지막 실행 결과/오류
+        """
+        return {
+            "is_running": self.is_running,
+            "interval_seconds": self.interval,
+            "partitioned": self.db.partitioned,
+            "retention_days": self.retention,
+            "run_count": self.run_count,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+# 전역 파티션 관리 작업 인스턴스
+maintenance = PartitionMaintenance()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+데이터베이스 관리 명령
+
+사용 예:
+    python manage.py rebuild-latest
+    python manage.py dedupe
+    python manage.py partition
+    python manage.py maintenance
+    python manage.py export --format parquet --symbols AAPL --start 2024-05-01 --output aapl.parquet
+    python manage.py backfill --symbols AAPL,MSFT --start 2024-05-01 --end 2024-05-20
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from backfill import BackfillJob
+from config import BACKFILL_INTERVAL_LIMITS, BACKFILL_WORKERS, TARGET_SYMBOLS
+from database import db_manager
+from export import EXPORT_FORMATS, export_to_file
+from maintenance import maintenance
+
+
+def rebuild_latest(args: argparse.Namespace) -> int:
+    """stock_prices에서 stock_latest_prices 재구성"""
+    count = db_manager.rebuild_latest_prices()
+    if count < 0:
+        return 1
+    print(f"✅ 최신 가격 테이블 재구성 완료: {count}개 심볼")
+    return 0
+
+
+def dedupe(args: argparse.Namespace) -> int:
+    """중복 (symbol, timestamp) 행 삭제 후 유니크 키 적용"""
+    removed = db_manager.deduplicate_prices()
+    if removed < 0:
+        return 1
+    print(f"✅ 중복 행 {removed}개 삭제, (symbol, timestamp) 유니크 키 적용 완료")
+    return 0
+
+
+def partition(args: argparse.Namespace) -> int:
+    """파티션되지 않은 stock_prices를 일 단위 RANGE 파티션으로 재구성"""
+    if not db_manager.partition_prices_table():
+        return 1
+    print("✅ stock_prices 일 단위 파티션 적용 완료")
+    return 0
+
+
+def run_maintenance(args: argparse.Namespace) -> int:
+    """파티션 생성/삭제 및 집계 테이블 다운샘플링 1회 실행"""
+    result = maintenance.run_once()
+    print(
+        f"✅ 파티션 관리 완료: 삭제 {len(result['dropped_partitions'])}개, "
+        f"생성 {result['created_partitions']}개, 집계 {result['rolled_up']}"
+    )
+    return 0
+
+
+def export(args: argparse.Namespace) -> int:
+    """stock_prices를 CSV / Arrow / Parquet 파일로 내보내기"""
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] if args.symbols else None
+    written = export_to_file(
+        args.output,
+        args.format,
+        symbols,
+        datetime.fromisoformat(args.start) if args.start else None,
+        datetime.fromisoformat(args.end) if args.end else None
+    )
+    print(f"✅ 내보내기 완료: {args.output} ({written} bytes)")
+    return 0
+
+
+def backfill(args: argparse.Namespace) -> int:
+    """지정한 심볼/기간의 과거 봉을 청크 단위로 병렬 백필"""
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    job = BackfillJob(
+        symbols,
+        datetime.fromisoformat(args.start),
+        datetime.fromisoformat(args.end) if args.end else None,
+        interval=args.interval,
+        workers=args.workers,
+        use_load_data=args.load_data
+    )
+    status = job.run()
+    print(
+        f"{'✅' if status['status'] == 'completed' else '⚠️'} 백필 {status['job_id']}: "
+        f"청크 {status['chunks_done']}/{status['chunks_total']}개, "
+        f"{status['rows_inserted']}행 적재 ({status['rows_per_second']} rows/sec)"
+    )
+    return 0 if status["status"] == "completed" else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """관리 명령 CLI 진입점"""
+    parser = argparse.ArgumentParser(description="주식 데이터베이스 관리 명령")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser(
+        "rebuild-latest",
+        help="stock_prices 전체에서 심볼별 최신 가격 테이블 재구성"
+    )
+    rebuild.set_defaults(func=rebuild_latest)
+    
+    dedupe_parser = subparsers.add_parser(
+        "dedupe",
+        help="중복 (symbol, timestamp) 행을 정리하고 유니크 키 적용 (기존 DB 1회 이관)"
+    )
+    dedupe_parser.set_defaults(func=dedupe)
+    
+    partition_parser = subparsers.add_parser(
+        "partition",
+        help="stock_prices를 일 단위 RANGE 파티션으로 재구성 (기존 DB 1회 이관, dedupe 후 실행)"
+    )
+    partition_parser.set_defaults(func=partition)
+    
+    maintenance_parser = subparsers.add_parser(
+        "maintenance",
+        help="미래 파티션 생성, 만료 파티션 집계 후 삭제, 집계 테이블 보존 기간 적용"
+    )
+    maintenance_parser.set_defaults(func=run_maintenance)
+    
+    export_parser = subparsers.add_parser(
+        "export",
+        help="stock_prices를 CSV / Arrow IPC / Parquet 파일로 내보내기 (Arrow/Parquet은 pyarrow 필요)"
+    )
+    export_parser.add_argument("--format", default="csv", choices=list(EXPORT_FORMATS))
+    export_parser.add_argument("--symbols", help="쉼표로 구분된 심볼 (기본 전체)")
+    export_parser.add_argument("--start", help="시작 시각 (ISO 형식, 포함)")
+    export_parser.add_argument("--end", help="끝 시각 (ISO 형식, 미포함)")
+    export_parser.add_argument("--output", required=True, help="출력 파일 경로")
+    export_parser.set_defaults(func=export)
+    
+    backfill_parser = subparsers.add_parser(
+        "backfill",
+        help="과거 봉을 조회 한도 단위 청크로 나눠 stock_prices에 대량 적재 (중단 시 재실행으로 재개)"
+    )
+    backfill_parser.add_argument("--symbols", default=",".join(TARGET_SYMBOLS),
+                                 help="쉼표로 구분된 심볼 (기본 TARGET_SYMBOLS)")
+    backfill_parser.add_argument("--start", required=True,
+                                 help="시작 시각 (ISO 형식, 예: 2024-05-01)")
+    backfill_parser.add_argument("--end", help="끝 시각 (미포함, 기본 현재)")
+    backfill_parser.add_argument("--interval", default="1m",
+                                 choices=list(BACKFILL_INTERVAL_LIMITS))
+    backfill_parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS)
+    backfill_parser.add_argument("--load-data", action="store_true",
+                                 help="LOAD DATA LOCAL INFILE로 적재 (DB_LOCAL_INFILE=true 필요)")
+    backfill_parser.set_defaults(func=backfill)
+
+    args = parser.parse_args(argv)
+
+    if not db_manager.connect():
+        print("❌ 데이터베이스 연결 실패", file=sys.stderr)
+        return 1
+    try:
+        if not db_manager.create_tables():
+            return 1
+        return args.func(args)
+    finally:
+        db_manager.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,42 +1,174 @@
 """
 거래소 개장 시간 확인 및 시장 상태 관리
+거래소별 시간대/개장 시간/휴장일을 시작 시 한 번 파싱한 세션 달력으로 판단
 """
 import pytz
-from datetime import datetime, time
-from typing import Dict, List
-from config import MARKET_HOURS, SYMBOL_MARKET
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import (
+    MARKET_HOURS,
+    MARKET_HOLIDAYS,
+    MARKET_SPECIAL_SESSIONS,
+    MARKET_EXTENDED_HOURS,
+    SYMBOL_MARKET,
+)
 
+# 다음 개장 시각을 찾을 때 살펴볼 최대 일수 (연휴 포함)
+CALENDAR_SEARCH_DAYS = 14
 
-def is_market_open(market: str) -> bool:
+Session = Tuple[datetime, datetime]
+
+
+def _parse_time(value: str) -> time:
+    return datetime.strptime(value, '%H:%M').time()
+
+
+class MarketCalendar:
+    """거래소 세션 달력 (주말/휴장일/단축 거래일 반영, 일자별 세션은 캐시)"""
+    
+    def __init__(
+        self,
+        market: str,
+        hours: dict,
+        holidays: Iterable[str] = (),
+        special_sessions: Optional[Dict[str, tuple]] = None,
+        extended: bool = False
+    ):
+        """
+        Args:
+            market: 거래소 코드
+            hours: MARKET_HOURS 항목 (timezone, open_time, close_time, pre_open, post_close)
+            holidays: 휴장일 (YYYY-MM-DD)
+            special_sessions: 정규장 시간이 다른 날 → (개장, 폐장)
+            extended: 시간외 세션(pre_open ~ post_close) 포함 여부
+        """
+        self.market = market
+        self.timezone = pytz.timezone(hours['timezone'])
+        self.open_time = _parse_time(hours['open_time'])
+        self.close_time = _parse_time(hours['close_time'])
+        self.pre_open = None
+        self.post_close = None
+        if extended:
+            self.pre_open = _parse_time(hours['pre_open']) if hours.get('pre_open') else None
+            self.post_close = _parse_time(hours['post_close']) if hours.get('post_close') else None
+        self.holidays = {date.fromisoformat(day) for day in holidays}
+        self.special_sessions = {
+            date.fromisoformat(day): (_parse_time(open_at), _parse_time(close_at))
+            for day, (open_at, close_at) in (special_sessions or {}).items()
+        }
+        self._sessions: Dict[date, Optional[Session]] = {}
+    
+    def now(self) -> datetime:
+        """거래소 시간대의 현재 시각"""
+        return datetime.now(self.timezone)
+    
+    def _local(self, now: Optional[datetime]) -> datetime:
+        return self.now() if now is None else now.astimezone(self.timezone)
+    
+    def session(self, day: date) -> Optional[Session]:
+        """
+        해당 일자의 세션 (개장, 폐장)
+        단축 거래일에는 시간외 세션을 개장 전에만 붙임
+        
+        Args:
+            day: 거래소 현지 날짜
+        
+        Returns:
+            Optional[Session]: 시간대가 붙은 (개장, 폐장) 시각, 주말/휴장일이면 None
+        """
+        if day in self._sessions:
+            return self._sessions[day]
+        session = None
+        if day.weekday() < 5 and day not in self.holidays:
+            special = self.special_sessions.get(day)
+            open_time, close_time = special or (self.open_time, self.close_time)
+            if self.pre_open is not None:
+                open_time = min(open_time, self.pre_open)
+            if self.post_close is not None and special is None:
+                close_time = max(close_time, self.post_close)
+            session = (
+                self.timezone.localize(datetime.combine(day, open_time)),
+                self.timezone.localize(datetime.combine(day, close_time)),
+            )
+        self._sessions[day] = session
+        return session
+    
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """
+        개장 여부 (개장/폐장 시각 포함)
+        
+        Args:
+            now: 기준 시각 (시간대 포함, None이면 현재)
+        """
+        now = self._local(now)
+        session = self.session(now.date())
+        return session is not None and session[0] <= now <= session[1]
+    
+    def next_open(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        다음 개장 시각 (세션 중이면 now)
+        
+        Args:
+            now: 기준 시각 (시간대 포함, None이면 현재)
+        
+        Returns:
+            Optional[datetime]: 개장 시각 (CALENDAR_SEARCH_DAYS 안에 세션이 없으면 None)
+        """
+        now = self._local(now)
+        for offset in range(CALENDAR_SEARCH_DAYS):
+            session = self.session(now.date() + timedelta(days=offset))
+            if session is not None and now <= session[1]:
+                return max(now, session[0])
+        return None
+
+
+# 거래소별 세션 달력 (시작 시 한 번 생성)
+calendars: Dict[str, MarketCalendar] = {
+    market: MarketCalendar(
+        market,
+        hours,
+        MARKET_HOLIDAYS.get(market, ()),
+        MARKET_SPECIAL_SESSIONS.get(market),
+        MARKET_EXTENDED_HOURS
+    )
+    for market, hours in MARKET_HOURS.items()
+}
+
+
+def is_market_open(market: str, now: Optional[datetime] = None) -> bool:
     """
     특정 거래소의 개장 여부 확인
     
     Args:
         market: 거래소 코드 ('US', 'KR')
+        now: 기준 시각 (시간대 포함, None이면 현재)
     
     Returns:
         bool: 개장 여부
     """
-    if market not in MARKET_HOURS:
-        return False
-    
-    market_config = MARKET_HOURS[market]
-    timezone = pytz.timezone(market_config['timezone'])
-    
-    # 현재 시간을 해당 시간대로 변환
-    current_time = datetime.now(timezone)
-    current_time_only = current_time.time()
-    
-    # 개장/폐장 시간 파싱
-    open_time = datetime.strptime(market_config['open_time'], '%H:%M').time()
-    close_time = datetime.strptime(market_config['close_time'], '%H:%M').time()
+    calendar = calendars.get(market)
+    return calendar is not None and calendar.is_open(now)
+
+
+def next_market_open(
+    markets: Iterable[str], now: Optional[datetime] = None
+) -> Optional[datetime]:
+    """
+    여러 거래소 중 가장 먼저 열리는 개장 시각 (하나라도 열려 있으면 now)
     
-    # 주말 확인 (토요일=5, 일요일=6)
-    if current_time.weekday() >= 5:
-        return False
+    Args:
+        markets: 거래소 코드 목록
+        now: 기준 시각 (시간대 포함, None이면 현재)
     
-    # 개장 시간 내인지 확인
-    return open_time <= current_time_only <= close_time
+    Returns:
+        Optional[datetime]: 개장 시각 (달력에 없는 거래소만 있거나 세션이 없으면 None)
+    """
+    opens = [
+        calendars[market].next_open(now)
+        for market in set(markets) if market in calendars
+    ]
+    opens = [opened for opened in opens if opened is not None]
+    return min(opens) if opens else None
 
 
 def get_active_symbols() -> List[str]:
@@ -92,8 +224,7 @@ def get_current_timezone_time(market: str) -> datetime:
     Returns:
         datetime: 해당 시간대의 현재 시간
     """
-    if market not in MARKET_HOURS:
+    if market not in calendars:
         return datetime.now()
     
-    timezone = pytz.timezone(MARKET_HOURS[market]['timezone'])
-    return datetime.now(timezone) 
\ No newline at end of file
+    return calendars[market].now() 
\ No newline at end of file
@@ -0,0 +1,411 @@
+"""
+Prometheus 텍스트 형식(/metrics) 메트릭 레지스트리
+- 카운터 / 게이지 / 히스토그램 (레이블 조합마다 자식 하나를 처음 쓸 때만 생성)
+- 히스토그램은 고정 버킷 배열에 개수만 더하므로 관측마다 리스트/딕셔너리를 만들지 않음
+- 자식별 락은 값 갱신 몇 줄만 감싸므로 수집 워커 스레드끼리 거의 경합하지 않음
+- DB 연결 상태/큐 길이 같은 게이지는 스크레이프 시점에 함수로 읽어 수집 경로에 비용이 없음
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import METRICS_ENABLED, METRICS_LATENCY_BUCKETS, METRICS_BATCH_BUCKETS
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Prometheus 텍스트 노출 형식 Content-Type (charset은 Response가 덧붙임)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _NoopChild:
+    """메트릭이 비활성화됐을 때 모든 기록을 무시하는 자식"""
+
+    def inc(self, amount: float = 1.0):
+        pass
+
+    def dec(self, amount: float = 1.0):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def set_function(self, function: Callable[[], float]):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+_NOOP = _NoopChild()
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def sample(self) -> float:
+        return self._value
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_function", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """스크레이프할 때마다 function()으로 값을 읽음"""
+        self._function = function
+
+    def sample(self) -> float:
+        if self._function is None:
+            return self._value
+        try:
+            return float(self._function())
+        except Exception as e:
+            logger.debug(f"게이지 값 조회 실패: {e}")
+            return float("nan")
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # 버킷별 개수 (누적 아님, 마지막 칸은 +Inf)
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def sample(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric:
+    """레이블 조합별 자식을 가진 메트릭 (레이블이 없으면 메트릭 자체로 기록)"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], enabled: bool):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self._default = self.labels() if not self.labelnames else None
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        레이블 값 조합의 자식 반환 (처음 보는 조합이면 생성)
+
+        Raises:
+            ValueError: 레이블 값 개수가 레이블 이름 개수와 다른 경우
+        """
+        if not self.enabled:
+            return _NOOP
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name}: 레이블 {len(self.labelnames)}개가 필요합니다 ({len(values)}개 전달)"
+                )
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in self._samples():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        labels = _label_text(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.sample())}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    """현재 값 게이지 (값을 직접 설정하거나 스크레이프 시점에 함수로 읽음)"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        enabled: bool,
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, enabled)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        counts, total = child.sample()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _label_text(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _label_text(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 등록 및 텍스트 형식 출력"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        """
+        Args:
+            enabled: False이면 모든 기록을 무시 (/metrics는 HELP/TYPE만 출력)
+        """
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, self.enabled))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, self.enabled))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            Histogram(name, documentation, labelnames, self.enabled, buckets)
+        )
+
+    def render(self) -> str:
+        """
+        등록된 메트릭을 Prometheus 텍스트 노출 형식으로 출력
+
+        Returns:
+            str: /metrics 응답 본문
+        """
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RouteLatencyMiddleware:
+    """
+    API 라우트별 처리 시간을 기록하는 ASGI 미들웨어
+    응답 헤더를 보낼 때까지의 시간을 라우트 경로 템플릿(/backfill/{job_id} 등) 기준으로 기록
+    (스트리밍 응답은 본문 전송 시간을 포함하지 않음)
+    """
+
+    def __init__(self, app, histogram: Optional[Histogram] = None):
+        """
+        Args:
+            app: 감쌀 ASGI 앱
+            histogram: 기록 대상 (None이면 전역 http_request_seconds)
+        """
+        self.app = app
+        self.histogram = histogram or http_request_seconds
+        # 엔드포인트 함수 → 경로 템플릿 (처음 보는 엔드포인트에서 다시 만듦)
+        self._paths: Dict[Callable, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # 매칭되는 라우트가 없으면 경로 대신 고정 값 (레이블 수 폭증 방지)
+            return "unmatched"
+        path = self._paths.get(endpoint)
+        if path is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._paths = {
+                getattr(route, "endpoint", None): route.path for route in routes
+            }
+            path = self._paths.setdefault(endpoint, "unmatched")
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status: int):
+            nonlocal recorded
+            recorded = True
+            self.histogram.labels(
+                scope["method"], self._route(scope), str(status)
+            ).observe(time.perf_counter() - started)
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start" and not recorded:
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            if not recorded:
+                record(500)
+
+
+# 전역 메트릭 레지스트리
+registry = MetricsRegistry()
+
+# 수집 경로
+fetch_seconds = registry.histogram(
+    "stock_fetch_seconds",
+    "종목별 가격 조회 지연 시간(초) - path=batch(다중 종목 청크), fallback(단일 종목 폴백 단계)",
+    ("symbol", "path"),
+)
+fallback_tier_total = registry.counter(
+    "stock_fallback_tier_total",
+    "종목별 가격을 얻은 폴백 단계 사용 횟수 (tier=none은 모든 단계 실패)",
+    ("symbol", "tier"),
+)
+collection_cycle_seconds = registry.histogram(
+    "stock_collection_cycle_seconds",
+    "스케줄별 수집 사이클 소요 시간(초)",
+    ("schedule",),
+)
+
+# 저장 경로
+db_insert_seconds = registry.histogram(
+    "stock_db_insert_seconds",
+    "bulk_insert_prices 지연 시간(초)",
+)
+db_insert_rows = registry.histogram(
+    "stock_db_insert_rows",
+    "bulk_insert_prices 배치 크기(행)",
+    buckets=METRICS_BATCH_BUCKETS,
+)
+db_up = registry.gauge(
+    "stock_db_up",
+    "DB 연결 풀 사용 가능 여부 (1: 사용 가능, 0: 재연결 백오프 중)",
+)
+db_pool_in_use = registry.gauge(
+    "stock_db_pool_in_use",
+    "사용 중인 DB 연결 수",
+)
+queue_depth = registry.gauge(
+    "stock_queue_depth",
+    "대기 큐 길이 - queue=write_buffer(저장 대기 틱), broadcast(가장 밀린 구독자 메시지)",
+    ("queue",),
+)
+
+# API
+http_request_seconds = registry.histogram(
+    "http_request_seconds",
+    "API 라우트별 응답 헤더까지 처리 시간(초)",
+    ("method", "route", "status"),
+)
@@ -1,105 +1,572 @@
 """
 주기적 주식 데이터 수집 작업 관리
+거래소별(또는 사용자 정의 종목 묶음별) 스케줄이 각자의 주기/위상/지터로 독립 실행되어
+스케줄들의 사이클이 같은 시각에 겹치지 않고, 느린 묶음이 빠른 묶음을 기다리게 하지 않음
+사이클 안의 배치 청크 요청도 주기의 일부 구간에 고르게 나눠 보내 상류 요청이 격자 시각에 몰리지 않음
 """
 import asyncio
 import logging
+import random
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional
-from config import DATA_COLLECTION_INTERVAL
-from stock_data_collector import stock_collector
-from market_utils import get_market_status
+from typing import Deque, Dict, List, Optional, Tuple
+from config import (
+    DATA_COLLECTION_INTERVAL,
+    MARKET_CALENDAR_ENABLED,
+    CLOSED_MARKET_HEARTBEAT,
+    COLLECTION_SCHEDULES,
+    SCHEDULE_JITTER,
+    CHUNK_DISPATCH_SPREAD,
+    CYCLE_DEADLINE_RATIO,
+    CYCLE_DEFER_POLICY,
+    ADAPTIVE_POLLING_ENABLED,
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_REQUEST_BUDGET,
+    SYMBOL_MARKET,
+    TARGET_SYMBOLS,
+)
+from adaptive_polling import AdaptivePollingPlanner, RequestBudget
+from stock_data_collector import StockDataCollector, stock_collector
+from market_utils import calendars, get_market_status, next_market_open
+from metrics import collection_cycle_seconds
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 스케줄별로 상태에 보관하는 최근 사이클 기록 수
+RECENT_CYCLES = 10
+
+
+def build_schedule_specs(
+    schedules: Optional[Dict[str, dict]] = None,
+    symbols: Optional[List[str]] = None
+) -> Dict[str, dict]:
+    """
+    스케줄 설정을 (이름 → symbols/interval/phase) 형태로 정리
+
+    Args:
+        schedules: COLLECTION_SCHEDULES 형식 설정 (비어 있으면 거래소별 자동 생성)
+        symbols: 대상 종목 (None이면 TARGET_SYMBOLS)
+
+    Returns:
+        Dict[str, dict]: 스케줄 이름 → {'symbols', 'interval', 'phase', 'adaptive'}
+    """
+    symbols = list(TARGET_SYMBOLS) if symbols is None else list(symbols)
+    if not schedules:
+        # 대상 종목을 거래소별로 나눔 (거래소를 모르는 종목은 'default')
+        schedules = {}
+        for symbol in symbols:
+            market = SYMBOL_MARKET.get(symbol, "default")
+            schedules.setdefault(market, {"symbols": []})["symbols"].append(symbol)
+
+    specs = {}
+    for index, (name, spec) in enumerate(schedules.items()):
+        if "symbols" in spec:
+            group = list(spec["symbols"])
+        else:
+            group = [s for s in symbols if SYMBOL_MARKET.get(s) == spec.get("market")]
+        interval = float(spec.get("interval", DATA_COLLECTION_INTERVAL))
+        # 위상을 지정하지 않은 스케줄은 주기 안에 고르게 분산
+        phase = spec.get("phase", index * interval / len(schedules))
+        specs[name] = {
+            "symbols": group,
+            "interval": interval,
+            "phase": float(phase),
+            "adaptive": bool(spec.get("adaptive", ADAPTIVE_POLLING_ENABLED)),
+        }
+    return specs
+
+
+class CollectionSchedule:
+    """종목 묶음 하나의 수집 스케줄 (독립 태스크로 실행)"""
+
+    def __init__(
+        self,
+        name: str,
+        symbols: List[str],
+        interval: float = DATA_COLLECTION_INTERVAL,
+        phase: float = 0.0,
+        jitter: float = SCHEDULE_JITTER,
+        collector: Optional[StockDataCollector] = None,
+        calendar_enabled: bool = MARKET_CALENDAR_ENABLED,
+        heartbeat_interval: float = CLOSED_MARKET_HEARTBEAT,
+        deadline_ratio: float = CYCLE_DEADLINE_RATIO,
+        defer_policy: str = CYCLE_DEFER_POLICY,
+        dispatch_spread: float = CHUNK_DISPATCH_SPREAD
+    ):
+        """
+        Args:
+            name: 스케줄 이름 (상태 표시용)
+            symbols: 수집할 종목
+            interval: 수집 주기(초)
+            phase: 주기 격자 위상(초) - 사이클은 phase + k × interval 시각에 시작
+            jitter: 사이클 시작 시각에 더하는 무작위 지연 상한(초, interval 이하로 제한)
+            collector: 데이터 수집기 (None이면 전역 stock_collector)
+            calendar_enabled: 거래소 달력 사용 여부 (False면 장 여부와 무관하게 매 주기 수집)
+            heartbeat_interval: 장 마감 중 확인 수집 주기(초, 0이면 비활성화)
+            deadline_ratio: 사이클 마감 시각 (시작 후 interval × 비율)
+            defer_policy: 마감까지 못 끝낸 종목 처리 ('defer': 다음 사이클에 먼저 조회, 'cancel': 건너뜀)
+            dispatch_spread: 사이클 안의 배치 청크 시작 시각을 나눌 창 (interval × 비율, 0이면 동시에 시작)
+        """
+        if defer_policy not in ("defer", "cancel"):
+            raise ValueError(f"알 수 없는 미룸 정책: {defer_policy}")
+        self.name = name
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.phase = phase % interval
+        self.jitter = min(max(jitter, 0.0), interval)
+        self.collector = collector or stock_collector
+        self.calendar_enabled = calendar_enabled
+        self.heartbeat_interval = heartbeat_interval
+        self.deadline = interval * deadline_ratio
+        self.defer_policy = defer_policy
+        self.dispatch_spread = interval * min(max(dispatch_spread, 0.0), 1.0)
+        self.markets = sorted({SYMBOL_MARKET.get(s) or "default" for s in self.symbols})
 
-class PeriodicTaskManager:
-    """주기적 작업 관리 클래스"""
-    
-    def __init__(self):
         self.task: Optional[asyncio.Task] = None
         self.is_running = False
         self.cycle_count = 0
-        self.start_time: Optional[datetime] = None
-    
-    async def periodic_data_collection(self):
+        self.failed_cycles = 0
+        self.overruns = 0
+        self.last_cycle_at: Optional[datetime] = None
+        self.last_cycle_seconds: Optional[float] = None
+        self.next_run_at: Optional[datetime] = None
+        # 사이클 마감: 다음 사이클에 먼저 조회할 종목, 누적 미룸/놓친 격자 시각 수, 최근 사이클 기록
+        self._deferred: List[str] = []
+        self.deferred_total = 0
+        self.missed_ticks = 0
+        self._last_tick: Optional[float] = None
+        self._missed_before_cycle = 0
+        self.recent_cycles: Deque[dict] = deque(maxlen=RECENT_CYCLES)
+        # 장 마감 중 확인 수집 횟수, 마지막 확인 수집 시각(monotonic)
+        self.heartbeat_count = 0
+        self._last_heartbeat: Optional[float] = None
+        self.sleeping_until: Optional[datetime] = None
+
+    def next_tick(self, now: float) -> float:
+        """
+        now 이후 첫 주기 격자 시각 (epoch 초)
+
+        Args:
+            now: 기준 시각 (epoch 초)
+        """
+        cycles = -(-(now - self.phase) // self.interval)
+        return self.phase + cycles * self.interval
+
+    def plan_cycle(
+        self, now: Optional[datetime] = None
+    ) -> Tuple[List[str], Optional[datetime]]:
+        """
+        이번 사이클 수집 대상과 다음 개장 시각 결정
+        달력에 없는 거래소의 종목은 장 여부를 알 수 없으므로 항상 수집
+
+        Args:
+            now: 기준 시각 (시간대 포함, None이면 현재)
+
+        Returns:
+            Tuple[List[str], Optional[datetime]]: (개장 중인 종목, 스케줄 거래소의 다음 개장 시각)
+        """
+        if not self.calendar_enabled:
+            return list(self.symbols), None
+        markets = {SYMBOL_MARKET.get(symbol) for symbol in self.symbols}
+        open_markets = {
+            market for market in markets
+            if market in calendars and calendars[market].is_open(now)
+        }
+        symbols = [
+            symbol for symbol in self.symbols
+            if SYMBOL_MARKET.get(symbol) in open_markets
+            or SYMBOL_MARKET.get(symbol) not in calendars
+        ]
+        return symbols, next_market_open(markets, now)
+
+    def _heartbeat_due(self) -> bool:
+        if self.heartbeat_interval <= 0:
+            return False
+        return (
+            self._last_heartbeat is None
+            or time.monotonic() - self._last_heartbeat >= self.heartbeat_interval
+        )
+
+    def _closed_sleep(self, next_open: Optional[datetime]) -> float:
+        """장 마감 중 대기 시간(초): 다음 개장 또는 다음 확인 수집 중 먼저 오는 시점까지"""
+        waits = []
+        if next_open is not None:
+            waits.append((next_open - datetime.now(next_open.tzinfo)).total_seconds())
+        if self.heartbeat_interval > 0 and self._last_heartbeat is not None:
+            waits.append(
+                self._last_heartbeat + self.heartbeat_interval - time.monotonic()
+            )
+        if not waits:
+            # 달력에 세션이 없으면 수집 주기마다 다시 확인
+            return self.interval
+        return max(min(waits), 1.0)
+
+    def _cycle_symbols(self) -> Tuple[List[str], bool, Optional[datetime]]:
+        """
+        이번에 수집할 종목 결정
+
+        Returns:
+            Tuple[List[str], bool, Optional[datetime]]: (종목, 장 마감 확인 수집 여부, 다음 개장 시각)
+            - 모두 닫혀 있고 확인 수집 시점도 아니면 빈 종목 리스트
+        """
+        symbols, next_open = self.plan_cycle()
+        if symbols:
+            return symbols, False, next_open
+        if not self._heartbeat_due():
+            return [], False, next_open
+        # 장 마감 중 저빈도 확인 수집 (스케줄 전체 종목)
+        self.heartbeat_count += 1
+        self._last_heartbeat = time.monotonic()
+        return list(self.symbols), True, next_open
+
+    async def _sleep_while_closed(self, next_open: Optional[datetime]):
+        """장 마감 중 다음 개장 또는 확인 수집 시점까지 대기"""
+        sleep_time = self._closed_sleep(next_open)
+        self.sleeping_until = datetime.fromtimestamp(time.time() + sleep_time)
+        self.next_run_at = None
+        # 장 마감 대기는 놓친 격자 시각으로 세지 않음
+        self._last_tick = None
+        logger.info(
+            f"[{self.name}] 대상 거래소 장 마감 - 다음 개장 {next_open}, "
+            f"{sleep_time:.0f}초 대기"
+        )
+        await asyncio.sleep(sleep_time)
+
+    async def _sleep_until_next_tick(self):
+        """
+        다음 주기 격자 시각 + 무작위 지터까지 대기
+        (사이클 안의 배치 청크 요청은 dispatch_spread 창에 따로 나눠 보냄)
+        사이클이 주기를 넘겨 지나간 격자 시각은 쌓아 두지 않고 하나로 합쳐 건너뜀
+        """
+        tick = self.next_tick(time.time())
+        if self._last_tick is not None:
+            missed = int(round((tick - self._last_tick) / self.interval)) - 1
+            if missed > 0:
+                self.missed_ticks += missed
+                self._missed_before_cycle += missed
+                logger.warning(
+                    f"[{self.name}] 놓친 주기 {missed}개를 건너뛰고 다음 격자 시각부터 수집"
+                )
+        self._last_tick = tick
+        start_at = tick + random.uniform(0, self.jitter)
+        self.next_run_at = datetime.fromtimestamp(start_at)
+        await asyncio.sleep(max(start_at - time.time(), 0.0))
+
+    async def run(self):
+        """
+        주기 격자(위상 포함)에 맞춰 반복 수집
+        대상 거래소가 모두 닫혀 있으면 다음 개장(또는 확인 수집 시점)까지 대기
+        """
+        self.is_running = True
+        logger.info(
+            f"[{self.name}] 수집 스케줄 시작 - {len(self.symbols)}개 종목, "
+            f"{self.interval:.0f}초 주기, 위상 {self.phase:.1f}초, 지터 {self.jitter:.1f}초"
+        )
+
+        while self.is_running:
+            await self._sleep_until_next_tick()
+
+            symbols, heartbeat, next_open = self._cycle_symbols()
+            if not symbols:
+                await self._sleep_while_closed(next_open)
+                continue
+            self.sleeping_until = None
+
+            self._deferred = await self._run_cycle(
+                self._deferred_first(symbols), heartbeat
+            )
+
+    def _deferred_first(self, symbols: List[str]) -> List[str]:
+        """지난 사이클에서 미룬 종목을 앞에 둔 수집 순서 (이번에 수집할 종목만)"""
+        if not self._deferred:
+            return symbols
+        targets = set(symbols)
+        first = [s for s in self._deferred if s in targets]
+        carried = set(first)
+        return first + [s for s in symbols if s not in carried]
+
+    async def _run_cycle(self, symbols: List[str], heartbeat: bool) -> List[str]:
+        """
+        사이클 1회 수집 (마감 시각까지 끝난 종목만 저장) 및 소요 시간 기록
+
+        Returns:
+            List[str]: 다음 사이클로 미룰 종목 ('cancel' 정책이면 항상 빈 리스트)
+        """
+        cycle_start = time.monotonic()
+        deadline = cycle_start + self.deadline
+        self.cycle_count += 1
+        self.last_cycle_at = datetime.now()
+        success = False
+        deferred: List[str] = []
+
+        try:
+            # 시장 상태 확인
+            market_status = get_market_status()
+            logger.info(
+                f"[{self.name}] 사이클 {self.cycle_count} 시작 - 시장 상태: {market_status}"
+                + (" (장 마감 확인 수집)" if heartbeat else "")
+            )
+
+            # 데이터 수집 및 저장 (개장 중인 거래소의 종목만, 마감 전에 끝난 결과만 저장)
+            success, deferred = await self.collector.collect_and_save_by_deadline(
+                symbols, deadline, spread=self.dispatch_spread
+            )
+
+            if success:
+                logger.info(f"[{self.name}] 사이클 {self.cycle_count} 완료")
+            else:
+                self.failed_cycles += 1
+                logger.warning(f"[{self.name}] 사이클 {self.cycle_count} 실패")
+
+        except Exception as e:
+            self.failed_cycles += 1
+            logger.error(f"[{self.name}] 사이클 {self.cycle_count} 중 오류 발생: {e}")
+
+        # 사이클 소요 시간 계산 (주기를 넘기면 놓친 격자 시각은 건너뜀)
+        self.last_cycle_seconds = time.monotonic() - cycle_start
+        logger.info(
+            f"[{self.name}] 사이클 {self.cycle_count} 소요 시간: {self.last_cycle_seconds:.2f}초"
+        )
+        if self.last_cycle_seconds > self.interval:
+            self.overruns += 1
+            logger.warning(
+                f"[{self.name}] 사이클 {self.cycle_count}이 {self.interval:.0f}초를 초과했습니다"
+            )
+        collection_cycle_seconds.labels(self.name).observe(self.last_cycle_seconds)
+        self.deferred_total += len(deferred)
+        self.recent_cycles.append({
+            "cycle": self.cycle_count,
+            "started_at": self.last_cycle_at.isoformat(),
+            "seconds": round(self.last_cycle_seconds, 3),
+            "symbols": len(symbols),
+            "deferred": len(deferred),
+            "missed_ticks": self._missed_before_cycle,
+            "success": success,
+            "heartbeat": heartbeat,
+        })
+        self._missed_before_cycle = 0
+        return deferred if self.defer_policy == "defer" else []
+
+    def start(self):
+        """스케줄 시작"""
+        if not self.is_running:
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """스케줄 중지"""
+        if self.is_running or self.task is not None:
+            self.is_running = False
+            if self.task:
+                self.task.cancel()
+                self.task = None
+
+    def get_status(self) -> dict:
+        """
+        스케줄 상태 정보 반환
+
+        Returns:
+            dict: 종목/주기/위상, 사이클 수, 마지막 사이클, 다음 실행 시각
+        """
+        return {
+            "is_running": self.is_running,
+            "symbols": self.symbols,
+            "markets": self.markets,
+            "interval_seconds": self.interval,
+            "phase_seconds": self.phase,
+            "jitter_seconds": self.jitter,
+            "dispatch_spread_seconds": self.dispatch_spread,
+            "cycle_count": self.cycle_count,
+            "failed_cycles": self.failed_cycles,
+            "overruns": self.overruns,
+            "heartbeat_count": self.heartbeat_count,
+            "deadline_seconds": self.deadline,
+            "defer_policy": self.defer_policy,
+            "deferred_total": self.deferred_total,
+            "pending_deferred": list(self._deferred),
+            "missed_ticks": self.missed_ticks,
+            "recent_cycles": list(self.recent_cycles),
+            "last_cycle_at": self.last_cycle_at.isoformat() if self.last_cycle_at else None,
+            "last_cycle_seconds": self.last_cycle_seconds,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "sleeping_until": (
+                self.sleeping_until.isoformat() if self.sleeping_until else None
+            ),
+        }
+
+
+class AdaptiveSchedule(CollectionSchedule):
+    """종목별 조회 주기를 변동성으로 조정하는 수집 스케줄 (우선순위 큐 + 분당 예산)"""
+
+    def __init__(self, name: str, symbols: List[str], budget: RequestBudget, **kwargs):
         """
-        60초 간격으로 주식 데이터를 수집하는 주기적 작업
-        설정된 간격(DATA_COLLECTION_INTERVAL=60초)을 유지하며 사이클 소요 시간을 측정
+        Args:
+            name: 스케줄 이름
+            symbols: 수집할 종목
+            budget: 분당 요청 예산 (적응형 스케줄끼리 공유)
+            **kwargs: CollectionSchedule 인자 (interval은 틱이 쌓이기 전 기본 주기)
         """
+        super().__init__(name, symbols, **kwargs)
+        self.planner = AdaptivePollingPlanner(
+            self.symbols,
+            budget,
+            base_interval=self.interval,
+            jitter=min(self.jitter, ADAPTIVE_MIN_INTERVAL / 2)
+        )
+        # 종목별 조회 시각이 이미 지터로 흩어져 있고 도래한 종목은 바로 조회해야 하므로 나누지 않음
+        self.dispatch_spread = 0.0
+
+    def _observe(self, symbols: List[str]):
+        """수집 후 최신 가격 캐시의 틱을 변동성 계산에 반영"""
+        cache = getattr(self.collector, "cache", None)
+        if cache is None:
+            return
+        rows, _ = cache.get(symbols)
+        now = time.monotonic()
+        for row in rows:
+            self.planner.observe(row["symbol"], row["price"], row["timestamp"], now)
+
+    async def run(self):
+        """조회 시각이 된 종목만 예산 안에서 모아 수집하고 각자의 주기로 다시 예약"""
         self.is_running = True
-        self.start_time = datetime.now()
-        logger.info("주기적 데이터 수집 작업 시작")
-        
+        logger.info(
+            f"[{self.name}] 적응형 수집 스케줄 시작 - {len(self.symbols)}개 종목, "
+            f"기본 {self.interval:.0f}초 주기"
+        )
+
         while self.is_running:
-            cycle_start = datetime.now()
-            self.cycle_count += 1
-            
-            try:
-                # 시장 상태 확인
-                market_status = get_market_status()
-                logger.info(f"사이클 {self.cycle_count} 시작 - 시장 상태: {market_status}")
-                
-                # 데이터 수집 및 저장
-                # 장 여부와 무관하게 미리 정한 종목만 강제 수집
-                success = await stock_collector.collect_and_save(
-                    force_all_symbols=True
+            symbols, heartbeat, next_open = self._cycle_symbols()
+            if not symbols:
+                await self._sleep_while_closed(next_open)
+                continue
+            self.sleeping_until = None
+
+            if heartbeat:
+                await self._run_cycle(symbols, True)
+                continue
+
+            due = self.planner.pop_due(allowed=set(symbols))
+            if due:
+                deferred = await self._run_cycle(due, False)
+                done = [s for s in due if s not in deferred]
+                self._observe(done)
+                self.planner.reschedule(done)
+                # 마감까지 못 끝낸 종목은 주기를 기다리지 않고 다음에 가장 먼저 조회
+                self.planner.defer(deferred)
+
+            # 다음 조회 시각까지 대기 (장 상태는 기본 주기마다 다시 확인)
+            wait = self.planner.wait_time()
+            wait = self.interval if wait is None else min(wait, self.interval)
+            self.next_run_at = datetime.fromtimestamp(time.time() + wait)
+            await asyncio.sleep(wait)
+
+    def get_status(self) -> dict:
+        status = super().get_status()
+        status["adaptive"] = self.planner.get_stats()
+        return status
+
+
+class PeriodicTaskManager:
+    """주기적 작업 관리 클래스 (스케줄별 독립 태스크 관리)"""
+
+    def __init__(
+        self,
+        collector: Optional[StockDataCollector] = None,
+        schedules: Optional[Dict[str, dict]] = None,
+        calendar_enabled: bool = MARKET_CALENDAR_ENABLED,
+        heartbeat_interval: float = CLOSED_MARKET_HEARTBEAT,
+        jitter: float = SCHEDULE_JITTER,
+        request_budget: float = 0
+    ):
+        """
+        Args:
+            collector: 데이터 수집기 (None이면 전역 stock_collector)
+            schedules: COLLECTION_SCHEDULES 형식 스케줄 설정 (None이면 설정값)
+            calendar_enabled: 거래소 달력 사용 여부 (False면 장 여부와 무관하게 매 주기 수집)
+            heartbeat_interval: 장 마감 중 확인 수집 주기(초, 0이면 비활성화)
+            jitter: 사이클 시작 시각 무작위 지연 상한(초)
+            request_budget: 적응형 스케줄의 분당 최대 종목 조회 수 (0이면 설정값)
+        """
+        self.calendar_enabled = calendar_enabled
+        specs = build_schedule_specs(
+            COLLECTION_SCHEDULES if schedules is None else schedules
+        )
+        # 적응형 스케줄이 공유하는 분당 요청 예산 (기본: 고정 주기로 돌릴 때의 분당 조회 수)
+        self.budget: Optional[RequestBudget] = None
+        adaptive = [spec for spec in specs.values() if spec["adaptive"]]
+        if adaptive:
+            per_minute = request_budget or ADAPTIVE_REQUEST_BUDGET or sum(
+                len(spec["symbols"]) * 60.0 / spec["interval"] for spec in adaptive
+            )
+            self.budget = RequestBudget(max(per_minute, 1))
+
+        self.schedules: Dict[str, CollectionSchedule] = {}
+        for name, spec in specs.items():
+            options = dict(
+                interval=spec["interval"],
+                phase=spec["phase"],
+                jitter=jitter,
+                collector=collector,
+                calendar_enabled=calendar_enabled,
+                heartbeat_interval=heartbeat_interval
+            )
+            if spec["adaptive"]:
+                self.schedules[name] = AdaptiveSchedule(
+                    name, spec["symbols"], self.budget, **options
                 )
-                
-                if success:
-                    logger.info(f"사이클 {self.cycle_count} 완료")
-                else:
-                    logger.warning(f"사이클 {self.cycle_count} 실패")
-                
-            except Exception as e:
-                logger.error(f"사이클 {self.cycle_count} 중 오류 발생: {e}")
-            
-            # 사이클 소요 시간 계산
-            cycle_end = datetime.now()
-            cycle_duration = (cycle_end - cycle_start).total_seconds()
-            logger.info(f"사이클 {self.cycle_count} 소요 시간: {cycle_duration:.2f}초")
-            
-            # 정확히 10초 주기 유지를 위한 대기 시간 계산
-            if cycle_duration < DATA_COLLECTION_INTERVAL:
-                sleep_time = DATA_COLLECTION_INTERVAL - cycle_duration
-                logger.info(f"다음 사이클까지 {sleep_time:.2f}초 대기")
-                await asyncio.sleep(sleep_time)
             else:
-                logger.warning(f"사이클 {self.cycle_count}이 {DATA_COLLECTION_INTERVAL}초를 초과했습니다")
-    
+                self.schedules[name] = CollectionSchedule(name, spec["symbols"], **options)
+        self.is_running = False
+        self.start_time: Optional[datetime] = None
+
+    @property
+    def cycle_count(self) -> int:
+        """모든 스케줄의 사이클 수 합계"""
+        return sum(schedule.cycle_count for schedule in self.schedules.values())
+
     def start(self):
-        """주기적 작업 시작"""
+        """주기적 작업 시작 (스케줄마다 태스크 하나)"""
         if not self.is_running:
-            self.task = asyncio.create_task(self.periodic_data_collection())
-            logger.info("주기적 작업이 시작되었습니다")
-    
+            self.is_running = True
+            self.start_time = datetime.now()
+            for schedule in self.schedules.values():
+                schedule.start()
+            logger.info(f"주기적 작업이 시작되었습니다 (스케줄 {len(self.schedules)}개)")
+
     def stop(self):
         """주기적 작업 중지"""
         if self.is_running:
             self.is_running = False
-            if self.task:
-                self.task.cancel()
+            for schedule in self.schedules.values():
+                schedule.stop()
             logger.info("주기적 작업이 중지되었습니다")
-    
+
     def get_status(self) -> dict:
         """
         작업 상태 정보 반환
-        
+
         Returns:
-            dict: 작업 상태 정보
+            dict: 작업 상태 정보 (스케줄별 상태 포함)
         """
         total_runtime = None
         if self.start_time:
             total_runtime = (datetime.now() - self.start_time).total_seconds()
-        
+
         return {
             "is_running": self.is_running,
             "cycle_count": self.cycle_count,
             "total_runtime_seconds": total_runtime,
-            "interval_seconds": DATA_COLLECTION_INTERVAL
+            "interval_seconds": DATA_COLLECTION_INTERVAL,
+            "calendar_enabled": self.calendar_enabled,
+            "request_budget": self.budget.get_stats() if self.budget else None,
+            "schedules": {
+                name: schedule.get_status()
+                for name, schedule in self.schedules.items()
+            }
         }
 
 
 # 전역 주기적 작업 매니저 인스턴스
-task_manager = PeriodicTaskManager() 
\ No newline at end of file
+task_manager = PeriodicTaskManager()
@@ -0,0 +1,137 @@
+"""
+최신 가격 인메모리 캐시
+수집 사이클마다 갱신되고 /prices가 DB 왕복 없이 응답하도록 버전(ETag)과 함께 보관
+"""
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _normalize_timestamp(value) -> str:
+    """datetime/MySQL DATETIME 문자열을 ISO 8601 문자열로 통일"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace(" ", "T")
+
+
+def _snapshot_tag(prices: Dict[str, dict]) -> str:
+    """
+    스냅샷 내용((심볼, 가격, timestamp) 목록)의 해시로 ETag 생성
+
+    버전 카운터는 프로세스마다 0부터 시작하므로 재시작/다중 워커 간에
+    같은 버전이 다른 내용을 가리킬 수 있어 내용 기반 태그를 사용
+    """
+    digest = hashlib.sha1()
+    for symbol in sorted(prices):
+        row = prices[symbol]
+        digest.update(
+            f"{symbol}|{row['price']!r}|{row['timestamp']}\n".encode()
+        )
+    return f'W/"prices-{digest.hexdigest()[:16]}"'
+
+
+class LatestPriceCache:
+    """심볼별 최신 가격 캐시 (쓰기는 잠금 후 스냅샷 교체, 읽기는 잠금 없음)"""
+
+    def __init__(self):
+        # (심볼별 행, 버전, ETag) 스냅샷 - 참조 교체로 원자적으로 갱신
+        self._snapshot: Tuple[Dict[str, dict], int, str] = (
+            {}, 0, _snapshot_tag({})
+        )
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    @property
+    def version(self) -> int:
+        """현재 스냅샷 버전 (내용이 바뀔 때마다 증가)"""
+        return self._snapshot[1]
+
+    @property
+    def etag(self) -> str:
+        """현재 스냅샷의 약한 ETag (내용 해시 기반이라 프로세스 간에도 일관)"""
+        return self._snapshot[2]
+
+    def _merge(self, rows: Iterable[Tuple[str, float, object]]) -> int:
+        """
+        행들을 새 스냅샷으로 병합 후 교체 (더 최근 timestamp만 반영)
+
+        Returns:
+            int: 변경된 심볼 수
+        """
+        with self._lock:
+            prices, version, _ = self._snapshot
+            updated = dict(prices)
+            changed = 0
+            for row in rows:
+                # 봉 행(OHLCV)도 앞 3개 필드만 사용
+                symbol, price, timestamp = row[0], row[1], row[2]
+                timestamp = _normalize_timestamp(timestamp)
+                current = updated.get(symbol)
+                if current is not None and current["timestamp"] > timestamp:
+                    continue
+                row = {
+                    "symbol": symbol,
+                    "price": float(price),
+                    "timestamp": timestamp,
+                }
+                if row != current:
+                    updated[symbol] = row
+                    changed += 1
+            if changed:
+                self._snapshot = (
+                    updated, version + 1, _snapshot_tag(updated)
+                )
+            return changed
+
+    def update(self, data: List[Tuple[str, float, str]]) -> int:
+        """
+        수집 사이클 결과 반영
+
+        Args:
+            data: (symbol, price, timestamp) 튜플 리스트
+
+        Returns:
+            int: 변경된 심볼 수
+        """
+        return self._merge(data)
+
+    def load(self, rows: List[dict]) -> int:
+        """
+        DB 조회 결과로 캐시 예열
+
+        Args:
+            rows: get_latest_prices 결과 (symbol/price/timestamp 딕셔너리)
+
+        Returns:
+            int: 변경된 심볼 수
+        """
+        changed = self._merge(
+            (row["symbol"], row["price"], row["timestamp"])
+            for row in rows
+        )
+        self.warmed = True
+        return changed
+
+    def get(
+        self, symbols: Optional[List[str]] = None
+    ) -> Tuple[List[dict], int]:
+        """
+        최신 가격 조회
+
+        Args:
+            symbols: 조회할 심볼 리스트 (None이면 전체)
+
+        Returns:
+            Tuple[List[dict], int]: (심볼순 정렬된 가격 행, 스냅샷 버전)
+        """
+        prices, version, _ = self._snapshot
+        if symbols:
+            rows = [prices[s] for s in sorted(set(symbols)) if s in prices]
+        else:
+            rows = [prices[s] for s in sorted(prices)]
+        return rows, version
+
+
+# 전역 최신 가격 캐시 인스턴스
+price_cache = LatestPriceCache()
@@ -0,0 +1,545 @@
+"""
+가격 데이터 소스 인터페이스 및 구현
+- YFinancePriceSource: yfinance 기반 배치 + 10단계 폴백 사다리
+- SimulatedPriceSource: 시드 고정 랜덤 워크 기반 오프라인 시뮬레이터
+"""
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import requests
+import yfinance as yf
+
+from config import (
+    YFINANCE_PERIOD,
+    YFINANCE_INTERVAL,
+    SIMULATOR_SEED,
+    SIMULATOR_LATENCY,
+    SIMULATOR_FAILURE_RATE,
+    SIMULATOR_EMPTY_RATE,
+    SYMBOL_MARKET,
+    MARKET_HOURS,
+)
+from profiling import profiler
+
+
+# 봉 1개: (symbol, close, timestamp, open, high, low, volume)
+# 앞 3개 필드는 기존 (symbol, price, timestamp) 행과 같으므로 그대로 저장 경로에 사용
+Bar = Tuple[str, float, str, float, float, float, int]
+
+
+class PriceSource(ABC):
+    """가격 데이터 소스 인터페이스"""
+
+    # 폴백 단계 이름 리스트 (저렴하고 신선한 순, 0번은 배치와 같은 1분봉)
+    tier_names: List[str] = []
+
+    @abstractmethod
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        여러 종목의 1분봉 최신 종가를 한 번의 요청으로 조회
+
+        Args:
+            symbols: 조회할 심볼 리스트 (한 청크)
+
+        Returns:
+            Dict[str, float]: 가격을 확보한 심볼의 최신 종가
+                (비어 돌아온 심볼은 포함하지 않음, 요청 자체 실패 시 예외)
+        """
+
+    @abstractmethod
+    def fetch_tier(self, symbol: str, tier_index: int) -> Optional[float]:
+        """
+        단일 종목을 지정한 폴백 단계로 조회
+
+        Args:
+            symbol: 조회할 심볼
+            tier_index: tier_names 기준 단계 인덱스
+
+        Returns:
+            Optional[float]: 최신 가격 (데이터 없으면 None, 요청 실패 시 예외)
+        """
+
+    def fetch_batch_bars(
+        self, symbols: List[str], start: Optional[datetime] = None
+    ) -> Dict[str, List[Bar]]:
+        """
+        여러 종목의 1분봉(OHLCV)을 한 번의 요청으로 조회
+
+        Args:
+            symbols: 조회할 심볼 리스트 (한 청크)
+            start: 이 시각(거래소 로컬) 이후 봉만 요청 (None이면 YFINANCE_PERIOD 전체)
+
+        Returns:
+            Dict[str, List[Bar]]: 심볼별 완성된 봉 리스트 (시간순, 거래소 로컬 시각)
+                (봉이 없는 심볼은 포함하지 않음, 요청 자체 실패 시 예외)
+        """
+        raise NotImplementedError(f"{type(self).__name__}는 OHLCV 수집을 지원하지 않습니다")
+
+    def fetch_history(
+        self, symbol: str, start: datetime, end: datetime, interval: str
+    ) -> List[Bar]:
+        """
+        단일 종목의 [start, end) 구간 봉 조회 (백필용)
+
+        Args:
+            symbol: 조회할 심볼
+            start: 구간 시작 (거래소 로컬 시각)
+            end: 구간 끝 (미포함)
+            interval: 봉 간격 (예: '1m', '1h', '1d')
+
+        Returns:
+            List[Bar]: 봉 리스트 (요청 실패 시 예외)
+        """
+        raise NotImplementedError(f"{type(self).__name__}는 과거 데이터 조회를 지원하지 않습니다")
+
+
+def parse_interval(interval: str) -> timedelta:
+    """
+    봉 간격 문자열을 timedelta로 변환
+
+    Args:
+        interval: '1m', '90m', '1h', '1d', '5d', '1wk' 형식
+
+    Returns:
+        timedelta: 봉 간격
+    """
+    units = {"m": "minutes", "h": "hours", "d": "days", "wk": "weeks"}
+    for suffix in ("wk", "m", "h", "d"):
+        if interval.endswith(suffix) and interval[:-len(suffix)].isdigit():
+            return timedelta(**{units[suffix]: int(interval[:-len(suffix)])})
+    raise ValueError(f"지원하지 않는 봉 간격: {interval}")
+
+
+class YFinancePriceSource(PriceSource):
+    """yfinance 기반 가격 소스"""
+
+    tier_names = [
+        "1m", "2m", "5m", "15m", "1d", "fast_info",
+        "1mo", "1y", "download_5d", "download_1mo",
+    ]
+
+    def __init__(self, batch_downloader: Optional[Callable] = None):
+        """
+        Args:
+            batch_downloader: 다중 종목 다운로드 함수
+                (None이면 yf.download, 테스트 시 가짜 소스 주입용)
+        """
+        self.batch_downloader = batch_downloader or yf.download
+        # yfinance 내부 세션에 사용자 에이전트 주입으로 차단/빈응답 완화
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": (
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/126.0.0.0 Safari/537.36"
+            )
+        })
+        self.tiers = self._build_tiers()
+
+    def _download_batch(
+        self, symbols: List[str], start: Optional[datetime] = None
+    ) -> Optional[pd.DataFrame]:
+        """1분봉을 다중 종목 요청(yf.download) 한 번으로 조회 (start 지정 시 증분 구간)"""
+        window = {"start": start} if start is not None else {"period": YFINANCE_PERIOD}
+        return self.batch_downloader(
+            tickers=symbols,
+            **window,
+            interval=YFINANCE_INTERVAL,
+            group_by='ticker',
+            auto_adjust=False,
+            prepost=True,
+            threads=True,
+            progress=False
+        )
+
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, float]:
+        """1분봉을 다중 종목 요청(yf.download)으로 조회"""
+        with profiler.span("fetch"):
+            df = self._download_batch(symbols)
+        with profiler.span("parse"):
+            return self._split_batch_frame(df, symbols)
+
+    def fetch_tier(self, symbol: str, tier_index: int) -> Optional[float]:
+        """단계 목록에서 해당 단계 함수를 실행"""
+        return self.tiers[tier_index](symbol)
+
+    def fetch_batch_bars(
+        self, symbols: List[str], start: Optional[datetime] = None
+    ) -> Dict[str, List[Bar]]:
+        """fetch_batch와 같은 다중 종목 요청에서 종가 대신 봉 전체를 추출"""
+        with profiler.span("fetch"):
+            df = self._download_batch(symbols, start)
+        step = pd.Timedelta(parse_interval(YFINANCE_INTERVAL))
+        bars: Dict[str, List[Bar]] = {}
+        with profiler.span("parse"):
+            for symbol, frame in self._split_frames(df, symbols).items():
+                if len(frame) and frame.index.tz is not None:
+                    # 마지막 봉은 진행 중일 수 있으므로 끝난 봉만 사용
+                    now = pd.Timestamp.now(tz=frame.index.tz)
+                    frame = frame[frame.index + step <= now]
+                rows = self._frame_to_rows(symbol, frame)
+                if rows:
+                    bars[symbol] = rows
+        return bars
+
+    def fetch_history(
+        self, symbol: str, start: datetime, end: datetime, interval: str
+    ) -> List[Bar]:
+        """Ticker.history(start/end)로 구간 봉 조회 후 행으로 변환"""
+        df = yf.Ticker(symbol, session=self.session).history(
+            start=start,
+            end=end,
+            interval=interval,
+            auto_adjust=False,
+            prepost=True,
+            raise_errors=True
+        )
+        return self._frame_to_rows(symbol, df)
+
+    @staticmethod
+    def _frame_to_rows(symbol: str, df: Optional[pd.DataFrame]) -> List[Bar]:
+        """
+        봉 프레임을 Bar 행으로 일괄 변환 (행 단위 반복 없이 컬럼 연산)
+        인덱스는 종목 거래소 시간대로 변환한 뒤 시간대 정보를 제거해 거래소 로컬 시각으로 저장
+        (yf.download의 분봉 인덱스는 UTC이므로 변환 없이 제거하면 UTC 시각이 저장됨)
+        """
+        if df is None or len(df) == 0 or 'Close' not in df:
+            return []
+        df = df[df['Close'].notna()]
+        if len(df) == 0:
+            return []
+        index = df.index
+        if index.tz is not None:
+            market = MARKET_HOURS.get(SYMBOL_MARKET.get(symbol))
+            if market is not None:
+                index = index.tz_convert(market['timezone'])
+            index = index.tz_localize(None)
+        close = df['Close'].astype(float).round(4)
+        # 결측 시가/고가/저가는 NULL로 저장되도록 None 유지
+        columns = [
+            df[name].astype(float).round(4).astype(object).where(df[name].notna(), None)
+            if name in df else pd.Series([None] * len(df))
+            for name in ('Open', 'High', 'Low')
+        ]
+        volume = (
+            df['Volume'].fillna(0).astype('int64')
+            if 'Volume' in df else pd.Series([0] * len(df))
+        )
+        return list(zip(
+            [symbol] * len(df),
+            close.tolist(),
+            index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+            columns[0].tolist(),
+            columns[1].tolist(),
+            columns[2].tolist(),
+            volume.tolist()
+        ))
+
+    @staticmethod
+    def _split_frames(
+        df: Optional[pd.DataFrame], symbols: List[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """다중 종목 프레임(group_by='ticker')을 심볼별 프레임으로 분리"""
+        if df is None or len(df) == 0:
+            return {}
+        if isinstance(df.columns, pd.MultiIndex):
+            tickers = set(df.columns.get_level_values(0))
+            return {s: df[s] for s in symbols if s in tickers}
+        if len(symbols) == 1:
+            # 단일 종목 요청 시 평면 컬럼으로 반환될 수 있음
+            return {symbols[0]: df}
+        return {}
+
+    @staticmethod
+    def _split_batch_frame(
+        df: Optional[pd.DataFrame], symbols: List[str]
+    ) -> Dict[str, float]:
+        """
+        다중 종목 프레임을 심볼별로 분리해 마지막 종가 추출
+
+        Args:
+            df: yf.download(group_by='ticker') 결과 프레임
+            symbols: 요청한 심볼 리스트
+
+        Returns:
+            Dict[str, float]: 종가가 존재하는 심볼의 최신 가격
+        """
+        prices: Dict[str, float] = {}
+        for symbol, frame in YFinancePriceSource._split_frames(df, symbols).items():
+            price = YFinancePriceSource._last_close(frame)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    @staticmethod
+    def _last_close(df: Optional[pd.DataFrame]) -> Optional[float]:
+        """프레임의 마지막 유효 종가 추출 (없으면 None)"""
+        if df is None or len(df) == 0 or 'Close' not in df:
+            return None
+        closes = df['Close'].dropna()
+        if len(closes) == 0:
+            return None
+        return float(closes.iloc[-1])
+
+    def _history_tier(
+        self, symbol: str, period: str, interval: str
+    ) -> Optional[float]:
+        """Ticker.history 기반 단계 (세션 주입된 Ticker 사용)"""
+        df = yf.Ticker(symbol, session=self.session).history(
+            period=period,
+            interval=interval,
+            auto_adjust=False,
+            prepost=True
+        )
+        return self._last_close(df)
+
+    def _info_tier(self, symbol: str) -> Optional[float]:
+        """fast_info/ info 기반 초간단 시세 단계 (dict/속성 모두 대응)"""
+        tkr = yf.Ticker(symbol, session=self.session)
+        value = None
+        fi = getattr(tkr, 'fast_info', None)
+        # fast_info 접근 (속성/딕셔너리 모두 시도)
+        if fi is not None:
+            candidate_keys = [
+                'last_price', 'lastPrice',
+                'regularMarketPrice',
+                'previous_close', 'previousClose'
+            ]
+            for key in candidate_keys:
+                v = None
+                try:
+                    # 딕셔너리 형태
+                    if isinstance(fi, dict) and key in fi:
+                        v = fi[key]
+                    else:
+                        v = getattr(fi, key)
+                except Exception:
+                    v = None
+                if v is not None:
+                    value = v
+                    break
+        # info/get_info 백업 경로
+        if value is None:
+            try:
+                info = {}
+                # get_info가 있으면 우선 사용
+                if hasattr(tkr, 'get_info'):
+                    info = tkr.get_info() or {}
+                elif hasattr(tkr, 'info'):
+                    info = tkr.info or {}
+                for key in (
+                    'regularMarketPrice', 'previousClose',
+                    'currentPrice'
+                ):
+                    if key in info and info[key] is not None:
+                        value = info[key]
+                        break
+            except Exception:
+                pass
+        
+        return float(value) if value is not None else None
+
+    def _download_tier(self, symbol: str, period: str) -> Optional[float]:
+        """yf.download 기반 일봉 단계"""
+        dld = yf.download(
+            tickers=symbol,
+            period=period,
+            interval="1d",
+            progress=False
+        )
+        # download는 단일 종목 시 'Close' 컬럼 바로 존재
+        return self._last_close(dld)
+
+    def _build_tiers(self) -> List[Callable[[str], Optional[float]]]:
+        """
+        폴백 단계 함수 목록 (tier_names와 같은 순서)
+        1m → 2m → 5m → 15m → 1d → fast_info/info → 1mo → 1y
+        → download 5d → download 1mo
+        """
+        history = self._history_tier
+        download = self._download_tier
+        return [
+            lambda s: history(s, YFINANCE_PERIOD, YFINANCE_INTERVAL),
+            lambda s: history(s, YFINANCE_PERIOD, "2m"),
+            lambda s: history(s, YFINANCE_PERIOD, "5m"),
+            lambda s: history(s, YFINANCE_PERIOD, "15m"),
+            # 일봉 폴백(최근 5일 중 마지막 종가)
+            lambda s: history(s, "5d", "1d"),
+            self._info_tier,
+            # 월간/연간 기간 + 일봉 범위 확대 폴백
+            lambda s: history(s, "1mo", "1d"),
+            lambda s: history(s, "1y", "1d"),
+            lambda s: download(s, "5d"),
+            lambda s: download(s, "1mo"),
+        ]
+
+
+class SimulatedPriceSource(PriceSource):
+    """
+    시드 고정 랜덤 워크 기반 오프라인 가격 소스
+    심볼별 독립 난수열을 사용하므로 조회 순서/동시성과 무관하게 결정적
+    """
+
+    tier_names = YFinancePriceSource.tier_names
+
+    def __init__(
+        self,
+        seed: int = SIMULATOR_SEED,
+        latency: float = SIMULATOR_LATENCY,
+        failure_rate: float = SIMULATOR_FAILURE_RATE,
+        empty_rate: float = SIMULATOR_EMPTY_RATE,
+        volatility: float = 0.002
+    ):
+        """
+        Args:
+            seed: 난수 시드
+            latency: 요청 1회당 지연(초)
+            failure_rate: 요청 실패(예외) 확률
+            empty_rate: 빈 응답 확률
+            volatility: 1스텝당 수익률 표준편차
+        """
+        self.seed = seed
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.empty_rate = empty_rate
+        self.volatility = volatility
+        self.request_count = 0
+        self._states: Dict[str, Tuple[random.Random, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def generate_symbols(count: int, suffix: str = ".SIM") -> List[str]:
+        """
+        시뮬레이션용 심볼 리스트 생성
+
+        Args:
+            count: 생성할 심볼 수
+            suffix: 심볼 접미사
+
+        Returns:
+            List[str]: 예) ['S00000.SIM', 'S00001.SIM', ...]
+        """
+        return [f"S{i:05d}{suffix}" for i in range(count)]
+
+    def _next(self, symbol: str) -> Optional[float]:
+        """심볼 난수열을 한 스텝 진행하고 가격(빈 응답이면 None) 반환"""
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                rng = random.Random(f"{self.seed}:{symbol}")
+                state = (rng, rng.uniform(10.0, 1000.0))
+            rng, price = state
+            if rng.random() < self.failure_rate:
+                self._states[symbol] = state
+                raise ConnectionError(f"{symbol}: 시뮬레이션 요청 실패")
+            empty = rng.random() < self.empty_rate
+            price *= 1.0 + rng.gauss(0.0, self.volatility)
+            self._states[symbol] = (rng, price)
+        return None if empty else round(price, 4)
+
+    def _request(self):
+        """요청 1회 지연 및 카운트"""
+        with self._lock:
+            self.request_count += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, float]:
+        """청크당 요청 1회 지연 후 심볼별 가격 반환 (실패 심볼은 누락)"""
+        self._request()
+        prices: Dict[str, float] = {}
+        for symbol in symbols:
+            try:
+                price = self._next(symbol)
+            except ConnectionError:
+                continue
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    def fetch_tier(self, symbol: str, tier_index: int) -> Optional[float]:
+        """단계와 무관하게 같은 랜덤 워크에서 가격 생성"""
+        self._request()
+        return self._next(symbol)
+
+    def _make_bar(
+        self, rng: random.Random, symbol: str, open_price: float,
+        close: float, timestamp: datetime
+    ) -> Bar:
+        """시가/종가 사이를 포함하는 고가/저가와 거래량으로 봉 생성"""
+        spread = abs(rng.gauss(0.0, self.volatility)) * close
+        return (
+            symbol,
+            round(close, 4),
+            timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            round(open_price, 4),
+            round(max(open_price, close) + spread, 4),
+            round(min(open_price, close) - spread, 4),
+            rng.randint(100, 100000),
+        )
+
+    def fetch_batch_bars(
+        self, symbols: List[str], start: Optional[datetime] = None
+    ) -> Dict[str, List[Bar]]:
+        """
+        청크당 요청 1회 지연 후 심볼별로 직전 1분 완성 봉 하나를 생성 (start 무시)
+        (시가는 이전 스텝 가격, 종가는 랜덤 워크 다음 가격)
+        """
+        self._request()
+        timestamp = datetime.now().replace(second=0, microsecond=0) - timedelta(minutes=1)
+        bars: Dict[str, List[Bar]] = {}
+        for symbol in symbols:
+            state = self._states.get(symbol)
+            try:
+                close = self._next(symbol)
+            except ConnectionError:
+                continue
+            if close is None:
+                continue
+            rng = self._states[symbol][0]
+            open_price = state[1] if state else close
+            with self._lock:
+                bar = self._make_bar(rng, symbol, open_price, close, timestamp)
+            bars[symbol] = [bar]
+        return bars
+
+    def fetch_history(
+        self, symbol: str, start: datetime, end: datetime, interval: str
+    ) -> List[Bar]:
+        """구간별 독립 난수열로 봉 생성 (같은 구간은 항상 같은 결과)"""
+        self._request()
+        step = parse_interval(interval)
+        rng = random.Random(f"{self.seed}:{symbol}:{start.isoformat()}")
+        if rng.random() < self.failure_rate:
+            raise ConnectionError(f"{symbol}: 시뮬레이션 요청 실패")
+        price = rng.uniform(10.0, 1000.0)
+        rows = []
+        current = start
+        while current < end:
+            close = price * (1.0 + rng.gauss(0.0, self.volatility))
+            rows.append(self._make_bar(rng, symbol, price, close, current))
+            price = close
+            current += step
+        return rows
+
+
+def create_price_source(name: str) -> PriceSource:
+    """
+    설정 이름으로 가격 소스 생성
+
+    Args:
+        name: 'yfinance' 또는 'simulated'
+
+    Returns:
+        PriceSource: 가격 소스 인스턴스
+    """
+    if name == "simulated":
+        return SimulatedPriceSource()
+    if name == "yfinance":
+        return YFinancePriceSource()
+    raise ValueError(f"알 수 없는 가격 소스: {name}")
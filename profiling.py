@@ -0,0 +1,498 @@
+"""
+온디맨드 프로파일링 (수집 사이클 / API 라우트)
+- 관리 엔드포인트로 다음 N개 사이클(collect_and_save) 또는 지정 라우트의 N개 요청에 프로파일러를 무장
+- 캡처 중에는 샘플링 스레드가 모든 스레드의 스택을 주기적으로 기록
+  (yfinance/pandas/MySQL 호출이 도는 워커 스레드까지 포함, 대기 중인 스레드는 제외)
+- 단계별 구간(fetch / parse / insert) 소요 시간을 함께 집계
+- 결과는 pstats 파일(샘플 기반 추정치) 또는 collapsed-stack 텍스트(플레임 그래프 입력)로 다운로드
+무장되지 않은 동안에는 샘플링 스레드가 없고, 훅은 속성 하나만 확인한 뒤 바로 반환
+"""
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from starlette.routing import Match
+
+from config import (
+    PROFILE_SAMPLE_INTERVAL,
+    PROFILE_MAX_DEPTH,
+    PROFILE_MAX_CAPTURES,
+    PROFILE_MAX_SESSIONS,
+)
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 프로파일 대상: 수집 사이클 또는 API 라우트 요청
+PROFILE_TARGETS = ("cycle", "route")
+
+# 대기 중인 스레드로 보고 샘플에서 제외할 최하단 프레임 (파일 이름, 함수 이름)
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+# (파일, 첫 줄, 함수 이름) - pstats 함수 키와 같은 형식
+FunctionKey = Tuple[str, int, str]
+
+
+def _function_key(code) -> FunctionKey:
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _thread_group(name: str) -> str:
+    """워커 풀 스레드 이름의 번호를 떼어 같은 풀끼리 묶음 (collector_3 → collector)"""
+    return re.sub(r"[_-]\d+$", "", name)
+
+
+class _NullSpan:
+    """프로파일 캡처 중이 아닐 때 쓰는 아무 일도 하지 않는 구간"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """단계 구간 소요 시간 측정"""
+
+    __slots__ = ("session", "name", "started")
+
+    def __init__(self, session: "ProfileSession", name: str):
+        self.session = session
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.session.add_span(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class ProfileSession:
+    """무장된 프로파일 한 건 (N개 캡처의 스택 샘플과 단계 구간을 누적)"""
+
+    def __init__(
+        self,
+        target: str,
+        count: int,
+        route: Optional[str] = None,
+        interval: float = PROFILE_SAMPLE_INTERVAL
+    ):
+        """
+        Args:
+            target: 'cycle' 또는 'route'
+            count: 캡처할 사이클/요청 수
+            route: target이 'route'일 때 라우트 경로 템플릿 (예: /prices)
+            interval: 스택 샘플링 주기(초)
+        """
+        self.session_id = uuid.uuid4().hex[:12]
+        self.target = target
+        self.route = route
+        self.requested = count
+        self.captured = 0
+        self.state = "armed"
+        self.interval = interval
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.samples = 0
+        self.captures: List[dict] = []
+        # (스레드 묶음, 루트→최하단 code 객체 튜플) → 샘플 수
+        self._stacks: Dict[Tuple[str, tuple], int] = {}
+        # 구간 이름 → [횟수, 합계(초), 최대(초)]
+        self._spans: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add_sample(self, group: str, stack: tuple):
+        key = (group, stack)
+        with self._lock:
+            self._stacks[key] = self._stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                self._spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def _stack_items(self) -> List[Tuple[Tuple[str, tuple], int]]:
+        with self._lock:
+            return list(self._stacks.items())
+
+    def collapsed(self) -> str:
+        """
+        collapsed-stack 형식 (flamegraph.pl / speedscope 입력)
+
+        Returns:
+            str: 줄마다 '스레드;루트 함수;...;최하단 함수 샘플 수'
+        """
+        lines: Dict[str, int] = {}
+        for (group, stack), count in self._stack_items():
+            frames = [group] + [
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                for code in stack
+            ]
+            line = ";".join(frame.replace(";", ":") for frame in frames)
+            lines[line] = lines.get(line, 0) + count
+        return "".join(f"{line} {count}\n" for line, count in sorted(lines.items()))
+
+    def pstats_bytes(self) -> bytes:
+        """
+        pstats.Stats로 읽을 수 있는 marshal 파일 내용
+        시간은 샘플 수 × 샘플링 주기로 추정 (호출 횟수 대신 샘플 수가 들어감)
+
+        Returns:
+            bytes: pstats 파일 내용
+        """
+        # 함수 키 → [샘플 수, 자체 샘플, 포함 샘플, {호출자: [샘플, 자체, 포함]}]
+        functions: Dict[FunctionKey, list] = {}
+        for (_, stack), count in self._stack_items():
+            keys = [_function_key(code) for code in stack]
+            seen = set()
+            for depth, key in enumerate(keys):
+                entry = functions.setdefault(key, [0, 0, 0, {}])
+                leaf = depth == len(keys) - 1
+                if leaf:
+                    entry[1] += count
+                if key not in seen:
+                    # 재귀 호출은 샘플당 한 번만 포함 시간에 더함
+                    seen.add(key)
+                    entry[0] += count
+                    entry[2] += count
+                if depth:
+                    edge = entry[3].setdefault(keys[depth - 1], [0, 0, 0])
+                    edge[0] += count
+                    edge[2] += count
+                    if leaf:
+                        edge[1] += count
+        interval = self.interval
+        stats = {
+            key: (
+                samples, samples, own * interval, total * interval,
+                {
+                    caller: (c_samples, c_samples, c_own * interval, c_total * interval)
+                    for caller, (c_samples, c_own, c_total) in callers.items()
+                }
+            )
+            for key, (samples, own, total, callers) in functions.items()
+        }
+        return marshal.dumps(stats)
+
+    def get_status(self) -> dict:
+        """
+        세션 상태와 단계 구간 요약
+
+        Returns:
+            dict: 대상, 캡처 진행 상황, 샘플 수, 구간별 횟수/합계/평균/최대(초), 캡처별 소요 시간
+        """
+        with self._lock:
+            spans = {
+                name: {
+                    "count": int(count),
+                    "total_seconds": round(total, 6),
+                    "avg_seconds": round(total / count, 6),
+                    "max_seconds": round(longest, 6),
+                }
+                for name, (count, total, longest) in sorted(self._spans.items())
+            }
+            samples = self.samples
+        return {
+            "session_id": self.session_id,
+            "target": self.target,
+            "route": self.route,
+            "state": self.state,
+            "requested": self.requested,
+            "captured": self.captured,
+            "sample_interval_seconds": self.interval,
+            "samples": samples,
+            "spans": spans,
+            "captures": list(self.captures),
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class _StackSampler:
+    """캡처 동안 모든 스레드의 스택을 주기적으로 기록하는 샘플링 스레드"""
+
+    def __init__(self, session: ProfileSession, max_depth: int = PROFILE_MAX_DEPTH):
+        self.session = session
+        self.max_depth = max_depth
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        interval = self.session.interval
+        while not self._stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                group = _thread_group(names.get(ident, "thread"))
+                self.session.add_sample(group, tuple(stack))
+
+
+class Profiler:
+    """프로파일 무장/캡처 관리 (한 번에 하나의 세션만 무장, 캡처도 한 번에 하나)"""
+
+    def __init__(
+        self,
+        interval: float = PROFILE_SAMPLE_INTERVAL,
+        max_captures: int = PROFILE_MAX_CAPTURES,
+        max_sessions: int = PROFILE_MAX_SESSIONS
+    ):
+        """
+        Args:
+            interval: 스택 샘플링 주기(초)
+            max_captures: 세션 하나에 요청할 수 있는 최대 캡처 수
+            max_sessions: 결과를 보관할 최근 세션 수
+        """
+        self.interval = interval
+        self.max_captures = max_captures
+        self.max_sessions = max_sessions
+        # 무장된 세션 (None이면 모든 훅이 바로 반환)
+        self.armed: Optional[ProfileSession] = None
+        # 캡처 중인 세션 (구간은 이때만 기록)
+        self.capturing: Optional[ProfileSession] = None
+        self.sessions: "OrderedDict[str, ProfileSession]" = OrderedDict()
+        self._sampler: Optional[_StackSampler] = None
+        self._lock = threading.Lock()
+
+    def arm(self, target: str, count: int = 1, route: Optional[str] = None) -> ProfileSession:
+        """
+        다음 N개 사이클 또는 지정 라우트의 N개 요청에 프로파일러 무장
+
+        Args:
+            target: 'cycle' 또는 'route'
+            count: 캡처할 사이클/요청 수
+            route: target이 'route'일 때 라우트 경로 템플릿 (예: /prices/history)
+
+        Returns:
+            ProfileSession: 무장된 세션
+
+        Raises:
+            ValueError: 대상/개수/라우트가 잘못된 경우
+            RuntimeError: 이미 무장된 세션이 있는 경우
+        """
+        if target not in PROFILE_TARGETS:
+            raise ValueError(f"알 수 없는 프로파일 대상: {target} ({', '.join(PROFILE_TARGETS)})")
+        if not 1 <= count <= self.max_captures:
+            raise ValueError(f"count는 1~{self.max_captures} 사이여야 합니다")
+        if target == "route" and not route:
+            raise ValueError("route 대상은 라우트 경로가 필요합니다")
+        with self._lock:
+            if self.armed is not None:
+                raise RuntimeError(
+                    f"이미 무장된 프로파일이 있습니다: {self.armed.session_id}"
+                )
+            session = ProfileSession(
+                target, count, route if target == "route" else None, self.interval
+            )
+            self.sessions[session.session_id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            self.armed = session
+        logger.info(
+            f"프로파일 무장: {session.session_id} ({target}"
+            + (f" {route}" if session.route else "") + f", {count}회)"
+        )
+        return session
+
+    def disarm(self) -> Optional[ProfileSession]:
+        """
+        무장 해제 (진행 중인 캡처는 끝까지 기록, 이미 캡처한 결과는 유지)
+
+        Returns:
+            Optional[ProfileSession]: 해제한 세션 (무장된 세션이 없으면 None)
+        """
+        with self._lock:
+            session = self.armed
+            self.armed = None
+        if session is not None and session.state == "armed":
+            session.state = "done" if session.captured else "cancelled"
+            session.finished_at = datetime.now()
+        return session
+
+    def begin(self, target: str) -> Optional[ProfileSession]:
+        """
+        캡처 시작 (해당 대상으로 무장돼 있고 다른 캡처가 없을 때만)
+
+        Returns:
+            Optional[ProfileSession]: 캡처 중인 세션 (캡처하지 않으면 None)
+        """
+        session = self.armed
+        if session is None or session.target != target:
+            return None
+        with self._lock:
+            if self.armed is not session or self.capturing is not None:
+                return None
+            session.state = "capturing"
+            self.capturing = session
+            self._sampler = _StackSampler(session)
+        self._sampler.start()
+        return session
+
+    def end(self, session: ProfileSession, seconds: float, **detail):
+        """
+        캡처 종료 (요청한 수만큼 캡처했으면 무장 해제)
+
+        Args:
+            session: begin이 반환한 세션
+            seconds: 캡처한 사이클/요청 소요 시간(초)
+            detail: 캡처 기록에 덧붙일 정보 (종목 수, 요청 경로 등)
+        """
+        sampler = self._sampler
+        if sampler is not None:
+            sampler.stop()
+        with self._lock:
+            self._sampler = None
+            self.capturing = None
+            session.captured += 1
+            session.captures.append(dict(detail, seconds=round(seconds, 6)))
+            if session.captured >= session.requested or self.armed is not session:
+                session.state = "done"
+                session.finished_at = datetime.now()
+                if self.armed is session:
+                    self.armed = None
+            else:
+                session.state = "armed"
+        if session.state == "done":
+            logger.info(
+                f"프로파일 완료: {session.session_id} "
+                f"({session.captured}회, 샘플 {session.samples}개)"
+            )
+
+    def span(self, name: str):
+        """
+        단계 구간 (with 문) - 캡처 중이 아니면 공유 no-op 객체를 반환
+
+        Args:
+            name: 구간 이름 ('fetch', 'parse', 'insert')
+        """
+        session = self.capturing
+        if session is None:
+            return _NULL_SPAN
+        return _Span(session, name)
+
+    def get(self, session_id: str) -> Optional[ProfileSession]:
+        return self.sessions.get(session_id)
+
+    def get_status(self) -> dict:
+        """
+        프로파일러 상태
+
+        Returns:
+            dict: 무장된 세션 id, 보관 중인 세션 목록(id, 대상, 상태, 캡처 수)
+        """
+        return {
+            "armed": self.armed.session_id if self.armed else None,
+            "sessions": [
+                {
+                    "session_id": session.session_id,
+                    "target": session.target,
+                    "route": session.route,
+                    "state": session.state,
+                    "captured": session.captured,
+                    "requested": session.requested,
+                }
+                for session in list(self.sessions.values())
+            ],
+        }
+
+
+class ProfilingMiddleware:
+    """
+    무장된 라우트의 요청을 캡처하는 ASGI 미들웨어
+    무장되지 않았거나 대상이 사이클이면 바로 다음 앱을 호출
+    """
+
+    def __init__(self, app, profiler: Optional[Profiler] = None):
+        """
+        Args:
+            app: 감쌀 ASGI 앱
+            profiler: 프로파일러 (None이면 전역 profiler)
+        """
+        self.app = app
+        self._profiler = profiler
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._profiler or profiler
+
+    @staticmethod
+    def _matches(scope, route_path: str) -> bool:
+        for route in getattr(scope.get("app"), "routes", []):
+            if getattr(route, "path", None) == route_path:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    return True
+        return False
+
+    async def __call__(self, scope, receive, send):
+        session = self.profiler.armed
+        if (
+            session is None
+            or session.target != "route"
+            or scope["type"] != "http"
+            or not self._matches(scope, session.route)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.begin("route")
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(
+                session, time.perf_counter() - started,
+                method=scope["method"], path=scope["path"]
+            )
+
+
+# 전역 프로파일러 인스턴스
+profiler = Profiler()
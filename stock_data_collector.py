@@ -1,50 +1,487 @@
 """
-yfinance를 사용한 주식 데이터 수집기
+가격 소스(기본 yfinance)를 사용한 주식 데이터 수집기
 """
-import yfinance as yf
-import requests
 import asyncio
+import functools
 import logging
-from datetime import datetime
-from typing import List, Tuple, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple, Optional
 from config import (
-    YFINANCE_PERIOD,
-    YFINANCE_INTERVAL,
+    PRICE_SOURCE,
+    YFINANCE_BATCH_ENABLED,
+    YFINANCE_BATCH_SIZE,
+    COLLECTOR_MAX_WORKERS,
+    COLLECTOR_MAX_CONCURRENCY,
+    COLLECTOR_SYMBOL_TIMEOUT,
+    COLLECTOR_BATCH_TIMEOUT,
+    TIER_CACHE_ENABLED,
+    TIER_CACHE_TTL,
+    TIER_REPROBE_EVERY,
+    WRITE_BEHIND_ENABLED,
+    SPOOL_ENABLED,
+    INGEST_MODE,
+    INCREMENTAL_FETCH_ENABLED,
+    INCREMENTAL_START_ALIGN,
+    INCREMENTAL_MAX_GAP,
     SYMBOL_MARKET,
     TARGET_SYMBOLS,
 )
-from market_utils import get_active_symbols, format_timestamp, get_current_timezone_time
-from database import db_manager
+from metrics import fallback_tier_total, fetch_seconds
+from profiling import profiler
+from market_utils import (
+    get_active_symbols,
+    get_market_status,
+    format_timestamp,
+    get_current_timezone_time,
+)
+from database import DatabaseManager, db_manager
+from price_cache import LatestPriceCache, price_cache
+from price_source import Bar, PriceSource, create_price_source
+from tick_broadcaster import TickBroadcaster, broadcaster as tick_broadcaster
+from tick_spool import TickSpool
+from tier_cache import FallbackTierCache
+from write_buffer import WriteBehindBuffer
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class CycleDeadlineExceeded(Exception):
+    """사이클 마감 시각까지 조회를 끝내지 못한 경우 (다음 사이클로 미룸)"""
+
+
+def time_left(limit: float, deadline: Optional[float]) -> float:
+    """
+    제한 시간을 사이클 마감 시각까지 남은 시간으로 줄임
+
+    Args:
+        limit: 단계별 제한 시간(초)
+        deadline: 사이클 마감 시각 (monotonic, None이면 제한 없음)
+
+    Returns:
+        float: 적용할 제한 시간(초, 0 이하이면 이미 마감)
+    """
+    if deadline is None:
+        return limit
+    return min(limit, deadline - time.monotonic())
+
+
+class ChunkPacer:
+    """
+    배치 청크 요청 시작 시각을 창 안에 고르게 나눔
+    i번째로 차례를 받은 청크는 (생성 시각 + i × 창 / 청크 수)까지 기다린 뒤 시작
+    """
+
+    def __init__(self, window: float, chunks: int):
+        """
+        Args:
+            window: 청크 시작 시각을 나눌 창(초, 0 이하이면 모두 바로 시작)
+            chunks: 이 창에서 보낼 전체 청크 수
+        """
+        self.step = window / chunks if window > 0 and chunks > 1 else 0.0
+        self.started = time.monotonic()
+        self._next_slot = 0
+
+    @classmethod
+    def for_cycle(
+        cls, spread: float, chunks: int, deadline: Optional[float] = None
+    ) -> "ChunkPacer":
+        """
+        마지막 청크도 청크 제한 시간 안에 마감 전 끝날 수 있도록 창을 줄여 생성
+
+        Args:
+            spread: 요청한 창(초)
+            chunks: 전체 청크 수
+            deadline: 사이클 마감 시각 (monotonic, None이면 줄이지 않음)
+        """
+        window = spread
+        if deadline is not None:
+            window = min(window, deadline - time.monotonic() - COLLECTOR_BATCH_TIMEOUT)
+        return cls(window, chunks)
+
+    async def wait_turn(self):
+        """다음 차례의 시작 시각까지 대기"""
+        slot = self._next_slot
+        self._next_slot += 1
+        delay = self.started + slot * self.step - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 class StockDataCollector:
     """주식 데이터 수집 클래스"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        source: Optional[PriceSource] = None,
+        db: Optional[DatabaseManager] = None,
+        cache: Optional[LatestPriceCache] = None,
+        spool: Optional[TickSpool] = None,
+        ingest_mode: str = INGEST_MODE,
+        broadcaster: Optional[TickBroadcaster] = None
+    ):
+        """
+        Args:
+            source: 가격 데이터 소스 (None이면 PRICE_SOURCE 설정으로 생성)
+            db: 저장 대상 데이터베이스 매니저 (None이면 전역 db_manager)
+            cache: 저장 성공 시 갱신할 최신 가격 캐시 (None이면 전역 price_cache)
+            spool: DB 장애 시 틱을 보관할 로컬 스풀 (None이면 보관하지 않음)
+            ingest_mode: 'close'(사이클마다 마지막 종가 1행) 또는
+                'ohlcv'(배치로 받은 봉 중 새 봉 전체를 거래소 시각으로 저장)
+            broadcaster: 저장 성공 시 새 틱을 푸시할 브로드캐스터 (None이면 전역 broadcaster)
+        """
+        if ingest_mode not in ("close", "ohlcv"):
+            raise ValueError(f"알 수 없는 수집 모드: {ingest_mode}")
         self.is_running = False
-        # yfinance 내부 세션에 사용자 에이전트 주입으로 차단/빈응답 완화
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/126.0.0.0 Safari/537.36"
+        self.ingest_mode = ingest_mode
+        # OHLCV 모드: 심볼별 마지막으로 저장한 봉 시각 (거래소 로컬, 이보다 새 봉만 저장)
+        self._last_bar: Dict[str, Optional[datetime]] = {}
+        self.new_bars = 0
+        self.duplicate_bars = 0
+        # 조회 구간 종류별 심볼 수 (증분 / 콜드 스타트 / 공백 감지로 전체 기간)
+        self.incremental_fetches = 0
+        self.cold_fetches = 0
+        self.gap_fetches = 0
+        self.source = source or create_price_source(PRICE_SOURCE)
+        self.db = db or db_manager
+        self.cache = cache if cache is not None else price_cache
+        self.broadcaster = broadcaster if broadcaster is not None else tick_broadcaster
+        # 수집 결과를 비동기로 모아 저장하는 write-behind 버퍼
+        # (큐가 넘치면 버리지 않고 로컬 스풀에 보관 - OHLCV 봉은 다시 조회되지 않으므로)
+        self.write_buffer = WriteBehindBuffer(
+            self._write_batch, overflow=self._spool_batch
+        )
+        # DB 장애 중 틱 보관 스풀과 재연결 후 재생 태스크
+        self.spool = spool
+        self._replay_task: Optional[asyncio.Task] = None
+        self._last_write_ok = False
+        # yfinance 호출은 블로킹이므로 전용 워커 풀에서 실행해 이벤트 루프 보호
+        self.executor = ThreadPoolExecutor(
+            max_workers=COLLECTOR_MAX_WORKERS,
+            thread_name_prefix="collector"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        # 심볼별 성공 폴백 단계 학습 캐시
+        self.tier_cache = FallbackTierCache(
+            self.source.tier_names,
+            ttl=TIER_CACHE_TTL,
+            reprobe_every=TIER_REPROBE_EVERY
+        )
+    
+    def close(self):
+        """워커 풀 종료 (실행 중인 조회는 기다리지 않음) 및 스풀 fsync"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.spool is not None:
+            self.spool.close()
+    
+    def start_writer(self):
+        """write-behind 버퍼 writer 시작 (설정으로 비활성화 가능)"""
+        if WRITE_BEHIND_ENABLED:
+            self.write_buffer.start()
+    
+    async def stop_writer(self):
+        """대기 중인 틱을 저장한 뒤 writer 종료"""
+        await self.write_buffer.stop()
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """동시 조회 상한 세마포어 (실행 중인 이벤트 루프별로 지연 생성)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(COLLECTOR_MAX_CONCURRENCY)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _run_blocking(self, func: Callable, *args, **kwargs):
+        """블로킹 함수를 워커 풀에서 실행하고 결과를 대기"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+    
+    async def _fetch_batch_prices(
+        self,
+        symbols: List[str],
+        fetch: Optional[Callable] = None,
+        deadline: Optional[float] = None,
+        spread: float = 0.0,
+        pacer: Optional[ChunkPacer] = None
+    ) -> Tuple[Dict[str, float], List[str]]:
+        """
+        1분봉을 청크 단위 다중 종목 요청으로 수집
+        청크들은 워커 풀에서 실행되며 시작 시각을 spread 창에 고르게 나누고 청크별 제한 시간을 적용
+        
+        Args:
+            symbols: 수집할 심볼 리스트
+            fetch: 청크 조회 함수 (None이면 source.fetch_batch,
+                OHLCV 모드는 source.fetch_batch_bars)
+            deadline: 사이클 마감 시각 (monotonic, 청크 제한 시간을 이때까지로 줄임)
+            spread: 청크 시작 시각을 나눌 창(초, 0이면 동시에 시작)
+            pacer: 여러 호출이 함께 쓰는 청크 시작 시각 분배기 (지정 시 spread 무시)
+        
+        Returns:
+            Tuple[Dict[str, float], List[str]]:
+                (심볼별 최신 종가 또는 봉 리스트, 청크 요청 자체가 실패한 심볼 리스트)
+        """
+        fetch = fetch or self.source.fetch_batch
+        chunks = [
+            symbols[i:i + YFINANCE_BATCH_SIZE]
+            for i in range(0, len(symbols), YFINANCE_BATCH_SIZE)
+        ]
+        if pacer is None:
+            pacer = ChunkPacer.for_cycle(spread, len(chunks), deadline)
+        
+        async def run_chunk(chunk: List[str]) -> Dict[str, float]:
+            # 상류 요청이 사이클 시작 시각에 몰리지 않도록 차례를 기다린 뒤 시작
+            await pacer.wait_turn()
+            async with self._get_semaphore():
+                timeout = time_left(COLLECTOR_BATCH_TIMEOUT, deadline)
+                if timeout <= 0:
+                    raise CycleDeadlineExceeded()
+                started = time.perf_counter()
+                result = await asyncio.wait_for(
+                    self._run_blocking(fetch, chunk),
+                    timeout=timeout
+                )
+                elapsed = time.perf_counter() - started
+                for symbol in chunk:
+                    fetch_seconds.labels(symbol, "batch").observe(elapsed)
+                return result
+        
+        results = await asyncio.gather(
+            *(run_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        
+        prices: Dict[str, float] = {}
+        failed_symbols: List[str] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, (asyncio.TimeoutError, CycleDeadlineExceeded)):
+                    result = "제한 시간 초과" if deadline is None else "제한 시간 또는 사이클 마감 초과"
+                logger.warning(f"배치 수집 실패({len(chunk)}개 종목): {result}")
+                failed_symbols.extend(chunk)
+                continue
+            prices.update(result)
+        
+        return prices, failed_symbols
+    
+    def _fetch_symbol_price(
+        self,
+        symbol: str,
+        skip_primary: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        market_open: Optional[bool] = None
+    ) -> Optional[float]:
+        """
+        단일 종목 가격을 폴백 단계를 따라 조회 (워커 스레드에서 실행)
+        학습된 단계가 있으면 그 단계부터 시작하고, 실패하면 나머지 단계를 모두 시도
+        
+        Args:
+            symbol: 조회할 심볼
+            skip_primary: 1차(1분봉) 단계를 건너뛸지 여부
+            cancel_event: 설정되면 다음 폴백 단계로 넘어가지 않고 중단
+            market_open: 해당 종목 거래소의 개장 여부 (학습 캐시 무효화 기준)
+        
+        Returns:
+            Optional[float]: 최신 가격 (모든 단계 실패 시 None)
+        """
+        start = 0
+        if TIER_CACHE_ENABLED:
+            start = self.tier_cache.start_tier(symbol, market_open)
+        # 배치 경로에서 이미 1분봉이 비어 돌아온 경우 1차 단계는 건너뜀
+        first = 1 if skip_primary else 0
+        start = max(start, first)
+        order = list(range(start, len(self.source.tier_names)))
+        order += list(range(first, start))
+        
+        started = time.perf_counter()
+        for index in order:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            
+            name = self.source.tier_names[index]
+            try:
+                with profiler.span("fetch"):
+                    latest_price = self.source.fetch_tier(symbol, index)
+            except Exception as e:
+                logger.debug(f"{symbol} {name} 폴백 실패: {e}")
+                latest_price = None
+            
+            self.tier_cache.record(index, latest_price is not None)
+            if latest_price is not None:
+                if index > 0:
+                    logger.info(f"{symbol}: {name} 폴백 사용")
+                self.tier_cache.learn(symbol, index, market_open)
+                fetch_seconds.labels(symbol, "fallback").observe(time.perf_counter() - started)
+                fallback_tier_total.labels(symbol, name).inc()
+                return latest_price
+        
+        self.tier_cache.learn(symbol, None, market_open)
+        fetch_seconds.labels(symbol, "fallback").observe(time.perf_counter() - started)
+        fallback_tier_total.labels(symbol, "none").inc()
+        return None
+    
+    async def _fetch_symbol_price_async(
+        self,
+        symbol: str,
+        skip_primary: bool = False,
+        market_open: Optional[bool] = None,
+        deadline: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        폴백 경로 조회를 동시성 상한과 심볼별 제한 시간 내에서 실행
+        
+        Args:
+            symbol: 조회할 심볼
+            skip_primary: 1차(1분봉) 단계를 건너뛸지 여부
+            market_open: 해당 종목 거래소의 개장 여부
+            deadline: 사이클 마감 시각 (monotonic, 제한 시간을 이때까지로 줄임)
+        
+        Returns:
+            Optional[float]: 최신 가격 (실패/시간 초과 시 None)
+        
+        Raises:
+            CycleDeadlineExceeded: 사이클 마감 시각까지 조회를 끝내지 못한 경우
+        """
+        cancel_event = threading.Event()
+        async with self._get_semaphore():
+            timeout = time_left(COLLECTOR_SYMBOL_TIMEOUT, deadline)
+            if timeout <= 0:
+                raise CycleDeadlineExceeded(symbol)
+            try:
+                return await asyncio.wait_for(
+                    self._run_blocking(
+                        self._fetch_symbol_price,
+                        symbol,
+                        skip_primary=skip_primary,
+                        cancel_event=cancel_event,
+                        market_open=market_open
+                    ),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                if timeout < COLLECTOR_SYMBOL_TIMEOUT:
+                    raise CycleDeadlineExceeded(symbol)
+                logger.warning(
+                    f"{symbol}: {COLLECTOR_SYMBOL_TIMEOUT}초 제한 시간 초과"
+                )
+                return None
+            finally:
+                # 시간 초과/취소 시 워커 스레드가 남은 폴백 단계를 중단하도록 신호
+                cancel_event.set()
+    
+    async def _seed_last_bars(self, symbols: List[str]):
+        """
+        처음 보는 심볼의 마지막 저장 봉 시각을 DB에서 가져옴
+        (OHLCV 모드로 저장한 봉만 사용 - 종가 모드 행은 서버 로컬 시각이라 기준이 다름)
+        """
+        unseeded = [s for s in symbols if s not in self._last_bar]
+        if not unseeded or not self.db.is_available():
+            return
+        last_bars = await asyncio.to_thread(self.db.get_last_bar_times, unseeded)
+        for symbol in unseeded:
+            self._last_bar[symbol] = last_bars.get(symbol)
+    
+    def _window_start(self, symbol: str) -> Optional[datetime]:
+        """
+        심볼의 증분 조회 시작 시각 결정 (마지막 저장 봉을 정렬 단위로 내림)
+        
+        Returns:
+            Optional[datetime]: 거래소 로컬 시작 시각
+                (None이면 콜드 스타트 또는 공백 감지 → 전체 기간 요청)
+        """
+        last_bar = self._last_bar.get(symbol)
+        if last_bar is None:
+            self.cold_fetches += 1
+            return None
+        # 봉 시각과 같은 기준(거래소 로컬)의 현재 시각과 비교
+        now = get_current_timezone_time(SYMBOL_MARKET.get(symbol)).replace(tzinfo=None)
+        gap = now - last_bar
+        if gap < timedelta(0):
+            # 미래 시각 기준은 실제 봉을 걸러내므로 버리고 전체 기간에서 다시 찾음
+            logger.warning(f"{symbol}: 마지막 봉 시각({last_bar})이 현재보다 늦어 기준을 초기화합니다")
+            self._last_bar[symbol] = None
+            self.gap_fetches += 1
+            return None
+        if gap > timedelta(minutes=INCREMENTAL_MAX_GAP):
+            self.gap_fetches += 1
+            return None
+        self.incremental_fetches += 1
+        return last_bar.replace(
+            minute=last_bar.minute - last_bar.minute % INCREMENTAL_START_ALIGN,
+            second=0
+        )
+    
+    async def _fetch_batch_bars(
+        self,
+        symbols: List[str],
+        deadline: Optional[float] = None,
+        spread: float = 0.0
+    ) -> Tuple[Dict[str, List[Bar]], List[str]]:
+        """
+        OHLCV 배치 조회 - 시작 시각이 같은 심볼끼리 묶어 증분 구간만 요청
+        
+        Args:
+            symbols: 수집할 심볼 리스트
+            deadline: 사이클 마감 시각 (monotonic)
+            spread: 청크 시작 시각을 나눌 창(초, 묶음 전체의 청크에 함께 적용)
+        
+        Returns:
+            Tuple[Dict[str, List[Bar]], List[str]]:
+                (심볼별 봉 리스트, 청크 요청 자체가 실패한 심볼 리스트)
+        """
+        groups: Dict[Optional[datetime], List[str]] = {}
+        if INCREMENTAL_FETCH_ENABLED:
+            await self._seed_last_bars(symbols)
+            for symbol in symbols:
+                groups.setdefault(self._window_start(symbol), []).append(symbol)
+        else:
+            groups[None] = list(symbols)
+        
+        chunks = sum(-(-len(group) // YFINANCE_BATCH_SIZE) for group in groups.values())
+        pacer = ChunkPacer.for_cycle(spread, chunks, deadline)
+        results = await asyncio.gather(*(
+            self._fetch_batch_prices(
+                group,
+                functools.partial(self.source.fetch_batch_bars, start=start),
+                deadline=deadline,
+                pacer=pacer
             )
-        })
-        # 명시적으로 각 호출에 session 전달 (공유 세션 주입 제거)
+            for start, group in groups.items()
+        ))
+        bars: Dict[str, List[Bar]] = {}
+        failed_symbols: List[str] = []
+        for group_bars, group_failed in results:
+            bars.update(group_bars)
+            failed_symbols.extend(group_failed)
+        return bars, failed_symbols
     
-    async def collect_stock_data(
-        self, force_all_symbols: bool = False
-    ) -> List[Tuple[str, float, str]]:
+    def _new_bars(self, symbol: str, bars: List[Bar]) -> List[Bar]:
+        """마지막으로 저장한 봉보다 새 봉만 골라 반환하고 기준 시각 갱신"""
+        last = self._last_bar.get(symbol)
+        fresh = [
+            bar for bar in bars
+            if last is None or datetime.fromisoformat(bar[2]) > last
+        ]
+        self.new_bars += len(fresh)
+        self.duplicate_bars += len(bars) - len(fresh)
+        if fresh:
+            self._last_bar[symbol] = datetime.fromisoformat(max(bar[2] for bar in fresh))
+        return fresh
+    
+    def _resolve_symbols(self, force_all_symbols: bool) -> List[str]:
         """
-        활성 종목들의 주식 데이터 수집
+        수집 대상 심볼 결정 (시장 상태 + TARGET_SYMBOLS 필터)
+        
+        Args:
+            force_all_symbols: 장 여부와 무관하게 전체 종목 대상 여부
         
         Returns:
-            List[Tuple[str, float, str]]: (symbol, price, timestamp) 튜플 리스트
+            List[str]: 수집 대상 심볼 리스트
         """
         # 기본: 시장 상태에 따라 활성 종목, 필요 시 강제 전체
         symbols_pool = get_active_symbols()
@@ -52,320 +489,343 @@ class StockDataCollector:
             symbols_pool = list(SYMBOL_MARKET.keys())
 
         # 최종 대상: 미리 정한 종목만 필터링
-        active_symbols = [s for s in symbols_pool if s in TARGET_SYMBOLS]
+        return [s for s in symbols_pool if s in TARGET_SYMBOLS]
+    
+    async def collect_stock_data(
+        self,
+        force_all_symbols: bool = False,
+        symbols: Optional[List[str]] = None
+    ) -> List[Tuple[str, float, str]]:
+        """
+        활성 종목들의 주식 데이터 수집
+        
+        Args:
+            force_all_symbols: 장 여부와 무관하게 전체 종목 대상 여부
+            symbols: 수집할 심볼 리스트 (지정 시 시장 상태/대상 필터 무시)
+        
+        Returns:
+            List[Tuple[str, float, str]]: (symbol, price, timestamp) 튜플 리스트
+        """
+        collected_data, _ = await self._collect_stock_data(force_all_symbols, symbols)
+        return collected_data
+    
+    async def _collect_stock_data(
+        self,
+        force_all_symbols: bool = False,
+        symbols: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        spread: float = 0.0
+    ) -> Tuple[List[Tuple[str, float, str]], List[str]]:
+        """
+        활성 종목들의 주식 데이터 수집 (사이클 마감 시각 적용)
+        
+        Args:
+            force_all_symbols: 장 여부와 무관하게 전체 종목 대상 여부
+            symbols: 수집할 심볼 리스트 (지정 시 시장 상태/대상 필터 무시)
+            deadline: 사이클 마감 시각 (monotonic, None이면 단계별 제한 시간만 적용)
+            spread: 배치 청크 시작 시각을 나눌 창(초, 0이면 동시에 시작)
+        
+        Returns:
+            Tuple[List[Tuple[str, float, str]], List[str]]:
+                (마감 전에 수집된 행, 마감까지 조회를 끝내지 못해 미룬 심볼)
+        """
+        if symbols is not None:
+            active_symbols = list(symbols)
+        else:
+            active_symbols = self._resolve_symbols(force_all_symbols)
         if not active_symbols:
             logger.info("대상 심볼이 비어 있습니다(TARGET_SYMBOLS 확인)")
-            return []
+            return [], []
         
         logger.info(f"활성 종목 {len(active_symbols)}개 데이터 수집 시작")
         
         try:
-            # 심볼별 개별 요청으로 신뢰도 향상 및 폴백 적용
             collected_data = []
+            deferred: List[str] = []
             current_time = datetime.now()
+            timestamp = format_timestamp(current_time)
 
-            for symbol in active_symbols:
-                try:
-                    latest_price = None
-
-                    # 1차: 기본 설정으로 1분봉 시도 (세션 주입된 Ticker 사용)
-                    try:
-                        df = yf.Ticker(symbol, session=self.session).history(
-                            period=YFINANCE_PERIOD,
-                            interval=YFINANCE_INTERVAL,
-                            auto_adjust=False,
-                            prepost=True
-                        )
-                        if df is not None and len(df) > 0 and 'Close' in df:
-                            latest = df['Close'].dropna()
-                            if len(latest) > 0:
-                                latest_price = float(latest.iloc[-1])
-                    except Exception as e1:
-                        logger.debug(
-                            f"{symbol} 기본 수집 실패(1m): {e1}"
-                        )
-
-                    # 2차: 2분봉 폴백
-                    if latest_price is None:
-                        try:
-                            df2 = yf.Ticker(symbol, session=self.session).history(
-                                period=YFINANCE_PERIOD,
-                                interval="2m",
-                                auto_adjust=False,
-                                prepost=True
-                            )
-                            if df2 is not None and len(df2) > 0 and 'Close' in df2:
-                                latest2 = df2['Close'].dropna()
-                                if len(latest2) > 0:
-                                    latest_price = float(latest2.iloc[-1])
-                                    logger.info(f"{symbol}: 1m 미가용, 2m 데이터 사용")
-                        except Exception as e2:
-                            logger.debug(
-                                f"{symbol} 2m 폴백 실패: {e2}"
-                            )
-
-                    # 3차: 5분봉 폴백
-                    if latest_price is None:
-                        try:
-                            df5 = yf.Ticker(symbol, session=self.session).history(
-                                period=YFINANCE_PERIOD,
-                                interval="5m",
-                                auto_adjust=False,
-                                prepost=True
-                            )
-                            if df5 is not None and len(df5) > 0 and 'Close' in df5:
-                                latest5 = df5['Close'].dropna()
-                                if len(latest5) > 0:
-                                    latest_price = float(latest5.iloc[-1])
-                                    logger.info(
-                                        f"{symbol}: 1m/2m 미가용, 5m 데이터 사용"
-                                    )
-                        except Exception as e25:
-                            logger.debug(
-                                f"{symbol} 5m 폴백 실패: {e25}"
-                            )
-
-                    # 4차: 15분봉 폴백
-                    if latest_price is None:
-                        try:
-                            df15 = yf.Ticker(symbol, session=self.session).history(
-                                period=YFINANCE_PERIOD,
-                                interval="15m",
-                                auto_adjust=False,
-                                prepost=True
-                            )
-                            if df15 is not None and len(df15) > 0 and 'Close' in df15:
-                                latest15 = df15['Close'].dropna()
-                                if len(latest15) > 0:
-                                    latest_price = float(latest15.iloc[-1])
-                                    logger.info(
-                                        f"{symbol}: 15m 데이터 사용"
-                                    )
-                        except Exception as e15:
-                            logger.debug(
-                                f"{symbol} 15m 폴백 실패: {e15}"
-                            )
-
-                    # 5차: 일봉 폴백(최근 5일 중 마지막 종가)
-                    if latest_price is None:
-                        try:
-                            dfd = yf.Ticker(symbol, session=self.session).history(
-                                period="5d",
-                                interval="1d",
-                                auto_adjust=False,
-                                prepost=True
-                            )
-                            if dfd is not None and len(dfd) > 0 and 'Close' in dfd:
-                                latestd = dfd['Close'].dropna()
-                                if len(latestd) > 0:
-                                    latest_price = float(latestd.iloc[-1])
-                                    logger.info(
-                                        f"{symbol}: intraday 미가용, 1d 마지막 종가 사용"
-                                    )
-                        except Exception as e3:
-                            logger.debug(
-                                f"{symbol} 1d 폴백 실패: {e3}"
-                            )
+            ohlcv = self.ingest_mode == "ohlcv"
 
-                    # 6차: fast_info/ info 기반 초간단 시세 폴백 (dict/속성 모두 대응)
-                    if latest_price is None:
-                        try:
-                            tkr = yf.Ticker(symbol, session=self.session)
-                            value = None
-                            fi = getattr(tkr, 'fast_info', None)
-                            # fast_info 접근 (속성/딕셔너리 모두 시도)
-                            if fi is not None:
-                                candidate_keys = [
-                                    'last_price', 'lastPrice',
-                                    'regularMarketPrice',
-                                    'previous_close', 'previousClose'
-                                ]
-                                for key in candidate_keys:
-                                    v = None
-                                    try:
-                                        # 딕셔너리 형태
-                                        if isinstance(fi, dict) and key in fi:
-                                            v = fi[key]
-                                        else:
-                                            v = getattr(fi, key)
-                                    except Exception:
-                                        v = None
-                                    if v is not None:
-                                        value = v
-                                        break
-                            # info/get_info 백업 경로
-                            if value is None:
-                                try:
-                                    info = {}
-                                    # get_info가 있으면 우선 사용
-                                    if hasattr(tkr, 'get_info'):
-                                        info = tkr.get_info() or {}
-                                    elif hasattr(tkr, 'info'):
-                                        info = tkr.info or {}
-                                    for key in (
-                                        'regularMarketPrice', 'previousClose',
-                                        'currentPrice'
-                                    ):
-                                        if key in info and info[key] is not None:
-                                            value = info[key]
-                                            break
-                                except Exception:
-                                    pass
+            # 배치 경로: 1분봉을 청크 단위 다중 종목 요청으로 수집
+            # (OHLCV 모드는 같은 요청의 봉 전체를 사용)
+            batch_prices: Dict[str, float] = {}
+            batch_bars: Dict[str, List[Bar]] = {}
+            failed_symbols: List[str] = list(active_symbols)
+            if YFINANCE_BATCH_ENABLED:
+                if ohlcv:
+                    batch_bars, failed_symbols = await self._fetch_batch_bars(
+                        active_symbols, deadline=deadline, spread=spread
+                    )
+                else:
+                    batch_prices, failed_symbols = await self._fetch_batch_prices(
+                        active_symbols, deadline=deadline, spread=spread
+                    )
+                logger.info(
+                    f"배치 수집: {len(batch_prices) + len(batch_bars)}/"
+                    f"{len(active_symbols)}개 종목 1분봉 확보"
+                )
+            failed_set = set(failed_symbols)
 
-                            if value is not None:
-                                latest_price = float(value)
-                                logger.info(f"{symbol}: fast_info/info 폴백 사용")
-                        except Exception as e4:
-                            logger.debug(
-                                f"{symbol} fast_info 폴백 실패: {e4}"
-                            )
-
-                    # 7차: 월간 기간(1mo) + 일봉 범위 확대 폴백
-                    if latest_price is None:
-                        try:
-                            dfd2 = yf.Ticker(symbol, session=self.session).history(
-                                period="1mo",
-                                interval="1d",
-                                auto_adjust=False,
-                                prepost=True
-                            )
-                            if dfd2 is not None and len(dfd2) > 0 and 'Close' in dfd2:
-                                latestd2 = dfd2['Close'].dropna()
-                                if len(latestd2) > 0:
-                                    latest_price = float(latestd2.iloc[-1])
-                                    logger.info(
-                                        f"{symbol}: 1mo/1d 폴백 사용"
-                                    )
-                        except Exception as e5:
-                            logger.debug(
-                                f"{symbol} 1mo/1d 폴백 실패: {e5}"
-                            )
-
-                    # 8차: 연간 기간(1y) + 일봉 폴백
-                    if latest_price is None:
-                        try:
-                            dfd3 = yf.Ticker(symbol, session=self.session).history(
-                                period="1y",
-                                interval="1d",
-                                auto_adjust=False,
-                                prepost=True
-                            )
-                            if dfd3 is not None and len(dfd3) > 0 and 'Close' in dfd3:
-                                latestd3 = dfd3['Close'].dropna()
-                                if len(latestd3) > 0:
-                                    latest_price = float(latestd3.iloc[-1])
-                                    logger.info(
-                                        f"{symbol}: 1y/1d 폴백 사용"
-                                    )
-                        except Exception as e6:
-                            logger.debug(
-                                f"{symbol} 1y/1d 폴백 실패: {e6}"
-                            )
-
-                    # 9차: yf.download 기반 일봉 폴백 (5d/1d)
-                    if latest_price is None:
-                        try:
-                            dld = yf.download(
-                                tickers=symbol,
-                                period="5d",
-                                interval="1d",
-                                progress=False
-                            )
-                            if dld is not None and len(dld) > 0:
-                                # download는 단일 종목 시 'Close' 컬럼 바로 존재
-                                close_series = dld['Close'] if 'Close' in dld else None
-                                if close_series is not None:
-                                    latest_close = close_series.dropna()
-                                    if len(latest_close) > 0:
-                                        latest_price = float(latest_close.iloc[-1])
-                                        logger.info(f"{symbol}: download 5d/1d 폴백 사용")
-                        except Exception as e7:
-                            logger.debug(f"{symbol} download 5d/1d 폴백 실패: {e7}")
+            # 배치에서 비어 돌아온 종목만 심볼별 폴백 경로로 동시 조회
+            fallback_symbols = [
+                s for s in active_symbols
+                if s not in batch_prices and s not in batch_bars
+            ]
+            if fallback_symbols and time_left(COLLECTOR_SYMBOL_TIMEOUT, deadline) <= 0:
+                # 배치 단계에서 이미 마감 - 폴백 조회를 시작하지 않고 모두 미룸
+                deferred = fallback_symbols
+                fallback_symbols = []
+            market_status = get_market_status()
+            fallback_results = await asyncio.gather(
+                *(
+                    self._fetch_symbol_price_async(
+                        symbol,
+                        skip_primary=symbol not in failed_set,
+                        market_open=market_status.get(SYMBOL_MARKET.get(symbol)),
+                        deadline=deadline
+                    )
+                    for symbol in fallback_symbols
+                ),
+                return_exceptions=True
+            )
+            fallback_prices = dict(zip(fallback_symbols, fallback_results))
+            if batch_bars and not INCREMENTAL_FETCH_ENABLED:
+                await self._seed_last_bars(list(batch_bars))
 
-                    # 10차: yf.download 기반 일봉 폴백 (1mo/1d)
-                    if latest_price is None:
-                        try:
-                            dld2 = yf.download(
-                                tickers=symbol,
-                                period="1mo",
-                                interval="1d",
-                                progress=False
-                            )
-                            if dld2 is not None and len(dld2) > 0:
-                                close_series2 = dld2['Close'] if 'Close' in dld2 else None
-                                if close_series2 is not None:
-                                    latest_close2 = close_series2.dropna()
-                                    if len(latest_close2) > 0:
-                                        latest_price = float(latest_close2.iloc[-1])
-                                        logger.info(f"{symbol}: download 1mo/1d 폴백 사용")
-                        except Exception as e8:
-                            logger.debug(f"{symbol} download 1mo/1d 폴백 실패: {e8}")
+            for symbol in active_symbols:
+                if symbol in batch_bars:
+                    collected_data.extend(
+                        self._new_bars(symbol, batch_bars[symbol])
+                    )
+                    continue
+                
+                latest_price = batch_prices.get(symbol)
+                if latest_price is None:
+                    latest_price = fallback_prices.get(symbol)
 
-                    if latest_price is not None:
-                        timestamp = format_timestamp(current_time)
-                        collected_data.append(
-                            (symbol, float(latest_price), timestamp)
+                if isinstance(latest_price, CycleDeadlineExceeded):
+                    deferred.append(symbol)
+                elif isinstance(latest_price, Exception):
+                    logger.error(f"{symbol} 데이터 처리 중 오류: {latest_price}")
+                elif latest_price is not None:
+                    row_timestamp = timestamp
+                    if ohlcv:
+                        # 봉과 같은 기준(거래소 로컬 시각)으로 기록
+                        row_timestamp = format_timestamp(
+                            get_current_timezone_time(SYMBOL_MARKET.get(symbol))
                         )
-                    else:
-                        logger.warning(f"{symbol}: 사용할 수 있는 가격 데이터 없음")
-
-                except Exception as e:
-                    logger.error(f"{symbol} 데이터 처리 중 오류: {e}")
-                    continue
+                    collected_data.append(
+                        (symbol, float(latest_price), row_timestamp)
+                    )
+                else:
+                    logger.warning(f"{symbol}: 사용할 수 있는 가격 데이터 없음")
 
-            logger.info(
-                f"성공적으로 {len(collected_data)}개 종목 데이터 수집 완료"
-            )
-            return collected_data
+            if ohlcv:
+                logger.info(f"성공적으로 {len(collected_data)}개 행(새 봉 포함) 수집 완료")
+            else:
+                logger.info(
+                    f"성공적으로 {len(collected_data)}개 종목 데이터 수집 완료"
+                )
+            if deferred:
+                logger.warning(f"사이클 마감 초과로 {len(deferred)}개 종목 미룸: {deferred}")
+            return collected_data, deferred
         except Exception as e:
             logger.error(f"주식 데이터 수집 중 오류 발생: {e}")
-            return []
+            return [], []
+    
+    def get_stats(self) -> dict:
+        """
+        수집기 통계 반환 (폴백 단계별 적중/실패 등)
+        
+        Returns:
+            dict: 수집기 통계 정보
+        """
+        return {
+            "fallback_tiers": self.tier_cache.get_stats(),
+            "write_buffer": self.write_buffer.get_stats(),
+            "spool": self.spool.get_stats() if self.spool else None,
+            "ingest": {
+                "mode": self.ingest_mode,
+                "new_bars": self.new_bars,
+                "duplicate_bars": self.duplicate_bars,
+                "tracked_symbols": len(self._last_bar),
+                "incremental_fetches": self.incremental_fetches,
+                "cold_fetches": self.cold_fetches,
+                "gap_fetches": self.gap_fetches,
+            }
+        }
+    
+    def _spool_batch(self, data: List[Tuple[str, float, str]]) -> bool:
+        """저장하지 못한 배치를 로컬 스풀에 보관 (스풀이 없으면 False)"""
+        if self.spool is None:
+            return False
+        self.spool.append(data)
+        logger.warning(f"DB 저장 불가 - {len(data)}개 틱을 로컬 스풀에 보관")
+        return True
+    
+    def _write_batch(self, data: List[Tuple[str, float, str]]) -> bool:
+        """
+        배치를 데이터베이스에 저장 (블로킹, 워커 스레드에서 실행)
+        DB에 쓰지 못하면 로컬 스풀에 보관
+        
+        Args:
+            data: (symbol, price, timestamp) 튜플 리스트
+        
+        Returns:
+            bool: 저장(또는 스풀 보관) 성공 여부
+        """
+        # 데이터베이스 연결 상태 확인 (재연결 백오프 대기 중이면 건너뜀)
+        if not self.db.is_available():
+            self._last_write_ok = False
+            if self.spool is None:
+                logger.warning("데이터베이스가 연결되지 않아 데이터 저장을 건너뜁니다")
+            return self._spool_batch(data)
+        
+        # 시작 시 DB가 없었다면 재연결 후 테이블을 지연 생성
+        self._last_write_ok = (
+            self.db.ensure_tables() and self.db.bulk_insert_prices(data)
+        )
+        return self._last_write_ok or self._spool_batch(data)
+    
+    def _replay_batch(self, data: List[Tuple[str, float, str]]) -> bool:
+        """스풀 재생용 저장 ((symbol, timestamp) upsert라 이미 저장된 틱은 건너뜀)"""
+        return self.db.ensure_tables() and self.db.bulk_insert_prices(data)
+    
+    def _maybe_replay_spool(self):
+        """DB 저장이 다시 성공하면 스풀에 남은 틱을 백그라운드로 재생"""
+        if self.spool is None or not self._last_write_ok:
+            return
+        if self._replay_task is not None and not self._replay_task.done():
+            return
+        if not self.spool.has_pending():
+            return
+        logger.info("DB 재연결 확인 - 로컬 스풀 재생 시작")
+        self._replay_task = asyncio.create_task(
+            asyncio.to_thread(self.spool.replay, self._replay_batch)
+        )
     
     async def save_to_database(self, data: List[Tuple[str, float, str]]) -> bool:
         """
         수집된 데이터를 데이터베이스에 저장
+        write-behind 버퍼가 실행 중이면 큐에 넣고 바로 반환
         
         Args:
             data: (symbol, price, timestamp) 튜플 리스트
         
         Returns:
-            bool: 저장 성공 여부
+            bool: 저장(또는 큐 적재/스풀 보관) 성공 여부
         """
         if not data:
             return True
         
-        # 데이터베이스 연결 상태 확인
-        if db_manager.connection is None or not db_manager.connection.open:
-            logger.warning("데이터베이스가 연결되지 않아 데이터 저장을 건너뜁니다")
-            return False
+        if self.write_buffer.is_running:
+            await self.write_buffer.put(data)
+            success = True
+        else:
+            # 블로킹 DB 호출은 이벤트 루프 밖에서 실행
+            success = await asyncio.to_thread(self._write_batch, data)
         
-        return db_manager.bulk_insert_prices(data)
+        self._maybe_replay_spool()
+        return success
     
-    async def collect_and_save(self, force_all_symbols: bool = False) -> bool:
+    async def collect_and_save(
+        self,
+        force_all_symbols: bool = False,
+        symbols: Optional[List[str]] = None
+    ) -> bool:
         """
         데이터 수집 및 저장을 한 번에 수행
         
+        Args:
+            force_all_symbols: 장 여부와 무관하게 전체 종목 대상 여부
+            symbols: 수집할 심볼 리스트 (지정 시 시장 상태/대상 필터 무시)
+        
         Returns:
             bool: 성공 여부
         """
+        success, _ = await self._collect_and_save(force_all_symbols, symbols)
+        return success
+    
+    async def collect_and_save_by_deadline(
+        self, symbols: List[str], deadline: float, spread: float = 0.0
+    ) -> Tuple[bool, List[str]]:
+        """
+        사이클 마감 시각까지 수집된 결과만 저장 (부분 flush)
+        마감까지 조회를 끝내지 못한 심볼은 기다리지 않고 반환
+        
+        Args:
+            symbols: 수집할 심볼 리스트
+            deadline: 사이클 마감 시각 (time.monotonic 기준)
+            spread: 배치 청크 시작 시각을 나눌 창(초, 마감 전에 끝나도록 줄어듦)
+        
+        Returns:
+            Tuple[bool, List[str]]: (저장 성공 여부, 미룬 심볼)
+        """
+        return await self._collect_and_save(
+            symbols=symbols, deadline=deadline, spread=spread
+        )
+    
+    async def _collect_and_save(
+        self,
+        force_all_symbols: bool = False,
+        symbols: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        spread: float = 0.0
+    ) -> Tuple[bool, List[str]]:
+        # 프로파일러가 사이클 대상으로 무장된 경우에만 캡처
+        session = profiler.begin("cycle")
+        if session is None:
+            return await self._collect_and_save_once(
+                force_all_symbols, symbols, deadline, spread
+            )
+        started = time.perf_counter()
+        try:
+            result = await self._collect_and_save_once(
+                force_all_symbols, symbols, deadline, spread
+            )
+            # write-behind 버퍼는 큐 적재만 하므로 캡처 중인 사이클은 배치 저장까지 기다려
+            # insert 구간(bulk_insert_prices)도 같은 캡처에 기록
+            await self.write_buffer.flush()
+            return result
+        finally:
+            profiler.end(
+                session, time.perf_counter() - started,
+                symbols=len(symbols) if symbols is not None else None
+            )
+    
+    async def _collect_and_save_once(
+        self,
+        force_all_symbols: bool,
+        symbols: Optional[List[str]],
+        deadline: Optional[float],
+        spread: float = 0.0
+    ) -> Tuple[bool, List[str]]:
         try:
             # 데이터 수집
-            stock_data = await self.collect_stock_data(
-                force_all_symbols=force_all_symbols
+            stock_data, deferred = await self._collect_stock_data(
+                force_all_symbols=force_all_symbols, symbols=symbols,
+                deadline=deadline, spread=spread
             )
             
             if stock_data:
                 # 데이터베이스에 저장
                 success = await self.save_to_database(stock_data)
-                return success
+                if success:
+                    # 저장된 사이클 결과를 최신 가격 캐시에 원자적으로 반영
+                    self.cache.update(stock_data)
+                    # WebSocket/SSE 구독자에게 푸시 (큐 적재만 하므로 대기 없음)
+                    self.broadcaster.publish(stock_data)
+                return success, deferred
             else:
                 logger.info("저장할 데이터가 없습니다.")
-                return False
+                return False, deferred
                 
         except Exception as e:
             logger.error(f"데이터 수집 및 저장 중 오류: {e}")
-            return False
-
+            return False, []
 
 # 전역 데이터 수집기 인스턴스
-stock_collector = StockDataCollector() 
\ No newline at end of file
+stock_collector = StockDataCollector(
+    spool=TickSpool() if SPOOL_ENABLED else None
+) 
\ No newline at end of file
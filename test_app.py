@@ -3,15 +3,40 @@
 애플리케이션 기능 테스트 스크립트
 """
 import asyncio
+import os
 import sys
-from datetime import datetime
+import tempfile
+import time
+from datetime import datetime, timedelta
 
 # 프로젝트 모듈 임포트
 try:
-    from config import SYMBOL_MARKET, MARKET_HOURS
-    from market_utils import get_market_status, get_active_symbols, is_market_open
-    from database import db_manager
-    from stock_data_collector import stock_collector
+    import pandas as pd
+    import pytz
+    from config import SYMBOL_MARKET, MARKET_HOURS, TARGET_SYMBOLS, COLLECTOR_BATCH_TIMEOUT
+    from market_utils import (
+        get_market_status, get_active_symbols, is_market_open,
+        get_current_timezone_time, MarketCalendar
+    )
+    from database import db_manager, DatabaseManager, decode_history_cursor
+    from benchmark import create_sqlite_manager
+    from stock_data_collector import stock_collector, StockDataCollector, ChunkPacer
+    from price_cache import LatestPriceCache
+    from write_buffer import WriteBehindBuffer
+    from tick_broadcaster import TickBroadcaster
+    from tick_spool import TickSpool
+    from backfill import BackfillJob, CHUNK_EPOCH
+    from maintenance import PartitionMaintenance
+    from periodic_task import (
+        AdaptiveSchedule, CollectionSchedule, PeriodicTaskManager, build_schedule_specs
+    )
+    from adaptive_polling import AdaptivePollingPlanner, RequestBudget
+    from export import iter_export
+    from metrics import MetricsRegistry, RouteLatencyMiddleware
+    from profiling import Profiler, ProfilingMiddleware, profiler as default_profiler
+    from price_source import (
+        PriceSource, YFinancePriceSource, SimulatedPriceSource
+    )
     print("✅ 모든 모듈 임포트 성공")
 except ImportError as e:
     print(f"❌ 모듈 임포트 실패: {e}")
@@ -85,6 +110,1182 @@ async def test_stock_data_collection():
         print(f"❌ 데이터 수집 테스트 중 오류: {e}")
 
 
+def make_fake_batch_downloader(empty_symbols, calls):
+    """합성 다중 종목 프레임을 반환하는 가짜 다운로드 함수 생성"""
+    def fake_download(tickers, **kwargs):
+        calls.append(list(tickers))
+        index = pd.date_range("2024-01-02 09:00", periods=3, freq="1min")
+        frames = {}
+        for i, symbol in enumerate(tickers):
+            closes = [100.0 + i, 101.0 + i, 102.0 + i]
+            if symbol in empty_symbols:
+                closes = [float("nan")] * 3
+            frames[symbol] = pd.DataFrame({"Close": closes}, index=index)
+        return pd.concat(frames, axis=1)
+    return fake_download
+
+
+def test_market_calendar():
+    """거래소 세션 달력 (휴장일/단축 거래일/다음 개장) 및 스케줄 계획 테스트"""
+    print("\n📅 거래소 달력 테스트")
+    print("-" * 40)
+    
+    calendar = MarketCalendar(
+        "KR", MARKET_HOURS["KR"],
+        holidays=["2026-10-09"],
+        special_sessions={"2026-11-19": ("10:00", "16:30")}
+    )
+    kst = calendar.timezone
+    
+    def at(value):
+        return kst.localize(datetime.fromisoformat(value))
+    
+    assert calendar.is_open(at("2026-10-08T15:30"))
+    assert not calendar.is_open(at("2026-10-08T15:31"))
+    # 휴장일(금) 다음 주말을 건너뛰어 월요일 개장
+    assert calendar.next_open(at("2026-10-08T16:00")) == at("2026-10-12T09:00")
+    assert not calendar.is_open(at("2026-11-19T09:30"))
+    assert calendar.is_open(at("2026-11-19T16:00"))
+    # UTC 기준 시각도 거래소 시간대로 변환해 판단
+    assert calendar.is_open(at("2026-10-12T10:00").astimezone(pytz.utc))
+    
+    extended = MarketCalendar("KR", MARKET_HOURS["KR"], extended=True)
+    assert extended.is_open(at("2026-10-12T17:00"))
+    
+    scheduler = CollectionSchedule("all", TARGET_SYMBOLS, collector=stock_collector)
+    symbols, next_open = scheduler.plan_cycle(at("2026-10-17T12:00"))
+    assert next_open is not None and next_open > at("2026-10-17T12:00")
+    kr_targets = [s for s in TARGET_SYMBOLS if SYMBOL_MARKET.get(s) == "KR"]
+    assert not any(s in symbols for s in kr_targets)
+    symbols, _ = scheduler.plan_cycle(at("2026-10-19T10:00"))
+    assert all(s in symbols for s in kr_targets)
+    print(f"✅ 다음 개장 {next_open.isoformat()}")
+
+
+def test_collection_schedules():
+    """거래소/묶음별 스케줄 위상 분산 및 독립 실행 테스트 (가짜 수집기 사용)"""
+    print("\n🗓️ 수집 스케줄 테스트")
+    print("-" * 40)
+    
+    # 설정이 없으면 거래소별 스케줄로 나누고 위상을 주기 안에 분산
+    specs = build_schedule_specs(symbols=["005930.KS", "000660.KS", "CUSTOM"])
+    assert specs["KR"]["symbols"] == ["005930.KS", "000660.KS"]
+    assert specs["default"]["symbols"] == ["CUSTOM"]
+    assert specs["KR"]["phase"] == 0 and specs["default"]["phase"] == 30
+    specs = build_schedule_specs({"x": {"symbols": ["A"]}, "y": {"symbols": ["B"]}})
+    assert specs["x"]["phase"] == 0 and specs["y"]["phase"] == 30
+    
+    schedule = CollectionSchedule("x", ["A"], interval=60, phase=15)
+    assert schedule.next_tick(1000.0) == 1035.0 and schedule.next_tick(1035.0) == 1035.0
+    
+    class FakeCollector:
+        def __init__(self):
+            self.calls = []
+        
+        async def collect_and_save_by_deadline(self, symbols, deadline, spread=0.0):
+            self.calls.append(tuple(symbols))
+            if symbols == ["SLOW"]:
+                await asyncio.sleep(0.5)
+            return True, []
+    
+    async def run():
+        collector = FakeCollector()
+        manager = PeriodicTaskManager(
+            collector=collector,
+            schedules={
+                "fast": {"symbols": ["FAST"], "interval": 0.05},
+                "slow": {"symbols": ["SLOW"], "interval": 0.05},
+            },
+            calendar_enabled=False,
+            jitter=0.01
+        )
+        manager.start()
+        await asyncio.sleep(0.4)
+        status = manager.get_status()
+        manager.stop()
+        return collector.calls, status
+    
+    calls, status = asyncio.run(run())
+    schedules = status["schedules"]
+    # 느린 묶음이 끝나기를 기다리지 않고 빠른 묶음은 계속 수집
+    assert calls.count(("SLOW",)) == 1 and calls.count(("FAST",)) >= 3
+    assert schedules["fast"]["cycle_count"] >= 3 and schedules["slow"]["cycle_count"] == 1
+    print(f"✅ 빠른 묶음 {schedules['fast']['cycle_count']}회, 느린 묶음 "
+          f"{schedules['slow']['cycle_count']}회 수집")
+
+
+def test_adaptive_polling():
+    """변동성 적응형 폴링 주기/우선순위 큐/분당 예산 테스트 (시각을 직접 진행)"""
+    print("\n🎯 적응형 폴링 테스트")
+    print("-" * 40)
+    
+    budget = RequestBudget(per_minute=6)
+    planner = AdaptivePollingPlanner(
+        ["VOL", "FLAT"], budget, base_interval=60,
+        min_interval=10, max_interval=300
+    )
+    now = time.monotonic()
+    start = now
+    prices = {"VOL": 100.0, "FLAT": 50.0}
+    for step in range(200):
+        due = planner.pop_due(now)
+        for symbol in due:
+            if symbol == "VOL":
+                # 조회마다 ±1% 움직이는 종목
+                prices[symbol] *= 1.01 if step % 2 else 0.99
+            planner.observe(symbol, prices[symbol], f"t{step}", now)
+        planner.reschedule(due, now)
+        now += max(planner.wait_time(now), 0.001)
+        if now - start > 1800:
+            break
+    
+    stats = planner.get_stats()
+    assert stats["VOL"]["interval_seconds"] == 10
+    assert stats["FLAT"]["interval_seconds"] == 300
+    assert stats["VOL"]["polls"] > 10 * stats["FLAT"]["polls"]
+    # 전체 조회 수는 분당 예산(+ 초기 버킷)을 넘지 않음
+    minutes = (now - start) / 60
+    total = stats["VOL"]["polls"] + stats["FLAT"]["polls"]
+    assert total <= 6 * minutes + 6
+    
+    manager = PeriodicTaskManager(
+        collector=stock_collector,
+        schedules={"kr": {"symbols": ["A", "B"], "interval": 30, "adaptive": True}},
+        calendar_enabled=False
+    )
+    assert isinstance(manager.schedules["kr"], AdaptiveSchedule)
+    assert manager.get_status()["request_budget"]["per_minute"] == 4
+    print(f"✅ VOL {stats['VOL']['polls']}회 / FLAT {stats['FLAT']['polls']}회 조회 "
+          f"({minutes:.0f}분, 예산 제한 {budget.throttled}회)")
+
+
+def test_cycle_deadline():
+    """사이클 마감: 부분 저장, 느린 종목 미룸, 놓친 주기 병합 테스트"""
+    print("\n⏱️ 사이클 마감 테스트")
+    print("-" * 40)
+    
+    slow_symbol = TARGET_SYMBOLS[-1]
+    manager = create_sqlite_manager(":memory:")
+    collector = StockDataCollector(
+        source=YFinancePriceSource(
+            batch_downloader=make_fake_batch_downloader({slow_symbol}, [])
+        ),
+        db=manager,
+        cache=LatestPriceCache()
+    )
+    
+    def hung_fallback(symbol, skip_primary=False, cancel_event=None,
+                      market_open=None):
+        time.sleep(0.5)
+        return 1.0
+    collector._fetch_symbol_price = hung_fallback
+    
+    started = time.monotonic()
+    success, deferred = asyncio.run(collector.collect_and_save_by_deadline(
+        list(TARGET_SYMBOLS), started + 0.2
+    ))
+    elapsed = time.monotonic() - started
+    collector.close()
+    stored = manager.get_latest_prices()
+    manager.disconnect()
+    # 마감 전에 받은 종목은 저장하고 멈춘 종목은 기다리지 않고 미룸
+    assert success and deferred == [slow_symbol] and elapsed < 0.45
+    assert len(stored) == len(TARGET_SYMBOLS) - 1
+    
+    class OverrunCollector:
+        def __init__(self):
+            self.calls = []
+        
+        async def collect_and_save_by_deadline(self, symbols, deadline, spread=0.0):
+            self.calls.append(list(symbols))
+            if len(self.calls) == 1:
+                # 첫 사이클은 주기를 몇 번 넘기고 B를 미룸
+                await asyncio.sleep(0.17)
+                return True, ["B"]
+            return True, []
+    
+    async def run():
+        fake = OverrunCollector()
+        schedule = CollectionSchedule(
+            "x", ["A", "B"], interval=0.05, jitter=0,
+            collector=fake, calendar_enabled=False
+        )
+        schedule.start()
+        await asyncio.sleep(0.4)
+        schedule.stop()
+        return fake.calls, schedule.get_status()
+    
+    calls, status = asyncio.run(run())
+    assert calls[1] == ["B", "A"]
+    assert status["recent_cycles"][0]["deferred"] == 1
+    assert status["missed_ticks"] >= 2 and status["recent_cycles"][1]["missed_ticks"] >= 2
+    print(f"✅ {elapsed:.2f}초에 {len(stored)}개 저장, 미룸 {deferred}, "
+          f"놓친 주기 {status['missed_ticks']}개 병합")
+
+
+def test_batch_collection():
+    """배치 수집 경로 테스트 (가짜 소스 사용, 네트워크 불필요)"""
+    print("\n📦 배치 수집 테스트")
+    print("-" * 40)
+    
+    empty_symbol = TARGET_SYMBOLS[-1]
+    calls = []
+    fallback_calls = []
+    collector = StockDataCollector(source=YFinancePriceSource(
+        batch_downloader=make_fake_batch_downloader({empty_symbol}, calls)
+    ))
+    
+    def fake_fallback(symbol, skip_primary=False, cancel_event=None,
+                      market_open=None):
+        fallback_calls.append((symbol, skip_primary))
+        return 1.0
+    collector._fetch_symbol_price = fake_fallback
+    
+    data = asyncio.run(collector.collect_stock_data(force_all_symbols=True))
+    prices = {symbol: price for symbol, price, _ in data}
+    
+    assert len(calls) == 1, calls
+    assert fallback_calls == [(empty_symbol, True)], fallback_calls
+    assert prices[TARGET_SYMBOLS[0]] == 102.0
+    assert prices[empty_symbol] == 1.0
+    print(f"✅ 요청 {len(calls)}회로 {len(data)}개 종목 수집, 폴백 {len(fallback_calls)}개")
+
+
+def test_chunk_dispatch_spread():
+    """사이클 안의 배치 청크 요청을 창에 나눠 보내 동시 상류 요청 수를 줄이는지 테스트"""
+    print("\n🌊 청크 요청 분산 테스트")
+    print("-" * 40)
+    
+    import threading
+    symbols = SimulatedPriceSource.generate_symbols(200)
+    lock = threading.Lock()
+    inflight = {"now": 0, "peak": 0}
+    base_download = make_fake_batch_downloader(set(), [])
+    
+    def counting_download(tickers, **kwargs):
+        with lock:
+            inflight["now"] += 1
+            inflight["peak"] = max(inflight["peak"], inflight["now"])
+        try:
+            time.sleep(0.05)
+            return base_download(tickers, **kwargs)
+        finally:
+            with lock:
+                inflight["now"] -= 1
+    
+    def run_cycle(spread):
+        inflight["peak"] = 0
+        collector = StockDataCollector(
+            source=YFinancePriceSource(batch_downloader=counting_download),
+            db=create_sqlite_manager(":memory:"), cache=LatestPriceCache(),
+            broadcaster=TickBroadcaster()
+        )
+        started = time.monotonic()
+        success, deferred = asyncio.run(collector.collect_and_save_by_deadline(
+            symbols, started + 60, spread=spread
+        ))
+        collector.close()
+        assert success and not deferred
+        return inflight["peak"], time.monotonic() - started
+    
+    # 청크 4개(50종목씩)를 한 번에 보내면 4개가 동시에 나가고,
+    # 0.4초 창에 나누면 0.1초 간격으로 시작해 한 번에 하나씩만 나감
+    burst_peak, _ = run_cycle(0.0)
+    spread_peak, spread_elapsed = run_cycle(0.4)
+    assert burst_peak == 4, burst_peak
+    assert spread_peak == 1 and spread_elapsed >= 0.3, (spread_peak, spread_elapsed)
+    
+    # 마감까지 청크 제한 시간만큼도 남지 않으면 나누지 않음 (마지막 청크가 마감을 넘기지 않도록)
+    assert ChunkPacer.for_cycle(10.0, 4, time.monotonic() + COLLECTOR_BATCH_TIMEOUT).step == 0
+    assert ChunkPacer.for_cycle(10.0, 4).step == 2.5
+    schedule = CollectionSchedule("x", ["A"], interval=60, dispatch_spread=0.5,
+                                  collector=stock_collector)
+    assert schedule.dispatch_spread == 30
+    print(f"✅ 최대 동시 청크 요청 {burst_peak} → {spread_peak} "
+          f"(분산 사이클 {spread_elapsed:.2f}초)")
+
+
+def test_ohlcv_ingest():
+    """OHLCV 수집 모드 테스트 (거래소 시각 유지, 이미 저장한 봉 제외)"""
+    print("\n🕯️ OHLCV 수집 테스트")
+    print("-" * 40)
+    
+    windows = []
+    
+    def fake_download(tickers, **kwargs):
+        windows.append(kwargs.get("start", kwargs.get("period")))
+        # 실제 yf.download처럼 분봉 인덱스는 UTC (09:00 KST == 00:00 UTC)
+        index = pd.date_range("2024-01-02 00:00", periods=3, freq="1min", tz="UTC")
+        frame = pd.DataFrame({
+            "Open": [10.0, 11.0, 12.0], "High": [11.0, 12.0, 13.0],
+            "Low": [9.0, 10.0, 11.0], "Close": [10.5, 11.5, 12.5],
+            "Volume": [100, 200, 300],
+        }, index=index)
+        return pd.concat({symbol: frame for symbol in tickers}, axis=1)
+    
+    class FakeLatestDB:
+        def is_available(self):
+            return True
+        
+        def get_last_bar_times(self, symbols):
+            return {TARGET_SYMBOLS[0]: datetime(2024, 1, 2, 9, 0)}
+    
+    collector = StockDataCollector(
+        source=YFinancePriceSource(batch_downloader=fake_download),
+        db=FakeLatestDB(), ingest_mode="ohlcv"
+    )
+    first = asyncio.run(collector.collect_stock_data(force_all_symbols=True))
+    second = asyncio.run(collector.collect_stock_data(force_all_symbols=True))
+    
+    assert len(first) == 3 * len(TARGET_SYMBOLS) - 1 and not second
+    assert ("000660.KS", 10.5, "2024-01-02 09:00:00", 10.0, 11.0, 9.0, 100) in first
+    assert min(bar[2] for bar in first if bar[0] == TARGET_SYMBOLS[0]) == "2024-01-02 09:01:00"
+    # 오래된 마지막 봉(공백)/콜드 스타트는 전체 기간 요청
+    assert windows == ["1d", "1d"], windows
+    print(f"✅ 새 봉 {len(first)}개 저장, 재수집 시 {len(second)}개 (중복 {collector.duplicate_bars}개 제외)")
+
+
+def test_incremental_ohlcv():
+    """연속 두 사이클 중 두 번째는 마지막 봉 이후 구간(start=)만 요청하는지 테스트"""
+    print("\n➕ 증분 OHLCV 조회 테스트")
+    print("-" * 40)
+    
+    windows = []
+    
+    def fake_download(tickers, **kwargs):
+        windows.append(kwargs.get("start", kwargs.get("period")))
+        # 방금 끝난 분봉 3개 (실제 API처럼 UTC 인덱스)
+        end = pd.Timestamp.now(tz="UTC").floor("min")
+        index = pd.date_range(end=end - pd.Timedelta(minutes=1), periods=3, freq="1min")
+        frame = pd.DataFrame({
+            "Open": [10.0, 11.0, 12.0], "High": [11.0, 12.0, 13.0],
+            "Low": [9.0, 10.0, 11.0], "Close": [10.5, 11.5, 12.5],
+            "Volume": [100, 200, 300],
+        }, index=index)
+        return pd.concat({symbol: frame for symbol in tickers}, axis=1)
+    
+    class EmptyDB:
+        def is_available(self):
+            return True
+        
+        def get_last_bar_times(self, symbols):
+            return {}
+    
+    symbol = TARGET_SYMBOLS[0]
+    collector = StockDataCollector(
+        source=YFinancePriceSource(batch_downloader=fake_download),
+        db=EmptyDB(), ingest_mode="ohlcv"
+    )
+    first = asyncio.run(collector.collect_stock_data(symbols=[symbol]))
+    asyncio.run(collector.collect_stock_data(symbols=[symbol]))
+    
+    # 저장한 봉은 거래소 로컬 시각 (현재 KST와 몇 분 이내)
+    now = get_current_timezone_time("KR").replace(tzinfo=None)
+    last_bar = datetime.fromisoformat(max(bar[2] for bar in first))
+    assert timedelta(0) < now - last_bar < timedelta(minutes=5), (now, last_bar)
+    # 첫 사이클은 콜드 스타트(period=), 두 번째는 마지막 봉 이후 증분(start=)
+    assert windows[0] == "1d" and isinstance(windows[1], datetime), windows
+    assert windows[1] <= last_bar and last_bar - windows[1] < timedelta(minutes=5)
+    assert collector.incremental_fetches == 1 and collector.gap_fetches == 0
+    print(f"✅ 두 번째 사이클 start={windows[1]} 증분 요청")
+
+
+def test_fallback_tier_cache():
+    """폴백 단계 학습 캐시 테스트 (가짜 단계 사용, 네트워크 불필요)"""
+    print("\n🪜 폴백 단계 학습 캐시 테스트")
+    print("-" * 40)
+    
+    calls = []
+    
+    class FakeTierSource(PriceSource):
+        tier_names = YFinancePriceSource.tier_names
+        
+        def fetch_batch(self, symbols):
+            return {}
+        
+        def fetch_tier(self, symbol, tier_index):
+            calls.append(tier_index)
+            return 50.0 if tier_index == 6 else None
+    
+    collector = StockDataCollector(source=FakeTierSource())
+    
+    symbol = TARGET_SYMBOLS[0]
+    first = collector._fetch_symbol_price(symbol, market_open=False)
+    first_calls = len(calls)
+    calls.clear()
+    second = collector._fetch_symbol_price(symbol, market_open=False)
+    
+    assert first == second == 50.0
+    assert first_calls == 7 and calls == [6], calls
+    
+    # 장 상태가 바뀌면 처음 단계부터 다시 탐색
+    calls.clear()
+    collector._fetch_symbol_price(symbol, market_open=True)
+    assert calls[0] == 0, calls
+    
+    stats = collector.get_stats()["fallback_tiers"]
+    print(f"✅ 학습 후 호출 {first_calls}회 → 1회, 통계: {stats['learned']}")
+
+
+def test_simulated_source():
+    """오프라인 시뮬레이터 결정성 및 대량 수집 테스트"""
+    print("\n🎲 시뮬레이터 소스 테스트")
+    print("-" * 40)
+    
+    symbols = SimulatedPriceSource.generate_symbols(2000)
+    
+    def run_once():
+        source = SimulatedPriceSource(seed=7, latency=0.0)
+        collector = StockDataCollector(source=source)
+        data = asyncio.run(collector.collect_stock_data(symbols=symbols))
+        collector.close()
+        return {symbol: price for symbol, price, _ in data}, source
+    
+    first, source = run_once()
+    second, _ = run_once()
+    
+    assert first == second
+    assert len(first) > len(symbols) * 0.9
+    print(f"✅ {len(first)}/{len(symbols)}개 종목 수집, "
+          f"요청 {source.request_count}회 (시드 고정 결정적)")
+
+
+def test_price_cache():
+    """최신 가격 캐시 버전/필터 테스트"""
+    print("\n🧊 최신 가격 캐시 테스트")
+    print("-" * 40)
+    
+    cache = LatestPriceCache()
+    cache.update([("A", 1.0, "2024-01-01 09:00:00"),
+                  ("B", 2.0, "2024-01-01 09:00:00")])
+    version = cache.version
+    etag = cache.etag
+    
+    # 재시작한 프로세스/다른 워커라도 같은 내용이면 같은 ETag,
+    # 같은 버전 번호라도 내용이 다르면 다른 ETag
+    other = LatestPriceCache()
+    other.update([("B", 2.0, "2024-01-01T09:00:00"),
+                  ("A", 1.0, "2024-01-01 09:00:00")])
+    assert other.etag == etag
+    stale = LatestPriceCache()
+    stale.update([("A", 9.0, "2024-01-01 09:00:00"),
+                  ("B", 2.0, "2024-01-01 09:00:00")])
+    assert stale.version == version and stale.etag != etag
+    
+    # 더 오래된 데이터와 동일한 데이터는 버전을 바꾸지 않음
+    cache.update([("A", 0.5, "2024-01-01 08:59:00")])
+    cache.update([("B", 2.0, "2024-01-01 09:00:00")])
+    assert cache.version == version
+    
+    cache.update([("A", 1.5, "2024-01-01 09:01:00")])
+    rows, new_version = cache.get(["A", "Z"])
+    assert new_version == version + 1
+    assert cache.etag != etag
+    assert rows == [{"symbol": "A", "price": 1.5,
+                     "timestamp": "2024-01-01T09:01:00"}]
+    print(f"✅ 캐시 버전 {new_version}, ETag {cache.etag}")
+
+
+def test_tick_broadcaster():
+    """푸시 브로드캐스터 필터/공유 직렬화/느린 구독자 정책 테스트"""
+    print("\n📡 틱 브로드캐스터 테스트")
+    print("-" * 40)
+    
+    async def run():
+        hub = TickBroadcaster(max_pending=2, policy="coalesce")
+        everyone = hub.subscribe()
+        only_a = hub.subscribe(["A"])
+        also_a = hub.subscribe(["A"])
+        only_z = hub.subscribe(["Z"])
+        assert hub.publish([("A", 1.0, "2024-01-01 09:00:00"),
+                            ("B", 2.0, "2024-01-01 09:00:00")]) == 3
+        # 같은 필터의 구독자는 같은 메시지 객체(같은 바이트)를 공유
+        first_a, second_a = await only_a.get(), await also_a.get()
+        assert first_a is second_a and first_a.sse is second_a.sse
+        assert '"symbol": "B"' not in first_a.text
+        assert len((await everyone.get()).fragments) == 2
+        assert await only_z.get(timeout=0.01) is None
+        
+        # 느린 구독자: 가득 차면 심볼별 최신 틱 하나로 병합
+        for minute in range(5):
+            hub.publish([("A", float(minute), f"2024-01-01 09:0{minute}:00")])
+        assert everyone.depth == 1 and everyone.coalesced == 4
+        assert '"price": 4.0' in (await everyone.get()).text
+        
+        # 병합된 메시지는 가장 새 메시지의 종류(kind)를 유지
+        for minute in range(3):
+            hub.publish([("A", float(minute), f"2024-01-01 09:1{minute}:00")], kind="snapshot")
+        merged = await everyone.get()
+        assert merged.kind == "snapshot" and merged.sse.startswith(b"event: snapshot\n")
+        assert '"type":"snapshot"' in merged.text
+        
+        dropping = TickBroadcaster(max_pending=2, policy="drop_oldest")
+        slow = dropping.subscribe()
+        for minute in range(5):
+            dropping.publish([("A", float(minute), f"2024-01-01 09:0{minute}:00")])
+        latest = [await slow.get(), await slow.get()]
+        assert slow.dropped == 3 and '"price": 4.0' in latest[-1].text
+        
+        dropping.close()
+        assert await slow.get() is None and dropping.subscriber_count == 0
+        return hub.get_stats()
+    
+    stats = asyncio.run(run())
+    assert stats["messages_built"] < stats["messages_sent"]
+    print(f"✅ 배치 {stats['published_batches']}개, 메시지 생성 "
+          f"{stats['messages_built']}회 / 전달 {stats['messages_sent']}회")
+
+
+def test_write_behind_buffer():
+    """write-behind 버퍼 배치/병합 테스트 (가짜 writer 사용)"""
+    print("\n📝 write-behind 버퍼 테스트")
+    print("-" * 40)
+    
+    batches = []
+    
+    def fake_writer(batch):
+        batches.append(len(batch))
+        return True
+    
+    async def run():
+        buffer = WriteBehindBuffer(fake_writer, batch_size=1000, max_age=0.05)
+        buffer.start()
+        ticks = [(f"S{i % 10}", float(i), f"2024-01-01 09:{i // 600:02d}:00")
+                 for i in range(2500)]
+        await buffer.put(ticks)
+        await asyncio.sleep(0.2)
+        await buffer.stop()
+        
+        coalescing = WriteBehindBuffer(
+            fake_writer, capacity=20, policy="coalesce"
+        )
+        coalescing.start()
+        await coalescing.put(ticks[:15])
+        await coalescing.put(ticks[15:30])
+        depth = coalescing.depth
+        await coalescing.stop()
+        
+        # DB 장애로 저장이 막혀도 'block' 정책은 block_timeout 후 병합하고 반환
+        blocking = WriteBehindBuffer(
+            lambda batch: False, capacity=20, policy="block", block_timeout=0.05
+        )
+        blocking.start()
+        await blocking.put(ticks[:15])
+        await asyncio.wait_for(blocking.put(ticks[15:30]), 1.0)
+        blocked_depth = blocking.depth
+        await blocking.stop()
+        return (buffer.get_stats(), depth, coalescing.get_stats(),
+                blocked_depth, blocking.get_stats())
+    
+    stats, depth, coalesced, blocked_depth, blocked = asyncio.run(run())
+    assert stats["rows_written"] == 2500 and stats["max_batch_size"] == 1000
+    assert depth == 10 and coalesced["coalesced"] == 20
+    assert blocked_depth == 10 and blocked["block_timeouts"] == 1
+    
+    # OHLCV 봉은 (심볼, 봉 시각)이 같을 때만 병합하고, 넘친 봉은 overflow(스풀)로 넘기거나 유실로 집계
+    def bar(minute, close=10.0):
+        return ("A", close, f"2024-01-02 09:{minute:02d}:00", 10.0, 11.0, 9.0, 100)
+    
+    async def run_bars(overflow):
+        written = []
+        bars = WriteBehindBuffer(
+            lambda batch: written.extend(batch) or True, capacity=5,
+            policy="coalesce", overflow=overflow
+        )
+        bars.start()
+        await bars.put([bar(0), bar(1), bar(2), bar(3), bar(3, close=10.5)])
+        await bars.put([bar(4), bar(5), bar(6), bar(7)])
+        await bars.stop()
+        return written, bars.get_stats()
+    
+    spooled = []
+    written, bar_stats = asyncio.run(run_bars(lambda rows: spooled.extend(rows) or True))
+    assert bar_stats["coalesced"] == 1 and bar_stats["dropped"] == 0
+    assert bar_stats["overflowed"] == 3 and [row[2][-5:-3] for row in spooled] == ["00", "01", "02"]
+    assert sorted(row[2] for row in written + spooled) == [bar(m)[2] for m in range(8)]
+    assert ("A", 10.5, "2024-01-02 09:03:00", 10.0, 11.0, 9.0, 100) in written
+    _, lost = asyncio.run(run_bars(None))
+    assert lost["dropped"] == 3 and lost["coalesced"] == 1
+    print(f"✅ 배치 {batches}, 병합 후 큐 깊이 {depth}")
+
+
+def test_upsert_counts():
+    """upsert 결과 분류 테스트 (MySQL 영향 행 수/정보 문자열 흉내)"""
+    print("\n🔁 upsert 결과 분류 테스트")
+    print("-" * 40)
+    
+    class FakeResult:
+        def __init__(self, message):
+            self.message = message
+    
+    class FakeCursor:
+        def __init__(self, outcomes):
+            self.outcomes = list(outcomes)
+            self.rowcount = 0
+            self._result = None
+        
+        def execute(self, sql, params):
+            self.rowcount, message = self.outcomes.pop(0)
+            self._result = FakeResult(message)
+    
+    rows = [("A", 1.0, "2024-01-02 09:00:00")] * 3
+    # 1문: 3행 중 1행 삽입, 1행 갱신(영향 2), 1행 변경 없음 / 2문: 단일 행 변경 없음
+    cursor = FakeCursor([
+        (3, b"Records: 3  Duplicates: 2  Warnings: 0"),
+        (0, b""),
+    ])
+    counts = db_manager._upsert_rows(cursor, rows + rows[:1], batch_rows=3)
+    
+    assert counts == {"inserted": 1, "updated": 1, "skipped": 2}, counts
+    print(f"✅ {counts}")
+
+
+def test_tick_spool():
+    """로컬 스풀 추가/재생/손상 프레임 건너뛰기 테스트"""
+    print("\n💾 로컬 스풀 테스트")
+    print("-" * 40)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        spool = TickSpool(directory, segment_bytes=2048)
+        for i in range(20):
+            spool.append([(f"S{i}", float(i), "2024-01-01 09:00:00")])
+        # 활성 세그먼트 끝에 잘린 프레임을 남김
+        spool.close()
+        last = sorted(os.listdir(directory))[-1]
+        with open(os.path.join(directory, last), "ab") as f:
+            f.write(b"\x00\x00\x01\x00broken")
+        
+        replayed = []
+        attempts = []
+        
+        def flaky_writer(batch):
+            attempts.append(len(batch))
+            if len(attempts) == 2:
+                return False
+            replayed.extend(batch)
+            return True
+        
+        first = spool.replay(flaky_writer, batch_size=5, rate_limit=0)
+        second = spool.replay(flaky_writer, batch_size=5, rate_limit=0)
+        stats = spool.get_stats()
+        
+        # 추가가 멈춰도 마지막 프레임은 타이머로 fsync
+        idle = TickSpool(os.path.join(directory, "idle"), fsync_interval=0.05,
+                         fsync_bytes=1 << 20)
+        idle.append([("A", 1.0, "2024-01-01 09:00:00")])
+        idle.append([("A", 1.1, "2024-01-01 09:00:01")])
+        unsynced_before = idle._unsynced_bytes
+        time.sleep(0.2)
+        idle_stats = idle.get_stats()
+        unsynced_after = idle._unsynced_bytes
+        idle.close()
+        
+        # 전체 재생 → 재시작 → 추가 → 재생: 새 세그먼트가 체크포인트 앞 번호가 되어 삭제되지 않아야 함
+        restart_dir = os.path.join(directory, "restart")
+        spool = TickSpool(restart_dir)
+        spool.append([("A", 1.0, "2024-01-01 09:00:00"),
+                      ("B", 2.0, "2024-01-01 09:00:00")])
+        assert spool.replay(lambda batch: True, rate_limit=0) == 2
+        spool.close()
+        restarted = TickSpool(restart_dir)
+        restarted.append([("C", 3.0, "2024-01-01 09:01:00")])
+        after_restart = []
+        restart_replayed = restarted.replay(
+            lambda batch: after_restart.extend(batch) or True, rate_limit=0
+        )
+        restarted.close()
+        
+        # 체크포인트 이후에 쓰인 앞 번호 세그먼트는 삭제하지 않고 재생,
+        # 체크포인트 이전에 재생이 끝난 세그먼트만 삭제
+        stale_dir = os.path.join(directory, "stale")
+        stale = TickSpool(stale_dir)
+        stale.append([("OLD", 1.0, "2024-01-01 09:00:00")])
+        stale.close()
+        stale._active_seq = 2
+        stale.append([("NEW", 1.0, "2024-01-01 09:02:00")])
+        stale.close()
+        stale._save_checkpoint(3, 0)
+        checkpoint_time = os.path.getmtime(os.path.join(stale_dir, "checkpoint.json"))
+        os.utime(stale._segment_path(1), (checkpoint_time - 10, checkpoint_time - 10))
+        os.utime(stale._segment_path(2), (checkpoint_time + 10, checkpoint_time + 10))
+        stale_replayed = []
+        TickSpool(stale_dir).replay(
+            lambda batch: stale_replayed.extend(batch) or True, rate_limit=0
+        )
+    
+    assert restart_replayed == 1 and [row[0] for row in after_restart] == ["C"]
+    assert [row[0] for row in stale_replayed] == ["NEW"]
+    assert unsynced_before > 0 and unsynced_after == 0
+    assert idle_stats["fsync_count"] >= 1
+    assert first == 5 and first + second == 20
+    assert [row[0] for row in replayed] == [f"S{i}" for i in range(20)]
+    assert stats["pending_segments"] == 0 and stats["corrupt_frames"] == 1
+    print(f"✅ {first + second}행 재생 (재개 포함), 손상 프레임 {stats['corrupt_frames']}개 건너뜀")
+
+
+def test_backfill():
+    """백필 청크 분할/체크포인트 재개 테스트 (시뮬레이터 + 가짜 DB)"""
+    print("\n📚 백필 테스트")
+    print("-" * 40)
+    
+    class FakeBulkDB:
+        def __init__(self, fail_every=0):
+            self.rows = []
+            self.calls = 0
+            self.fail_every = fail_every
+        
+        def ensure_tables(self):
+            return True
+        
+        def bulk_load_prices(self, rows, **kwargs):
+            self.calls += 1
+            if self.fail_every and self.calls % self.fail_every == 0:
+                return -1
+            self.rows.extend(rows)
+            return len(rows)
+    
+    source = SimulatedPriceSource(latency=0, failure_rate=0)
+    end = datetime.combine(datetime.now().date(), datetime.min.time())
+    start = end - timedelta(days=10)
+    symbols = ["A.SIM", "B.SIM", "C.SIM"]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        db = FakeBulkDB(fail_every=2)
+        job = BackfillJob(symbols, start, end, interval="1m", workers=2,
+                          source=source, db=db, checkpoint_dir=directory)
+        chunks = job.plan()
+        first = job.run()
+        
+        db.fail_every = 0
+        resumed = BackfillJob(symbols, start, end, interval="1m", workers=2,
+                              source=source, db=db, checkpoint_dir=directory).run()
+        leftover = os.listdir(directory)
+    
+    # 1분봉은 요청 1회 7일 한도 → 고정 7일 경계로 나눈 심볼당 2~3개 청크
+    week = timedelta(days=7)
+    assert len(chunks) in (6, 9) and all(c[2] - c[1] <= week for c in chunks)
+    assert all((c[1] - CHUNK_EPOCH) % week == timedelta(0) for c in chunks if c[1] != start)
+    
+    # 끝을 생략한 같은 요청은 나중에 다시 보내도 같은 작업, 끝이 늘어나도 내부 청크 키는 유지
+    assert BackfillJob(symbols, start, source=source).job_id == \
+        BackfillJob(symbols, start, source=source).job_id
+    later = BackfillJob(symbols, start, end + timedelta(days=3), source=source).plan()
+    keys = {BackfillJob._chunk_key(c) for c in later}
+    assert all(BackfillJob._chunk_key(c) in keys for c in chunks if c[2] != end)
+    assert first["status"] == "failed" and resumed["status"] == "completed"
+    assert resumed["chunks_resumed"] == first["chunks_done"]
+    assert len(db.rows) == len(set(db.rows)) == 3 * 10 * 1440
+    assert not leftover
+    print(f"✅ 청크 {len(chunks)}개, 재개 {resumed['chunks_resumed']}개, {len(db.rows)}행 적재")
+
+
+def test_partition_maintenance():
+    """파티션 관리 테스트 (만료 파티션은 집계 후 삭제, 미래 파티션 생성)"""
+    print("\n🗂️ 파티션 관리 테스트")
+    print("-" * 40)
+    
+    class FakePartitionDB:
+        partitioned = True
+        
+        def __init__(self, days):
+            self.days = sorted(days)
+            self.rollups = []
+            self.purges = {}
+        
+        def ensure_tables(self):
+            return True
+        
+        def list_partitions(self):
+            partitions, start = [], None
+            for day in self.days:
+                end = day + timedelta(days=1)
+                partitions.append({"name": f"p{day:%Y%m%d}", "start": start,
+                                   "end": end, "rows": 0})
+                start = end
+            partitions.append({"name": "pmax", "start": start, "end": None, "rows": 0})
+            return partitions
+        
+        def rollup_prices(self, start, end):
+            self.rollups.append((start, end))
+            return {"5m": 1, "1h": 1}
+        
+        def rollup_deferred(self):
+            return {"5m": 2}
+        
+        def drop_partitions(self, names):
+            self.days = [d for d in self.days if f"p{d:%Y%m%d}" not in names]
+            return len(names)
+        
+        def add_partitions(self, days):
+            self.days = sorted(self.days + days)
+            return len(days)
+        
+        def purge_rollup(self, resolution, before):
+            self.purges[resolution] = before
+            return 0
+    
+    today = datetime(2024, 6, 10).date()
+    db = FakePartitionDB([today - timedelta(days=n) for n in range(5)])
+    job = PartitionMaintenance(
+        db=db, retention={"raw": 2, "5m": 30, "1h": None},
+        resolutions=["5m", "1h"], precreate_days=3, lookback_days=1
+    )
+    result = job.run_once(today)
+    
+    # 6/6, 6/7 파티션은 보존 기간(2일) 경과 → 집계 후 삭제
+    assert result["dropped_partitions"] == ["p20240606", "p20240607"]
+    assert db.days[0] == today - timedelta(days=2)
+    assert db.days[-1] == today + timedelta(days=3)
+    assert len(db.days) == len(set(db.days))
+    # 어제 재집계 1구간 + 만료 파티션 2구간
+    assert len(db.rollups) == 3
+    assert (None, datetime(2024, 6, 7)) in db.rollups
+    assert db.purges == {"5m": datetime(2024, 5, 11)}
+    assert result["rolled_up"]["5m"] == 5
+    print(f"✅ 삭제 {result['dropped_partitions']}, 생성 {result['created_partitions']}개")
+
+
+def test_rollup_cascade():
+    """집계 갱신 범위 테스트 (배치가 걸친 버킷만 해상도 순서대로 다시 계산)"""
+    print("\n🕯️ 집계 봉 갱신 테스트")
+    print("-" * 40)
+    
+    class RecordingCursor:
+        rowcount = 1
+        
+        def __init__(self):
+            self.statements = []
+        
+        def execute(self, sql, params=None):
+            self.statements.append((sql, list(params or [])))
+    
+    cursor = RecordingCursor()
+    db = DatabaseManager(connect_fn=lambda: None)
+    db._refresh_rollups(cursor, [
+        ("A", 10.0, "2024-06-10 09:31:00"),
+        ("B", 11.0, datetime(2024, 6, 10, 10, 2)),
+        ("A", 10.5, "2024-06-10 09:32:00"),
+        # 범위가 ROLLUP_ON_INSERT_MAX_SPAN보다 넓은 심볼은 관리 작업으로 미룸
+        ("C", 9.0, "2024-06-03 09:00:00"),
+        ("C", 9.5, "2024-06-10 09:00:00"),
+    ])
+    
+    targets = [sql.split()[2] for sql, _ in cursor.statements]
+    assert targets == ["stock_prices_5m", "stock_prices_1h", "stock_prices_1d"]
+    # 심볼별로 실제 걸친 버킷만 (A의 9:30, B의 10:00 사이 구간은 다시 계산하지 않음)
+    params = [params for _, params in cursor.statements]
+    assert params[0] == [datetime(2024, 6, 10, 9, 30), datetime(2024, 6, 10, 9, 35), "A",
+                         datetime(2024, 6, 10, 10), datetime(2024, 6, 10, 10, 5), "B"]
+    assert params[1] == [datetime(2024, 6, 10, 9), datetime(2024, 6, 10, 10), "A",
+                         datetime(2024, 6, 10, 10), datetime(2024, 6, 10, 11), "B"]
+    assert params[2] == [datetime(2024, 6, 10), datetime(2024, 6, 11), "A", "B"]
+    # 1h는 5m 집계, 1d는 1h 집계에서 계산 (원본은 5m만 읽음)
+    assert "FROM stock_prices\n" in cursor.statements[0][0]
+    assert "FROM stock_prices_5m" in cursor.statements[1][0]
+    assert "FROM stock_prices_1h" in cursor.statements[2][0]
+    
+    # 미룬 구간은 관리 작업에서 심볼 단위로 계산 후 비움
+    assert db._deferred_rollups == {
+        "C": (datetime(2024, 6, 3, 9), datetime(2024, 6, 10, 9, 0, 1))
+    }
+    calls = []
+    db.rollup_prices = lambda start, end, symbols: (
+        calls.append((start, end, symbols)) or {"5m": 3}
+    )
+    assert db.rollup_deferred() == {"5m": 3}
+    assert calls == [(datetime(2024, 6, 3, 9), datetime(2024, 6, 10, 9, 0, 1), ["C"])]
+    assert db._deferred_rollups == {}
+    print(f"✅ 해상도 {len(targets)}개, 5m 구간 {len(params[0]) // 3}개, 미룬 심볼 {len(calls)}개")
+
+
+def test_history_pagination():
+    """히스토리 keyset 페이지네이션/스트리밍 테스트 (SQLite 어댑터)"""
+    print("\n📜 히스토리 페이지네이션 테스트")
+    print("-" * 40)
+    
+    manager = create_sqlite_manager(":memory:")
+    base = datetime(2024, 6, 10, 9, 0)
+    rows = [
+        (symbol, 100.0 + i, (base + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"))
+        for i in range(50) for symbol in ("A", "B", "C")
+    ]
+    assert manager.bulk_insert_prices(rows)
+    
+    pages, after = [], None
+    while True:
+        page, token = manager.get_price_history_page(limit=40, after=after)
+        pages.append(page)
+        if token is None:
+            break
+        after = decode_history_cursor(token)
+    paged = [(r["timestamp"], r["symbol"]) for page in pages for r in page]
+    streamed = [
+        (r["timestamp"], r["symbol"])
+        for batch in manager.iter_price_history(batch_rows=64) for r in batch
+    ]
+    window = manager.get_price_history(
+        ["B"], limit=100, start="2024-06-10 09:10:00", end="2024-06-10 09:20:00"
+    )
+    manager.disconnect()
+    
+    # 모든 행을 한 번씩, (timestamp, symbol) 내림차순으로
+    assert len(pages) == 4 and len(paged) == len(set(paged)) == 150
+    assert paged == sorted(paged, reverse=True) == streamed
+    assert [r["timestamp"][-8:-3] for r in window][:2] == ["09:19", "09:18"]
+    assert len(window) == 10
+    
+    # 스트리밍용 net_write_timeout은 풀에 반납하기 전에 기본값으로 되돌림
+    class RecordingConnection:
+        def __init__(self):
+            self.statements = []
+            self.closed = False
+        
+        def cursor(self, cursor_class=None):
+            return RecordingStreamCursor(self)
+        
+        def ping(self, reconnect=False):
+            pass
+        
+        def close(self):
+            self.closed = True
+    
+    class RecordingStreamCursor:
+        def __init__(self, conn):
+            self.conn = conn
+            self.batches = [[("A",)], [("B",)]]
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc_info):
+            return False
+        
+        def execute(self, sql, params=None):
+            self.conn.statements.append(sql.strip())
+        
+        def fetchmany(self, size):
+            return self.batches.pop(0) if self.batches else []
+        
+        def close(self):
+            pass
+    
+    conn = RecordingConnection()
+    streaming_db = DatabaseManager(connect_fn=lambda: conn)
+    batches = list(streaming_db._stream_query("SELECT 1", [], 1, None))
+    assert len(batches) == 2
+    assert conn.statements[0].startswith("SET SESSION net_write_timeout = %s")
+    assert conn.statements[-1] == "SET SESSION net_write_timeout = DEFAULT"
+    assert not conn.closed and len(streaming_db.pool._idle) == 1
+    # 소비자가 중간에 멈추면 복원하지 않고 연결 자체를 폐기
+    abandoned = RecordingConnection()
+    streaming_db = DatabaseManager(connect_fn=lambda: abandoned)
+    stream = streaming_db._stream_query("SELECT 1", [], 1, None)
+    next(stream)
+    stream.close()
+    assert abandoned.closed and not streaming_db.pool._idle
+    print(f"✅ 페이지 {len(pages)}개, 스트리밍 {len(streamed)}행")
+
+
+def test_export_csv():
+    """CSV 내보내기 테스트 (서버 측 커서 묶음 단위 인코딩, SQLite 어댑터)"""
+    print("\n📦 내보내기 테스트")
+    print("-" * 40)
+    
+    manager = create_sqlite_manager(":memory:")
+    base = datetime(2024, 6, 10, 9, 0)
+    assert manager.bulk_insert_prices([
+        (symbol, 10.0 + i, (base + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+         10.0, 11.0, 9.0, 100 * i)
+        for i in range(30) for symbol in ("B", "A")
+    ] + [("C", 5.0, "2024-06-10 09:00:00")])
+    
+    chunks = list(iter_export("csv", ["A", "C"], start=base, db=manager, batch_rows=8))
+    manager.disconnect()
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    
+    assert lines[0] == "symbol,price,timestamp,open_price,high_price,low_price,volume"
+    # 헤더 + A 30행 + C 1행, (symbol, timestamp) 순서, 종가만 있는 행의 봉 필드는 빈 값
+    assert len(lines) == 32 and len(chunks) == 4
+    assert lines[1] == "A,10,2024-06-10 09:00:00,10,11,9,0"
+    assert lines[-1] == "C,5,2024-06-10 09:00:00,,,,"
+    try:
+        list(iter_export("xlsx", db=manager))
+        assert False, "알 수 없는 형식은 ValueError"
+    except ValueError:
+        pass
+    print(f"✅ {len(lines) - 1}행, 청크 {len(chunks)}개")
+
+
+def test_metrics():
+    """메트릭 레지스트리 텍스트 형식과 라우트 지연 시간 미들웨어 테스트"""
+    print("\n📈 메트릭 테스트")
+    print("-" * 40)
+    
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    
+    registry = MetricsRegistry(enabled=True)
+    latency = registry.histogram("fetch_seconds", "조회 시간", ("symbol",), buckets=(0.1, 1.0))
+    tiers = registry.counter("tier_total", "폴백 단계", ("symbol", "tier"))
+    depth = registry.gauge("queue_depth", "큐 길이", ("queue",))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("AAPL").observe(value)
+    tiers.labels("AAPL", "5m").inc()
+    tiers.labels("AAPL", "5m").inc()
+    pending = [1, 2, 3]
+    depth.labels("write_buffer").set_function(lambda: len(pending))
+    
+    lines = registry.render().splitlines()
+    # 버킷은 누적 개수, 경계값(0.1)은 le="0.1" 버킷에 포함
+    assert 'fetch_seconds_bucket{symbol="AAPL",le="0.1"} 2' in lines
+    assert 'fetch_seconds_bucket{symbol="AAPL",le="1.0"} 3' in lines
+    assert 'fetch_seconds_bucket{symbol="AAPL",le="+Inf"} 4' in lines
+    assert 'fetch_seconds_count{symbol="AAPL"} 4' in lines
+    assert 'fetch_seconds_sum{symbol="AAPL"} 3.65' in lines
+    assert 'tier_total{symbol="AAPL",tier="5m"} 2.0' in lines
+    assert 'queue_depth{queue="write_buffer"} 3.0' in lines
+    assert "# TYPE fetch_seconds histogram" in lines
+    
+    disabled = MetricsRegistry(enabled=False)
+    ignored = disabled.histogram("ignored_seconds", "무시")
+    ignored.observe(1.0)
+    assert "ignored_seconds_count" not in disabled.render()
+    
+    app = FastAPI()
+    requests = registry.histogram(
+        "http_request_seconds", "API", ("method", "route", "status")
+    )
+    app.add_middleware(RouteLatencyMiddleware, histogram=requests)
+    
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+    
+    client = TestClient(app)
+    for item_id in (1, 2):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/missing").status_code == 404
+    text = registry.render()
+    # 경로 값이 아니라 라우트 템플릿 기준으로 묶임
+    assert 'http_request_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_request_seconds_count{method="GET",route="unmatched",status="404"} 1' in text
+    print(f"✅ 메트릭 {len(registry.render().splitlines())}줄 출력")
+
+
+def test_profiling():
+    """온디맨드 프로파일링 테스트 (실제 수집 사이클 캡처/단계 구간/pstats·collapsed 출력/라우트 미들웨어)"""
+    print("\n🔬 프로파일링 테스트")
+    print("-" * 40)
+    
+    import pstats
+    import threading
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    
+    profiler = Profiler(interval=0.001)
+    # 무장 전에는 캡처도 구간 기록도 하지 않음
+    assert profiler.begin("cycle") is None
+    with profiler.span("fetch"):
+        pass
+    
+    def fake_download(tickers, **kwargs):
+        """워커 스레드에서 도는 yf.download 흉내 (CPU 사용, 실제 API처럼 UTC 분봉)"""
+        until = time.perf_counter() + 0.05
+        while time.perf_counter() < until:
+            sum(range(100))
+        index = pd.date_range(
+            end=pd.Timestamp.now(tz="UTC").floor("min"), periods=2, freq="1min"
+        )
+        frame = pd.DataFrame({
+            "Open": [10.0, 11.0], "High": [11.0, 12.0], "Low": [9.0, 10.0],
+            "Close": [10.5, 11.5], "Volume": [100, 200],
+        }, index=index)
+        return pd.concat({symbol: frame for symbol in tickers}, axis=1)
+    
+    # 실제 수집 사이클 (write-behind 버퍼 실행 중)도 fetch/parse/insert 구간을 모두 기록
+    db = create_sqlite_manager(":memory:")
+    collector = StockDataCollector(
+        source=YFinancePriceSource(batch_downloader=fake_download), db=db,
+        cache=LatestPriceCache(), broadcaster=TickBroadcaster()
+    )
+    symbols = TARGET_SYMBOLS[:2]
+    default_interval = default_profiler.interval
+    default_profiler.interval = 0.001
+    
+    async def run_cycles():
+        collector.write_buffer.start()
+        try:
+            session = default_profiler.arm("cycle", count=2)
+            for _ in range(3):
+                assert await collector.collect_and_save(symbols=symbols)
+            return session
+        finally:
+            await collector.write_buffer.stop()
+            default_profiler.disarm()
+    
+    try:
+        session = asyncio.run(run_cycles())
+    finally:
+        default_profiler.interval = default_interval
+        collector.close()
+    
+    status = session.get_status()
+    # 요청한 2회만 캡처하고 무장 해제
+    assert status["state"] == "done" and status["captured"] == 2
+    assert default_profiler.armed is None
+    spans = status["spans"]
+    assert spans["fetch"]["count"] == 2 and spans["parse"]["count"] == 2
+    assert spans["insert"]["count"] == 2, spans
+    assert len(db.get_latest_prices()) == len(symbols)
+    assert status["samples"] > 0
+    collapsed = session.collapsed()
+    assert any(
+        line.startswith("collector;") and "fake_download" in line
+        for line in collapsed.splitlines()
+    )
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cycle.pstats")
+        with open(path, "wb") as f:
+            f.write(session.pstats_bytes())
+        stats = pstats.Stats(path)
+        assert any(name == "fake_download" for _, _, name in stats.stats)
+        assert stats.total_tt > 0
+    
+    try:
+        profiler.arm("disk", 1)
+        assert False, "알 수 없는 대상은 ValueError"
+    except ValueError:
+        pass
+    
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+    
+    @app.get("/other")
+    async def get_other():
+        return {}
+    
+    route_session = profiler.arm("route", count=1, route="/items/{item_id}")
+    try:
+        profiler.arm("cycle", 1)
+        assert False, "이미 무장된 경우 RuntimeError"
+    except RuntimeError:
+        pass
+    client = TestClient(app)
+    client.get("/other")
+    assert route_session.captured == 0
+    client.get("/items/7")
+    client.get("/items/8")
+    assert route_session.state == "done" and route_session.captured == 1
+    assert route_session.captures[0]["path"] == "/items/7"
+    print(f"✅ 사이클 {status['captured']}회 샘플 {status['samples']}개, "
+          f"라우트 요청 {route_session.captured}회 캡처")
+
+
 def test_config():
     """설정 테스트"""
     print("\n⚙️ 설정 테스트")
@@ -110,6 +1311,30 @@ async def main():
     # 시장 유틸리티 테스트
     await test_market_utils()
     
+    # 배치 수집 테스트 (가짜 소스)
+    test_market_calendar()
+    await asyncio.to_thread(test_collection_schedules)
+    test_adaptive_polling()
+    await asyncio.to_thread(test_cycle_deadline)
+    await asyncio.to_thread(test_batch_collection)
+    await asyncio.to_thread(test_ohlcv_ingest)
+    await asyncio.to_thread(test_incremental_ohlcv)
+    await asyncio.to_thread(test_chunk_dispatch_spread)
+    test_fallback_tier_cache()
+    await asyncio.to_thread(test_simulated_source)
+    test_price_cache()
+    await asyncio.to_thread(test_write_behind_buffer)
+    await asyncio.to_thread(test_tick_broadcaster)
+    test_upsert_counts()
+    test_tick_spool()
+    await asyncio.to_thread(test_backfill)
+    test_partition_maintenance()
+    test_rollup_cascade()
+    test_history_pagination()
+    test_export_csv()
+    test_metrics()
+    await asyncio.to_thread(test_profiling)
+    
     # 데이터베이스 연결 테스트
     await test_database_connection()
     
@@ -0,0 +1,292 @@
+"""
+새 틱 푸시 브로드캐스터 (WebSocket / SSE)
+- 수집 사이클에서 저장된 배치를 심볼 필터가 맞는 구독자에게 전달
+- 틱은 배치당 한 번만 JSON으로 직렬화하고, 같은 필터의 구독자는 완성된 메시지를 공유
+- 구독자별 큐는 길이 제한이 있어 느린 클라이언트가 수집기를 막지 않음
+  ('drop_oldest': 가장 오래된 메시지 삭제, 'coalesce': 대기 중 틱을 심볼별 최신 값으로 합침)
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from config import BROADCAST_QUEUE_SIZE, BROADCAST_POLICY, BROADCAST_MAX_SUBSCRIBERS
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (symbol, 직렬화된 틱 JSON)
+Fragment = Tuple[str, str]
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def serialize_tick(row: Sequence) -> str:
+    """
+    (symbol, price, timestamp[, open, high, low, volume]) 행을 JSON 객체 문자열로 변환
+
+    Args:
+        row: 수집 행 또는 OHLCV 봉 행
+
+    Returns:
+        str: 틱 JSON (timestamp는 ISO 8601)
+    """
+    tick = {
+        "symbol": row[0],
+        "price": float(row[1]),
+        "timestamp": str(row[2]).replace(" ", "T"),
+    }
+    if len(row) >= 7:
+        tick["open"] = _optional_float(row[3])
+        tick["high"] = _optional_float(row[4])
+        tick["low"] = _optional_float(row[5])
+        tick["volume"] = None if row[6] is None else int(row[6])
+    return json.dumps(tick, ensure_ascii=False)
+
+
+class BroadcastMessage:
+    """구독자들이 공유하는 직렬화된 메시지 (SSE 프레임은 처음 필요할 때 한 번만 생성)"""
+
+    __slots__ = ("kind", "fragments", "text", "_sse")
+
+    def __init__(self, fragments: List[Fragment], kind: str = "ticks"):
+        """
+        Args:
+            fragments: 메시지에 담을 (symbol, 틱 JSON) 목록
+            kind: 메시지 종류 ('ticks', 'snapshot')
+        """
+        self.kind = kind
+        self.fragments = fragments
+        self.text = (
+            f'{{"type":"{kind}","ticks":['
+            + ",".join(fragment for _, fragment in fragments)
+            + "]}"
+        )
+        self._sse: Optional[bytes] = None
+
+    @property
+    def sse(self) -> bytes:
+        """Server-Sent Events 프레임"""
+        if self._sse is None:
+            self._sse = f"event: {self.kind}\ndata: {self.text}\n\n".encode("utf-8")
+        return self._sse
+
+
+class Subscription:
+    """구독자 한 명의 길이 제한 메시지 큐"""
+
+    POLICIES = ("drop_oldest", "coalesce")
+
+    def __init__(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        max_pending: int = BROADCAST_QUEUE_SIZE,
+        policy: str = BROADCAST_POLICY
+    ):
+        """
+        Args:
+            symbols: 받을 심볼 (None이면 전체)
+            max_pending: 대기 큐 최대 메시지 수
+            policy: 큐가 가득 찼을 때 정책 ('drop_oldest', 'coalesce')
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"알 수 없는 구독 큐 정책: {policy}")
+        self.symbols: Optional[FrozenSet[str]] = frozenset(symbols) if symbols else None
+        self.max_pending = max_pending
+        self.policy = policy
+        self.closed = False
+        self._pending: Deque[BroadcastMessage] = deque()
+        self._ready = asyncio.Event()
+
+        # 메트릭
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def depth(self) -> int:
+        """대기 중인 메시지 수"""
+        return len(self._pending)
+
+    def offer(self, message: BroadcastMessage):
+        """메시지 적재 (대기하지 않음, 큐가 가득 차면 정책에 따라 정리)"""
+        if self.closed:
+            return
+        if len(self._pending) >= self.max_pending:
+            if self.policy == "coalesce":
+                # 대기 중인 메시지와 새 메시지를 심볼별 최신 틱 하나로 합침
+                latest: Dict[str, str] = {}
+                for pending in self._pending:
+                    for symbol, fragment in pending.fragments:
+                        latest[symbol] = fragment
+                for symbol, fragment in message.fragments:
+                    latest[symbol] = fragment
+                self.coalesced += len(self._pending)
+                self._pending.clear()
+                # 합친 메시지는 가장 새 메시지의 종류를 유지
+                message = BroadcastMessage(list(latest.items()), message.kind)
+            else:
+                self._pending.popleft()
+                self.dropped += 1
+        self._pending.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[BroadcastMessage]:
+        """
+        다음 메시지 대기
+
+        Args:
+            timeout: 최대 대기 시간(초, None이면 무제한)
+
+        Returns:
+            Optional[BroadcastMessage]: 메시지 (시간 초과 또는 구독 종료 시 None)
+        """
+        while not self._pending:
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self.delivered += 1
+        return self._pending.popleft()
+
+    def close(self):
+        """구독 종료 (대기 중인 get을 깨움)"""
+        self.closed = True
+        self._ready.set()
+
+
+class TickBroadcaster:
+    """저장된 틱 배치를 구독자들에게 팬아웃 (이벤트 루프에서만 호출)"""
+
+    def __init__(
+        self,
+        max_pending: int = BROADCAST_QUEUE_SIZE,
+        policy: str = BROADCAST_POLICY,
+        max_subscribers: int = BROADCAST_MAX_SUBSCRIBERS
+    ):
+        """
+        Args:
+            max_pending: 구독자별 대기 큐 최대 메시지 수
+            policy: 구독자 큐가 가득 찼을 때 정책 ('drop_oldest', 'coalesce')
+            max_subscribers: 동시 구독자 상한
+        """
+        if policy not in Subscription.POLICIES:
+            raise ValueError(f"알 수 없는 구독 큐 정책: {policy}")
+        self.max_pending = max_pending
+        self.policy = policy
+        self.max_subscribers = max_subscribers
+        self._subscribers: List[Subscription] = []
+
+        # 메트릭
+        self.published_batches = 0
+        self.published_ticks = 0
+        self.messages_built = 0
+        self.messages_sent = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None) -> Subscription:
+        """
+        구독 등록
+
+        Args:
+            symbols: 받을 심볼 (None이면 전체)
+
+        Returns:
+            Subscription: 구독 (끝나면 unsubscribe 호출)
+
+        Raises:
+            RuntimeError: 구독자 수가 상한에 도달한 경우
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            self.rejected += 1
+            raise RuntimeError(f"구독자 수 상한({self.max_subscribers}) 도달")
+        subscription = Subscription(symbols, self.max_pending, self.policy)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """구독 해제 (누적 메트릭은 브로드캐스터로 합산)"""
+        subscription.close()
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+            self.dropped += subscription.dropped
+            self.coalesced += subscription.coalesced
+
+    def publish(self, data: Sequence[Sequence], kind: str = "ticks") -> int:
+        """
+        배치를 구독자 큐에 적재 (대기하지 않으므로 수집 경로를 막지 않음)
+
+        Args:
+            data: (symbol, price, timestamp[, open, high, low, volume]) 행 리스트
+            kind: 메시지 종류
+
+        Returns:
+            int: 메시지를 받은 구독자 수
+        """
+        if not data or not self._subscribers:
+            return 0
+        # 틱 직렬화는 배치당 한 번, 메시지는 필터(심볼 집합)별로 한 번만 생성
+        fragments = [(row[0], serialize_tick(row)) for row in data]
+        messages: Dict[Optional[FrozenSet[str]], Optional[BroadcastMessage]] = {}
+        delivered = 0
+        for subscription in self._subscribers:
+            key = subscription.symbols
+            if key not in messages:
+                selected = (
+                    fragments if key is None
+                    else [f for f in fragments if f[0] in key]
+                )
+                messages[key] = BroadcastMessage(selected, kind) if selected else None
+                if selected:
+                    self.messages_built += 1
+            message = messages[key]
+            if message is not None:
+                subscription.offer(message)
+                delivered += 1
+        self.published_batches += 1
+        self.published_ticks += len(data)
+        self.messages_sent += delivered
+        return delivered
+
+    def close(self):
+        """모든 구독 종료 (서버 종료 시)"""
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
+
+    def get_stats(self) -> dict:
+        """
+        브로드캐스트 통계 반환
+
+        Returns:
+            dict: 구독자 수, 발행 배치/틱 수, 생성/전달 메시지 수, 삭제/병합 수
+        """
+        return {
+            "subscribers": len(self._subscribers),
+            "policy": self.policy,
+            "max_pending": self.max_pending,
+            "published_batches": self.published_batches,
+            "published_ticks": self.published_ticks,
+            "messages_built": self.messages_built,
+            "messages_sent": self.messages_sent,
+            "rejected": self.rejected,
+            "dropped": self.dropped + sum(s.dropped for s in self._subscribers),
+            "coalesced": self.coalesced + sum(s.coalesced for s in self._subscribers),
+            "max_depth": max((s.depth for s in self._subscribers), default=0),
+        }
+
+
+# 전역 틱 브로드캐스터 인스턴스
+broadcaster = TickBroadcaster()
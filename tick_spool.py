@@ -0,0 +1,350 @@
+"""
+DB 장애 시 틱을 보관하는 로컬 append-only 스풀
+- 세그먼트 파일에 [길이(4B) | CRC32(4B) | payload] 프레임을 순차 추가
+- fsync는 바이트/시간 기준으로 묶어서 수행 (틱마다 fsync 하지 않음)
+  추가가 멈춰도 마지막 프레임이 fsync_interval 안에 디스크에 남도록 타이머로 fsync
+- 재연결 후 세그먼트를 순서대로 배치 재생, 체크포인트로 재개, 재생 끝난 세그먼트 삭제
+"""
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+from config import (
+    SPOOL_DIR,
+    SPOOL_SEGMENT_BYTES,
+    SPOOL_FSYNC_INTERVAL,
+    SPOOL_FSYNC_BYTES,
+    SPOOL_REPLAY_BATCH_SIZE,
+    SPOOL_REPLAY_RATE,
+)
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Tick = Tuple[str, float, str]
+
+FRAME_HEADER = struct.Struct(">II")
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{12})\.log$")
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class TickSpool:
+    """세그먼트 파일 기반 틱 스풀"""
+
+    def __init__(
+        self,
+        directory: str = SPOOL_DIR,
+        segment_bytes: int = SPOOL_SEGMENT_BYTES,
+        fsync_interval: float = SPOOL_FSYNC_INTERVAL,
+        fsync_bytes: int = SPOOL_FSYNC_BYTES
+    ):
+        """
+        Args:
+            directory: 세그먼트 저장 디렉터리
+            segment_bytes: 세그먼트 교체 기준 크기(바이트)
+            fsync_interval: 마지막 fsync 후 이 시간(초)이 지나면 fsync (추가가 없어도 타이머로 수행)
+            fsync_bytes: 마지막 fsync 후 이 크기(바이트)가 쌓이면 fsync
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_bytes = fsync_bytes
+
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._file = None
+        self._active_seq = 0
+        self._active_size = 0
+        self._unsynced_bytes = 0
+        self._last_sync = time.monotonic()
+        # fsync 안 된 프레임이 있을 때만 걸어 두는 지연 fsync 타이머
+        self._sync_timer: Optional[threading.Timer] = None
+
+        # 통계
+        self.appended_rows = 0
+        self.replayed_rows = 0
+        self.corrupt_frames = 0
+        self.fsync_count = 0
+
+        # 디렉터리는 첫 추가 시 생성
+        existing = self._sealed_segments()
+        # 기존 세그먼트는 끝이 잘렸을 수 있으므로 이어 쓰지 않고 새 세그먼트 사용
+        # 재생이 끝나 세그먼트가 모두 삭제돼도 체크포인트보다 앞 번호는 쓰지 않음
+        # (앞 번호 세그먼트는 재생 때 이미 처리된 것으로 보고 삭제됨)
+        checkpoint_seq, _ = self._load_checkpoint()
+        self._active_seq = max((existing[-1] + 1) if existing else 1, checkpoint_seq, 1)
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"segment-{seq:012d}.log")
+
+    def _list_segments(self) -> List[int]:
+        if not os.path.isdir(self.directory):
+            return []
+        seqs = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                seqs.append(int(match.group(1)))
+        return sorted(seqs)
+
+    def _sealed_segments(self) -> List[int]:
+        """쓰기가 끝난(활성 세그먼트가 아닌) 세그먼트 번호 목록"""
+        return [s for s in self._list_segments() if s != self._active_seq]
+
+    def _sync_locked(self):
+        if self._file is None or not self._unsynced_bytes:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced_bytes = 0
+        self._last_sync = time.monotonic()
+        self.fsync_count += 1
+
+    def _schedule_sync_locked(self):
+        """fsync 안 된 프레임이 남아 있으면 fsync_interval 뒤 fsync 예약 (이미 예약돼 있으면 유지)"""
+        if not self._unsynced_bytes or self._sync_timer is not None:
+            return
+        delay = max(self._last_sync + self.fsync_interval - time.monotonic(), 0.0)
+        self._sync_timer = threading.Timer(delay, self._timed_sync)
+        self._sync_timer.daemon = True
+        self._sync_timer.start()
+
+    def _timed_sync(self):
+        """타이머 fsync (추가가 멈춘 뒤 남은 프레임 보호)"""
+        with self._lock:
+            self._sync_timer = None
+            try:
+                self._sync_locked()
+            except OSError as e:
+                logger.error(f"스풀 fsync 실패: {e}")
+
+    def _cancel_sync_timer_locked(self):
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+
+    def _rotate_locked(self):
+        """활성 세그먼트를 닫고 다음 번호로 교체 (close 후 남은 세그먼트 포함)"""
+        if self._file is not None:
+            self._sync_locked()
+            self._file.close()
+            self._file = None
+        if os.path.exists(self._segment_path(self._active_seq)):
+            self._active_seq += 1
+        self._active_size = 0
+
+    def append(self, rows: List[Tick]):
+        """
+        틱 배치를 프레임 하나로 추가 (순차 쓰기, 묶음 fsync)
+
+        Args:
+            rows: (symbol, price, timestamp[, open, high, low, volume]) 튜플 리스트
+        """
+        if not rows:
+            return
+        payload = json.dumps(
+            [[row[0], float(row[1]), str(row[2]), *row[3:]] for row in rows],
+            separators=(",", ":")
+        ).encode("utf-8")
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(self._segment_path(self._active_seq), "ab")
+            self._file.write(frame)
+            self._active_size += len(frame)
+            self._unsynced_bytes += len(frame)
+            self.appended_rows += len(rows)
+
+            if (self._unsynced_bytes >= self.fsync_bytes
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync_locked()
+            if self._active_size >= self.segment_bytes:
+                self._rotate_locked()
+            self._schedule_sync_locked()
+
+    def sync(self):
+        """버퍼된 프레임을 디스크에 fsync"""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self):
+        """활성 세그먼트 fsync 후 닫기 (예약된 타이머 fsync 취소)"""
+        with self._lock:
+            self._cancel_sync_timer_locked()
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def has_pending(self) -> bool:
+        """재생할 틱이 남아 있는지 여부"""
+        with self._lock:
+            return self._active_size > 0 or bool(self._sealed_segments())
+
+    def _load_checkpoint(self) -> Tuple[int, int]:
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return int(data["segment"]), int(data["offset"])
+        except (OSError, ValueError, KeyError):
+            return 0, 0
+
+    def _checkpoint_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(os.path.join(self.directory, CHECKPOINT_FILE))
+        except OSError:
+            return None
+
+    def _save_checkpoint(self, seq: int, offset: int):
+        """체크포인트를 임시 파일에 쓰고 원자적으로 교체"""
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segment": seq, "offset": offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _read_frames(self, seq: int, offset: int):
+        """
+        세그먼트 프레임을 순서대로 읽음 (CRC 불일치/잘린 프레임에서 중단)
+
+        Yields:
+            Tuple[List[Tick], int]: (프레임의 틱들, 프레임 끝 오프셋)
+        """
+        with open(self._segment_path(seq), "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                length, crc = FRAME_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    self.corrupt_frames += 1
+                    logger.warning(
+                        f"스풀 세그먼트 {seq} 오프셋 {offset}에서 손상된 프레임 발견 "
+                        f"- 이후 데이터 건너뜀"
+                    )
+                    return
+                offset += FRAME_HEADER.size + length
+                rows = [tuple(row) for row in json.loads(payload)]
+                yield rows, offset
+
+    def replay(
+        self,
+        writer: Callable[[List[Tick]], bool],
+        batch_size: int = SPOOL_REPLAY_BATCH_SIZE,
+        rate_limit: float = SPOOL_REPLAY_RATE
+    ) -> int:
+        """
+        보관된 틱을 큰 배치로 재생 (동시에 한 번만 실행)
+        배치가 성공할 때마다 체크포인트를 남기므로 중단 후 재개 가능하며,
+        writer는 이미 저장된 틱을 건너뛰는 멱등 저장이어야 함
+
+        Args:
+            writer: 배치 저장 함수 (성공 시 True)
+            batch_size: 재생 배치 최대 행 수
+            rate_limit: 초당 최대 재생 행 수 (0이면 제한 없음)
+
+        Returns:
+            int: 재생한 행 수
+        """
+        if not self._replay_lock.acquire(blocking=False):
+            return 0
+        try:
+            # 지금까지 쌓인 틱을 모두 봉인된 세그먼트로 만든 뒤 재생
+            with self._lock:
+                self._rotate_locked()
+                segments = self._sealed_segments()
+
+            checkpoint_seq, checkpoint_offset = self._load_checkpoint()
+            checkpoint_mtime = self._checkpoint_mtime()
+            replayed = 0
+            started = time.monotonic()
+
+            def flush(batch: List[Tick], seq: int, offset: int) -> bool:
+                nonlocal replayed
+                if not writer(batch):
+                    return False
+                self._save_checkpoint(seq, offset)
+                replayed += len(batch)
+                self.replayed_rows += len(batch)
+                if rate_limit > 0:
+                    # 초당 재생 행 수 상한 유지
+                    ahead = replayed / rate_limit - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+                return True
+
+            for seq in segments:
+                if seq < checkpoint_seq:
+                    # 재생 후 삭제 직전에 중단된 세그먼트만 삭제
+                    # 체크포인트 이후에 쓰인 세그먼트는 처음부터 재생 (저장이 멱등이라 중복은 안전)
+                    if (checkpoint_mtime is not None
+                            and os.path.getmtime(self._segment_path(seq)) < checkpoint_mtime):
+                        os.remove(self._segment_path(seq))
+                        continue
+                    logger.warning(
+                        f"스풀 세그먼트 {seq}이 체크포인트({checkpoint_seq}) 이후에 쓰여 처음부터 재생"
+                    )
+                offset = checkpoint_offset if seq == checkpoint_seq else 0
+                batch: List[Tick] = []
+                batch_end = offset
+                for rows, frame_end in self._read_frames(seq, offset):
+                    batch.extend(rows)
+                    batch_end = frame_end
+                    if len(batch) >= batch_size:
+                        if not flush(batch, seq, batch_end):
+                            logger.warning(f"스풀 재생 중단: {replayed}행 재생 후 저장 실패")
+                            return replayed
+                        batch = []
+                if batch and not flush(batch, seq, batch_end):
+                    logger.warning(f"스풀 재생 중단: {replayed}행 재생 후 저장 실패")
+                    return replayed
+
+                # 재생이 끝난 세그먼트는 삭제(컴팩션)하고 체크포인트를 다음으로 이동
+                self._save_checkpoint(seq + 1, 0)
+                os.remove(self._segment_path(seq))
+
+            if replayed:
+                logger.info(f"스풀 재생 완료: {replayed}행")
+            return replayed
+        finally:
+            self._replay_lock.release()
+
+    def get_stats(self) -> dict:
+        """
+        스풀 통계 반환
+
+        Returns:
+            dict: 대기 세그먼트 수/바이트, 추가·재생 행 수, 손상 프레임 수
+        """
+        with self._lock:
+            segments = self._list_segments()
+            pending_bytes = 0
+            for seq in segments:
+                try:
+                    pending_bytes += os.path.getsize(self._segment_path(seq))
+                except OSError:
+                    pass
+            return {
+                "directory": self.directory,
+                "pending_segments": len(segments),
+                "pending_bytes": pending_bytes,
+                "appended_rows": self.appended_rows,
+                "replayed_rows": self.replayed_rows,
+                "corrupt_frames": self.corrupt_frames,
+                "fsync_count": self.fsync_count,
+                "replaying": self._replay_lock.locked(),
+            }
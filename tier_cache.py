@@ -0,0 +1,123 @@
+"""
+심볼별 폴백 단계(tier) 학습 캐시
+마지막으로 성공한 단계를 기억해 다음 사이클에서 실패가 예상되는
+저렴한 단계들의 HTTP 호출을 건너뜀
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class FallbackTierCache:
+    """심볼별 마지막 성공 폴백 단계 캐시 및 단계별 적중/실패 카운터"""
+
+    def __init__(self, tier_names: List[str], ttl: float, reprobe_every: int):
+        """
+        Args:
+            tier_names: 폴백 단계 이름 리스트 (저렴한 순)
+            ttl: 학습된 단계의 유효 시간(초)
+            reprobe_every: 학습된 단계를 N회 사용할 때마다 처음 단계부터 재탐색
+        """
+        self.tier_names = tier_names
+        self.ttl = ttl
+        self.reprobe_every = max(1, reprobe_every)
+        self.entries: Dict[str, dict] = {}
+        self.hits: Dict[str, int] = {name: 0 for name in tier_names}
+        self.misses: Dict[str, int] = {name: 0 for name in tier_names}
+        self.skipped_calls = 0
+        self.reprobes = 0
+        # 폴백 경로는 워커 스레드에서 동시에 실행되므로 잠금으로 보호
+        self._lock = threading.Lock()
+
+    def start_tier(self, symbol: str, market_open: Optional[bool]) -> int:
+        """
+        다음 조회를 시작할 단계 인덱스 반환
+
+        Args:
+            symbol: 조회할 심볼
+            market_open: 해당 종목 거래소의 현재 개장 여부
+
+        Returns:
+            int: 시작 단계 인덱스 (학습 정보가 없거나 무효하면 0)
+        """
+        with self._lock:
+            entry = self.entries.get(symbol)
+            if entry is None:
+                return 0
+
+            # TTL 만료 또는 장 상태 변경(개장/폐장) 시 학습 정보 폐기
+            expired = time.monotonic() - entry['learned_at'] > self.ttl
+            if expired or entry['market_open'] != market_open:
+                del self.entries[symbol]
+                return 0
+
+            entry['uses'] += 1
+            if entry['uses'] % self.reprobe_every == 0:
+                # 가끔 저렴한 단계부터 다시 확인
+                self.reprobes += 1
+                return 0
+
+            self.skipped_calls += entry['tier']
+            return entry['tier']
+
+    def record(self, tier_index: int, success: bool):
+        """
+        단계 시도 결과 카운트
+
+        Args:
+            tier_index: 시도한 단계 인덱스
+            success: 가격 확보 여부
+        """
+        name = self.tier_names[tier_index]
+        with self._lock:
+            if success:
+                self.hits[name] += 1
+            else:
+                self.misses[name] += 1
+
+    def learn(
+        self, symbol: str, tier_index: Optional[int], market_open: Optional[bool]
+    ):
+        """
+        조회 결과를 학습 (성공 단계 저장, 전체 실패 시 학습 정보 삭제)
+
+        Args:
+            symbol: 조회한 심볼
+            tier_index: 성공한 단계 인덱스 (None이면 전체 실패)
+            market_open: 조회 시점의 거래소 개장 여부
+        """
+        with self._lock:
+            if tier_index is None:
+                self.entries.pop(symbol, None)
+                return
+
+            entry = self.entries.get(symbol)
+            if entry is not None and entry['tier'] == tier_index:
+                return
+            self.entries[symbol] = {
+                'tier': tier_index,
+                'learned_at': time.monotonic(),
+                'market_open': market_open,
+                'uses': 0,
+            }
+
+    def get_stats(self) -> dict:
+        """
+        캐시 및 단계별 적중/실패 통계 반환
+
+        Returns:
+            dict: 단계별 hit/miss, 건너뛴 호출 수, 학습된 심볼별 단계
+        """
+        with self._lock:
+            return {
+                'tiers': {
+                    name: {'hits': self.hits[name], 'misses': self.misses[name]}
+                    for name in self.tier_names
+                },
+                'skipped_calls': self.skipped_calls,
+                'reprobes': self.reprobes,
+                'learned': {
+                    symbol: self.tier_names[entry['tier']]
+                    for symbol, entry in self.entries.items()
+                },
+            }
@@ -0,0 +1,360 @@
+"""
+수집과 DB 저장 사이의 비동기 write-behind 버퍼
+수집 사이클은 틱을 큐에 넣고 바로 반환하며, 전용 writer 태스크가
+크기/경과 시간 기준으로 배치를 모아 bulk_insert_prices로 저장
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from config import (
+    WRITE_BUFFER_BATCH_SIZE,
+    WRITE_BUFFER_MAX_AGE,
+    WRITE_BUFFER_CAPACITY,
+    WRITE_BUFFER_POLICY,
+    WRITE_BUFFER_RETRY_DELAY,
+    WRITE_BUFFER_BLOCK_TIMEOUT,
+)
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Tick = Tuple[str, float, str]
+
+
+class WriteBehindBuffer:
+    """크기/경과 시간 기준으로 배치 저장하는 write-behind 버퍼"""
+
+    POLICIES = ("block", "coalesce")
+
+    def __init__(
+        self,
+        writer: Callable[[List[Tick]], bool],
+        batch_size: int = WRITE_BUFFER_BATCH_SIZE,
+        max_age: float = WRITE_BUFFER_MAX_AGE,
+        capacity: int = WRITE_BUFFER_CAPACITY,
+        policy: str = WRITE_BUFFER_POLICY,
+        retry_delay: float = WRITE_BUFFER_RETRY_DELAY,
+        block_timeout: float = WRITE_BUFFER_BLOCK_TIMEOUT,
+        overflow: Optional[Callable[[List[Tick]], bool]] = None
+    ):
+        """
+        Args:
+            writer: 배치를 저장하는 블로킹 함수 (워커 스레드에서 실행, 성공 시 True)
+            batch_size: 배치 최대 행 수 (이만큼 쌓이면 즉시 저장)
+            max_age: 가장 오래된 틱의 최대 대기 시간(초)
+            capacity: 큐 최대 행 수
+            policy: 큐가 가득 찼을 때 정책
+                ('block': 자리가 날 때까지 대기, 'coalesce': 심볼별 최신 틱만 유지 -
+                OHLCV 봉 행은 (심볼, 봉 시각)이 같은 행만 합침)
+            retry_delay: 저장 실패 후 재시도 대기(초)
+            block_timeout: 'block' 정책 최대 대기(초) - DB 장애가 길어져도 수집 사이클이
+                멈추지 않도록 넘으면 'coalesce'처럼 병합
+            overflow: 병합 후에도 넘친 행을 넘겨받는 블로킹 함수 (워커 스레드에서 실행,
+                예: 로컬 스풀 보관, 성공 시 True) - None이거나 실패하면 버리고 dropped로 집계
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"알 수 없는 백프레셔 정책: {policy}")
+        self.writer = writer
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.capacity = capacity
+        self.policy = policy
+        self.retry_delay = retry_delay
+        self.block_timeout = block_timeout
+        self.overflow = overflow
+
+        self._pending: Deque[Tick] = deque()
+        self._oldest: Optional[float] = None
+        self._cond: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # flush() 요청: 큐가 빌 때까지 크기/경과 시간과 무관하게 저장
+        self._flush_requested = False
+        self._writing = False
+
+        # 메트릭
+        self.flush_count = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.overflowed = 0
+        self.blocked_seconds = 0.0
+        self.block_timeouts = 0
+        self.max_depth = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """writer 태스크 실행 여부"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        """큐에 대기 중인 행 수"""
+        return len(self._pending)
+
+    def start(self):
+        """writer 태스크 시작 (실행 중인 이벤트 루프 필요)"""
+        if self.is_running:
+            return
+        self._cond = asyncio.Condition()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"write-behind 버퍼 시작 (배치 {self.batch_size}행, "
+            f"{self.max_age}초, 정책 {self.policy})"
+        )
+
+    async def stop(self):
+        """남은 틱을 모두 저장 시도한 뒤 writer 태스크 종료"""
+        if not self.is_running:
+            return
+        async with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        await self._task
+        self._task = None
+        logger.info("write-behind 버퍼 종료")
+
+    @staticmethod
+    def _coalesce_key(tick: Tick):
+        """
+        병합 기준: 종가 틱은 심볼 (최신 틱이 이전 틱을 대체),
+        OHLCV 봉 행은 (심볼, 봉 시각) - 시각이 다른 봉은 각각 실제 데이터이므로 합치지 않음
+        """
+        return (tick[0], tick[2]) if len(tick) > 3 else tick[0]
+
+    def _coalesce(self):
+        """대기 중인 틱을 병합 기준별 최신 행 하나로 압축"""
+        latest = {}
+        for tick in self._pending:
+            key = self._coalesce_key(tick)
+            current = latest.get(key)
+            if current is None or tick[2] >= current[2]:
+                latest[key] = tick
+        self.coalesced += len(self._pending) - len(latest)
+        self._pending = deque(latest.values())
+
+    def _coalesce_rows(self, rows: List[Tick]) -> List[Tick]:
+        """
+        틱을 추가한 뒤 병합 (그래도 넘치면 가장 오래된 행부터 큐에서 꺼냄)
+
+        Returns:
+            List[Tick]: 큐에 들어가지 못한 행 (overflow로 넘기거나 버림)
+        """
+        self._pending.extend(rows)
+        self._coalesce()
+        evicted = []
+        while len(self._pending) > self.capacity:
+            evicted.append(self._pending.popleft())
+        return evicted
+
+    async def _handle_overflow(self, rows: List[Tick]):
+        """큐에서 넘친 행을 overflow로 넘김 (없거나 실패하면 유실로 집계)"""
+        if not rows:
+            return
+        saved = False
+        if self.overflow is not None:
+            try:
+                saved = await asyncio.to_thread(self.overflow, rows)
+            except Exception as e:
+                logger.error(f"write-behind 넘친 행 보관 중 오류: {e}")
+        if saved:
+            self.overflowed += len(rows)
+            return
+        self.dropped += len(rows)
+        logger.warning(f"write-behind 큐가 가득 차 {len(rows)}개 행 유실")
+
+    async def put(self, rows: List[Tick]):
+        """
+        틱을 큐에 추가 (가득 찬 경우 정책에 따라 대기 또는 병합)
+        'block' 정책도 block_timeout까지만 기다리고 이후에는 병합
+        병합 후에도 넘친 행은 overflow(로컬 스풀 등)로 넘기고, 보관할 곳이 없으면 버림
+
+        Args:
+            rows: (symbol, price, timestamp) 튜플 리스트
+        """
+        if not rows:
+            return
+        evicted: List[Tick] = []
+        async with self._cond:
+            if len(self._pending) + len(rows) > self.capacity:
+                if self.policy == "block":
+                    started = time.monotonic()
+                    try:
+                        await asyncio.wait_for(
+                            self._cond.wait_for(
+                                lambda: self._stopping
+                                or not self._pending
+                                or len(self._pending) + len(rows) <= self.capacity
+                            ),
+                            self.block_timeout
+                        )
+                        self._pending.extend(rows)
+                    except asyncio.TimeoutError:
+                        # 저장이 오래 막혀 있음 (DB 장애 등) - 대기를 멈추고 병합
+                        self.block_timeouts += 1
+                        logger.warning(
+                            f"write-behind 큐가 {self.block_timeout}초 동안 가득 차 있어 "
+                            f"병합합니다"
+                        )
+                        evicted = self._coalesce_rows(rows)
+                    self.blocked_seconds += time.monotonic() - started
+                else:
+                    evicted = self._coalesce_rows(rows)
+            else:
+                self._pending.extend(rows)
+
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self.max_depth = max(self.max_depth, len(self._pending))
+            self._cond.notify_all()
+        # 파일 보관은 블로킹이므로 잠금을 놓은 뒤 워커 스레드에서 처리
+        await self._handle_overflow(evicted)
+
+    async def flush(self):
+        """
+        지금까지 큐에 넣은 틱을 바로 저장하도록 요청하고 저장이 끝날 때까지 대기
+        (큐가 비고 저장 중인 배치가 없거나, 요청 후 저장이 한 번이라도 실패하면 반환)
+        """
+        if not self.is_running:
+            return
+        async with self._cond:
+            failures = self.failures
+            self._flush_requested = True
+            self._cond.notify_all()
+            await self._cond.wait_for(
+                lambda: self._stopping
+                or self.failures > failures
+                or (not self._pending and not self._writing)
+            )
+
+    def _should_flush(self) -> bool:
+        if not self._pending:
+            return False
+        if (self._stopping or self._flush_requested
+                or len(self._pending) >= self.batch_size):
+            return True
+        return time.monotonic() - self._oldest >= self.max_age
+
+    async def _next_batch(self) -> Optional[List[Tick]]:
+        """저장 조건이 충족될 때까지 대기 후 배치 추출 (종료 시 None)"""
+        async with self._cond:
+            while not self._should_flush():
+                if self._stopping:
+                    return None
+                timeout = None
+                if self._pending:
+                    timeout = max(
+                        0.0, self._oldest + self.max_age - time.monotonic()
+                    )
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            if not self._pending:
+                self._oldest = None
+                self._flush_requested = False
+            self._writing = True
+            # 자리가 났으므로 대기 중인 생산자 깨움
+            self._cond.notify_all()
+            return batch
+
+    async def _batch_done(self):
+        """배치 저장 시도가 끝났음을 flush() 대기자에게 알림"""
+        async with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+    async def _requeue(self, batch: List[Tick]):
+        """저장 실패한 배치를 큐 앞쪽에 되돌림"""
+        async with self._cond:
+            self._pending.extendleft(reversed(batch))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+    async def _run(self):
+        """writer 루프: 배치 추출 → 워커 스레드에서 저장 → 메트릭 기록"""
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+
+            started = time.monotonic()
+            try:
+                success = await asyncio.to_thread(self.writer, batch)
+            except Exception as e:
+                logger.error(f"write-behind 배치 저장 중 오류: {e}")
+                success = False
+            elapsed = time.monotonic() - started
+
+            self.flush_count += 1
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            self.total_flush_seconds += elapsed
+            self.last_batch_size = len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+
+            if success:
+                self.rows_written += len(batch)
+                await self._batch_done()
+                continue
+
+            self.failures += 1
+            if self._stopping:
+                self.dropped += len(batch)
+                logger.error(f"종료 중 저장 실패로 {len(batch)}개 틱 유실")
+                await self._batch_done()
+                continue
+            await self._requeue(batch)
+            await self._batch_done()
+            await asyncio.sleep(self.retry_delay)
+
+    def get_stats(self) -> dict:
+        """
+        버퍼 메트릭 반환
+
+        Returns:
+            dict: 큐 깊이, 배치 크기, 저장 지연, 실패/병합/유실 수
+        """
+        avg_flush = (
+            self.total_flush_seconds / self.flush_count
+            if self.flush_count else 0.0
+        )
+        avg_batch = (
+            self.rows_written / (self.flush_count - self.failures)
+            if self.flush_count > self.failures else 0.0
+        )
+        return {
+            "running": self.is_running,
+            "policy": self.policy,
+            "queue_depth": len(self._pending),
+            "max_queue_depth": self.max_depth,
+            "capacity": self.capacity,
+            "flush_count": self.flush_count,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": round(avg_batch, 1),
+            "max_batch_size": self.max_batch_size,
+            "last_flush_seconds": round(self.last_flush_seconds, 6),
+            "avg_flush_seconds": round(avg_flush, 6),
+            "max_flush_seconds": round(self.max_flush_seconds, 6),
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "overflowed": self.overflowed,
+            "blocked_seconds": round(self.blocked_seconds, 6),
+            "block_timeouts": self.block_timeouts,
+        }